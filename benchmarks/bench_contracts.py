@@ -0,0 +1,52 @@
+import asyncio
+import sys
+
+from harness import BENCH_TICKER, temp_database, timed
+import database.database as db
+from models.contract import Contract
+from models.contract_book import ContractBook
+
+N_ACTIVE = 10_000
+N_CLOSED = 10_000  # History rows the ACTIVE filter has to skip
+
+INSERT_SQL = """
+    INSERT INTO contracts (coin_ticker, buy_price, buy_amount, target_price, status, order_uuid, buy_order_uuid,
+                           created_at)
+    VALUES (?, ?, 0.01, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+async def _seed():
+    rows = [(BENCH_TICKER, 2_000_000.0 + i, 2_001_000.0 + i, 'ACTIVE' if i < N_ACTIVE else 'CLOSED',
+             f"sell-{i}", f"buy-{i}") for i in range(N_ACTIVE + N_CLOSED)]
+    # Concurrent writes are committed in batches by the single writer
+    await asyncio.gather(*(db.execute_write(INSERT_SQL, row) for row in rows))
+
+async def run() -> list:
+    results = []
+    async with temp_database("contracts.db"):
+        await _seed()
+        assert len(await Contract.get_active_contracts()) == N_ACTIVE
+
+        stats = await timed(Contract.get_active_contracts)
+        results.append(dict({'name': 'get_active_contracts', 'rows': N_ACTIVE}, **stats))
+        stats = await timed(lambda: Contract.get_active_contracts(BENCH_TICKER))
+        results.append(dict({'name': 'get_active_contracts_by_ticker', 'rows': N_ACTIVE}, **stats))
+
+        # The in-memory book the trading loop actually reads
+        book = ContractBook()
+        stats = await timed(book.load, repeat=3)
+        results.append(dict({'name': 'contract_book_load', 'rows': N_ACTIVE}, **stats))
+
+        async def _active():
+            book.active()
+        stats = await timed(_active)
+        results.append(dict({'name': 'contract_book_active', 'rows': N_ACTIVE}, **stats))
+
+    for r in results:
+        print(f"{r['name']:<32} | {r['rows']:,} rows | median {r['median_ms']:>9,.3f} ms")
+    return results
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run())
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import database.database as db
+
+N_QUERIES = 2000
+
+# --- Baseline: the old per-call connect + PRAGMA + close pattern ---
+async def legacy_write(sql: str, params: tuple = ()) -> int:
+    loop = asyncio.get_running_loop()
+    def _task():
+        conn = sqlite3.connect(db.DB_FILE, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor.lastrowid
+        finally:
+            conn.close()
+    return await loop.run_in_executor(None, _task)
+
+async def legacy_read(sql: str, params: tuple = ()):
+    loop = asyncio.get_running_loop()
+    def _task():
+        conn = sqlite3.connect(db.DB_FILE, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            row = conn.execute(sql, params).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+    return await loop.run_in_executor(None, _task)
+
+INSERT_SQL = """
+    INSERT INTO trades (contract_id, type, price, amount, fee, profit, executed_at)
+    VALUES (?, 'BUY', ?, 1.0, 0.0, 0.0, CURRENT_TIMESTAMP)
+"""
+READ_SQL = "SELECT * FROM trades WHERE id = ?"
+
+async def _measure(label: str, write, read) -> dict:
+    # Sequential writes (one round-trip each, like process_buy_fill)
+    t0 = time.perf_counter()
+    for i in range(N_QUERIES):
+        await write(INSERT_SQL, (i, 1400.0 + i))
+    seq_write = N_QUERIES / (time.perf_counter() - t0)
+
+    # Concurrent writes (burst of fills / many coroutines writing at once)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(write(INSERT_SQL, (i, 1400.0 + i)) for i in range(N_QUERIES)))
+    burst_write = N_QUERIES / (time.perf_counter() - t0)
+
+    # Point reads
+    t0 = time.perf_counter()
+    for i in range(1, N_QUERIES + 1):
+        await read(READ_SQL, (i,))
+    seq_read = N_QUERIES / (time.perf_counter() - t0)
+
+    result = {'name': label, 'seq_write_qps': seq_write, 'burst_write_qps': burst_write, 'read_qps': seq_read}
+    print(f"{label:<8} | seq write {seq_write:>9,.0f} q/s | burst write {burst_write:>9,.0f} q/s | read {seq_read:>9,.0f} q/s")
+    return result
+
+async def run() -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        original = db.DB_FILE
+        try:
+            db.DB_FILE = os.path.join(tmp, "legacy.db")
+            await db.init_db()
+            results.append(await _measure("legacy", legacy_write, legacy_read))
+
+            db.DB_FILE = os.path.join(tmp, "pooled.db")
+            await db.init_db()
+            results.append(await _measure(
+                "pooled",
+                db.execute_write,
+                lambda sql, params: db.execute_read(sql, params),
+            ))
+            await db.close_db()
+        finally:
+            db.DB_FILE = original
+
+    legacy, pooled = results
+    for key in ('seq_write_qps', 'burst_write_qps', 'read_qps'):
+        print(f"speedup {key}: x{pooled[key] / legacy[key]:.1f}")
+    return results
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run())
@@ -0,0 +1,45 @@
+import asyncio
+import sys
+
+from harness import BENCH_TICKER, grid_config, sim_manager, temp_database, timed
+import database.database as db
+from bench_contracts import INSERT_SQL
+
+N_ACTIVE = 1_000
+N_SELLS = 10_000
+
+TRADE_SQL = """
+    INSERT INTO trades (contract_id, type, price, amount, fee, profit, executed_at)
+    VALUES (?, 'SELL', ?, 0.01, 0.0, ?, CURRENT_TIMESTAMP)
+"""
+
+async def run() -> list:
+    try:
+        from modules.slash_commands import create_status_embed, create_positions_embed, create_profit_embed
+    except ImportError as e:  # discord.py not installed
+        print(f"Skipping embed benchmarks: {e}")
+        return []
+
+    results = []
+    async with temp_database("embeds.db"):
+        await asyncio.gather(*(db.execute_write(INSERT_SQL, (BENCH_TICKER, 2_000_000.0 + i, 2_001_000.0 + i,
+                                                             'ACTIVE', f"sell-{i}", f"buy-{i}"))
+                               for i in range(N_ACTIVE)))
+        await asyncio.gather(*(db.execute_write(TRADE_SQL, (i, 2_001_000.0, 10.0 + i % 7)) for i in range(N_SELLS)))
+
+        config = grid_config(N_ACTIVE)
+        manager, _ = await sim_manager(config, config['max_price'])
+        manager.is_running = True
+        for name, builder in (('status_embed', create_status_embed), ('positions_embed', create_positions_embed),
+                              ('profit_embed', create_profit_embed)):
+            stats = await timed(lambda: builder(manager))
+            results.append(dict({'name': name, 'active_contracts': N_ACTIVE, 'sell_trades': N_SELLS}, **stats))
+
+    for r in results:
+        print(f"{r['name']:<16} | median {r['median_ms']:>8,.2f} ms")
+    return results
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run())
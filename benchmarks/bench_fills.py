@@ -0,0 +1,53 @@
+import asyncio
+import sys
+import time
+
+from harness import grid_config, sim_manager, temp_database
+
+N_FILLS = 1_000
+
+async def run() -> list:
+    async with temp_database("fills.db"):
+        config = grid_config(N_FILLS)
+        price = config['max_price'] + config['grid_interval']
+        manager, exchange = await sim_manager(config, price)
+        levels = [manager.grid.price_of(i) for i in range(manager.grid.level_count)]
+        amount = config['amount_per_grid']
+
+        # Buy fills: contract + notification + sell placement + trade row each
+        t0 = time.perf_counter()
+        for i, level in enumerate(levels):
+            await manager.process_buy_fill(f"bench-buy-{i}", level, amount)
+        buy_s = time.perf_counter() - t0
+        contracts = manager.contract_book.active()
+        assert len(contracts) == N_FILLS and exchange.stats['orders'] == N_FILLS
+
+        # Sell fills: close + trade row + re-entry buy each
+        t0 = time.perf_counter()
+        for contract in contracts:
+            await manager.process_sell_fill(contract, contract.target_price, contract.buy_amount)
+        sell_s = time.perf_counter() - t0
+        assert not manager.contract_book.active()
+
+        # Burst: fills arriving together (the lock serializes them; DB writes can batch)
+        t0 = time.perf_counter()
+        await asyncio.gather(*(manager.process_buy_fill(f"bench-burst-{i}", level, amount)
+                               for i, level in enumerate(levels)))
+        burst_s = time.perf_counter() - t0
+
+    results = [
+        {'name': 'process_buy_fill', 'fills': N_FILLS, 'fills_per_sec': round(N_FILLS / buy_s, 1),
+         'us_per_fill': round(buy_s / N_FILLS * 1e6, 1)},
+        {'name': 'process_sell_fill', 'fills': N_FILLS, 'fills_per_sec': round(N_FILLS / sell_s, 1),
+         'us_per_fill': round(sell_s / N_FILLS * 1e6, 1)},
+        {'name': 'process_buy_fill_burst', 'fills': N_FILLS, 'fills_per_sec': round(N_FILLS / burst_s, 1),
+         'us_per_fill': round(burst_s / N_FILLS * 1e6, 1)},
+    ]
+    for r in results:
+        print(f"{r['name']:<24} | {r['fills_per_sec']:>9,.0f} fills/s | {r['us_per_fill']:>8,.0f} us/fill")
+    return results
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run())
@@ -0,0 +1,71 @@
+import asyncio
+import sys
+import time
+
+from harness import grid_config, sim_manager, temp_database, timed
+
+LEVEL_COUNTS = (100, 1_000, 10_000)
+REFILL_STEPS = 10  # Levels the price climbs for the incremental refill case
+
+async def _bench(levels: int) -> dict:
+    config = grid_config(levels)
+    price = (config['min_price'] + config['max_price']) / 2
+    manager, exchange = await sim_manager(config, price)
+
+    # Cold: every level at or below the price is empty and gets a buy
+    calls = exchange.stats['calls']
+    t0 = time.perf_counter()
+    await manager._fill_empty_grids()
+    cold_ms = round((time.perf_counter() - t0) * 1000, 3)
+    cold_calls = exchange.stats['calls'] - calls
+    placed = exchange.stats['orders']
+    # One order per placement plus one open-orders crawl (and at most a price fetch) per scan
+    assert cold_calls <= placed + 2, f"Cold scan made {cold_calls:,} REST calls for {placed:,} orders"
+
+    # Steady state: the periodic safety-net scan over a fully occupied grid
+    calls = exchange.stats['calls']
+    steady = await timed(manager._fill_empty_grids)
+    assert exchange.stats['orders'] == placed, "Steady-state scan must not place orders"
+    steady_calls = (exchange.stats['calls'] - calls) // steady['repeat']
+
+    result = dict({'name': f"fill_empty_grids_{levels}", 'levels': levels, 'orders_placed': placed,
+                   'cold_ms': cold_ms, 'cold_rest_calls': cold_calls, 'steady_rest_calls': steady_calls},
+                  **{f"steady_{k}": v for k, v in steady.items()})
+    print(f"{levels:>6} levels | cold {cold_ms:>9,.1f} ms ({placed:,} orders, {cold_calls:,} REST calls) | "
+          f"steady {steady['median_ms']:>8,.2f} ms ({steady_calls:,} REST calls)")
+    return result
+
+async def _bench_refill(levels: int) -> dict:
+    """Price climbs REFILL_STEPS levels over a grid full of resting buys: only the crossed levels are placed."""
+    config = grid_config(levels)
+    price = (config['min_price'] + config['max_price']) / 2
+    manager, exchange = await sim_manager(config, price)
+    await manager._fill_empty_grids()
+
+    placed, calls = exchange.stats['orders'], exchange.stats['calls']
+    t0 = time.perf_counter()
+    await manager._refill_incremental(price + config['grid_interval'] * REFILL_STEPS)
+    refill_ms = round((time.perf_counter() - t0) * 1000, 3)
+    refilled = exchange.stats['orders'] - placed
+    refill_calls = exchange.stats['calls'] - calls
+    assert refilled == REFILL_STEPS, f"Refill placed {refilled} orders, expected {REFILL_STEPS}"
+    assert refill_calls == refilled, f"Refill made {refill_calls} REST calls for {refilled} orders"
+
+    print(f"{levels:>6} levels | refill {refill_ms:>7,.2f} ms ({refilled} orders over {placed:,} resting, "
+          f"{refill_calls} REST calls)")
+    return {'name': f"refill_incremental_{levels}", 'levels': levels, 'resting_orders': placed,
+            'orders_placed': refilled, 'refill_ms': refill_ms, 'refill_rest_calls': refill_calls}
+
+async def run() -> list:
+    results = []
+    async with temp_database("grid.db"):
+        for levels in LEVEL_COUNTS:
+            results.append(await _bench(levels))
+        for levels in LEVEL_COUNTS:
+            results.append(await _bench_refill(levels))
+    return results
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run())
@@ -0,0 +1,40 @@
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.database import temp_database  # Re-exported for the bench scripts
+from modules.simulator import SimExchange, SimHandler
+from modules.trading_manager import TradingManager
+
+# 2,000,000+ KRW is one price-unit band (1,000), so any level count fits one exact ladder
+BENCH_TICKER = 'KRW-ETH'
+BENCH_MIN_PRICE = 2_000_000.0
+BENCH_INTERVAL = 1_000.0
+
+def grid_config(levels: int) -> dict:
+    return {'coin_ticker': BENCH_TICKER, 'min_price': BENCH_MIN_PRICE,
+            'max_price': BENCH_MIN_PRICE + BENCH_INTERVAL * (levels - 1),
+            'grid_interval': BENCH_INTERVAL, 'amount_per_grid': 0.01, 'profit_interval': BENCH_INTERVAL}
+
+async def sim_manager(config: dict, price: float):
+    """TradingManager wired to a simulated exchange at `price` (no streams, no engine)."""
+    quote, base = config['coin_ticker'].split('-')
+    exchange = SimExchange(balances={quote: 1e15, base: 1e9})
+    exchange.set_price(config['coin_ticker'], price)
+    manager = TradingManager(SimHandler(exchange))
+    manager.config = dict(config)
+    await manager.contract_book.load()
+    manager._build_grid()
+    return manager, exchange
+
+async def timed(fn, repeat: int = 5) -> dict:
+    """Run `await fn()` `repeat` times; wall-clock stats in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {'min_ms': round(min(samples), 3), 'median_ms': round(statistics.median(samples), 3),
+            'mean_ms': round(statistics.fmean(samples), 3), 'repeat': repeat}
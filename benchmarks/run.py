@@ -0,0 +1,106 @@
+"""
+Run the benchmark suites and write a JSON report.
+
+    python benchmarks/run.py                          # all suites -> benchmarks/results/<commit>.json
+    python benchmarks/run.py --only grid,fills
+    python benchmarks/run.py --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+SUITES = {
+    'db': 'bench_db',
+    'grid': 'bench_grid',
+    'fills': 'bench_fills',
+    'contracts': 'bench_contracts',
+    'embeds': 'bench_embeds',
+}
+# Measured keys (the rest of a result row describes the scenario)
+LOWER_IS_BETTER = ('_ms', 'us_per_fill')
+HIGHER_IS_BETTER = ('_qps', '_per_sec')
+
+def _git(*args) -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', *args], cwd=BENCH_DIR, stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def metadata() -> Dict:
+    return {
+        'commit': _git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+async def run_suites(names) -> Dict[str, list]:
+    results = {}
+    for name in names:
+        print(f"\n=== {name} ===")
+        module = importlib.import_module(SUITES[name])
+        results[name] = await module.run()
+    return results
+
+def compare(old: Dict, new: Dict):
+    """Print per-metric change vs an earlier report (+ is better)."""
+    print(f"\n=== {old['meta'].get('commit')} -> {new['meta'].get('commit')} ===")
+    for suite, rows in new['results'].items():
+        old_rows = {r['name']: r for r in old['results'].get(suite, [])}
+        for row in rows:
+            before = old_rows.get(row['name'])
+            if not before:
+                continue
+            for key, value in row.items():
+                prev = before.get(key)
+                lower = key.endswith(LOWER_IS_BETTER)
+                if not (lower or key.endswith(HIGHER_IS_BETTER)) or not value or not prev:
+                    continue
+                change = (value - prev) / prev * 100
+                if lower:
+                    change = -change
+                flag = "  <-- regression" if change < -10 else ""
+                print(f"{suite:<10} {row['name']:<32} {key:<18} {prev:>12,.3f} -> {value:>12,.3f} ({change:+6.1f}%){flag}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run benchmarks and write a JSON report")
+    parser.add_argument('--only', help=f"Comma-separated suites ({','.join(SUITES)})")
+    parser.add_argument('--output', help="Report path (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="Earlier report to diff against")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(',') if args.only else list(SUITES)
+    unknown = [n for n in names if n not in SUITES]
+    if unknown:
+        parser.error(f"Unknown suite(s): {unknown}")
+
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    report = {'meta': metadata(), 'results': asyncio.run(run_suites(names))}
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        suffix = "-dirty" if report['meta']['dirty'] else ""
+        output = os.path.join(RESULTS_DIR, f"{report['meta']['commit'] or 'unknown'}{suffix}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f"\nReport written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
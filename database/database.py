@@ -1,52 +1,212 @@
+import os
 import sqlite3
 import asyncio
 import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional, Set
+
+from modules.latency import recorder as latency
 
 logger = logging.getLogger("TradingSystem")
 DB_FILE = "trading.db"
 
+READER_POOL_SIZE = 4      # Number of long-lived reader connections (one per reader thread)
+WRITE_BATCH_SIZE = 256    # Max queued writes grouped into a single transaction
+NOTIFY_OUTBOX_MAX = 1000  # Unsent Discord notifications kept; older ones are dropped
+
 def get_connection():
     """Returns a synchronous sqlite3 connection."""
     conn = sqlite3.connect(DB_FILE, check_same_thread=False)
     conn.row_factory = sqlite3.Row
     return conn
 
-async def execute_write(sql: str, params: tuple = ()) -> int:
-    """Execute INSERT/UPDATE/DELETE. Returns lastrowid."""
-    loop = asyncio.get_running_loop()
-    def _task():
-        conn = get_connection()
+def _open_connection(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=FULL;")  # fsync per commit; the writer batches commits (order journal)
+    conn.execute("PRAGMA busy_timeout=5000;")
+    return conn
+
+
+class _ConnectionPool:
+    """
+    Long-lived connection layer.
+
+    - Writes go through an asyncio queue to ONE dedicated writer connection.
+      Whatever is queued when the writer wakes up is committed as one transaction.
+    - Reads run on a small thread pool; each reader thread keeps its own connection.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._reader_executor = ThreadPoolExecutor(max_workers=READER_POOL_SIZE, thread_name_prefix="db-reader")
+        self._writer_conn: Optional[sqlite3.Connection] = None
+        self._reader_local = threading.local()
+        self._reader_conns = []
+        self._reader_conns_lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._loop = None
+
+    # --- Reader side ---
+    def _reader_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._reader_local, "conn", None)
+        if conn is None:
+            conn = _open_connection(self.path)
+            self._reader_local.conn = conn
+            with self._reader_conns_lock:
+                self._reader_conns.append(conn)
+        return conn
+
+    async def read(self, sql: str, params: tuple, fetch_all: bool):
+        def _task():
+            conn = self._reader_connection()
+            try:
+                cursor = conn.execute(sql, params)
+                if fetch_all:
+                    return [dict(row) for row in cursor.fetchall()]
+                row = cursor.fetchone()
+                return dict(row) if row else None
+            except Exception as e:
+                logger.error(f"DB Read Error: {e}\nSQL: {sql}\nParams: {params}")
+                raise
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._reader_executor, _task)
+
+    # --- Writer side ---
+    def _ensure_writer(self):
+        loop = asyncio.get_running_loop()
+        # A new event loop (e.g. a second asyncio.run) needs a fresh queue/task
+        if self._loop is not loop or self._writer_task is None or self._writer_task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._writer_task = loop.create_task(self._writer_loop())
+
+    async def write(self, sql: str, params: tuple) -> int:
+        self._ensure_writer()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((sql, params, future))
+        return await future
+
+    async def _writer_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < WRITE_BATCH_SIZE and not self._queue.empty():
+                nxt = self._queue.get_nowait()
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+
+            statements = [(sql, params) for sql, params, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._writer_executor, self._apply_batch, statements)
+            except Exception as e:
+                results = [(False, e)] * len(batch)
+
+            for (_, _, future), (ok, value) in zip(batch, results):
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+            if stop:
+                return
+
+    def _apply_batch(self, statements):
+        """Runs on the writer thread. Commits the whole batch as one transaction."""
+        if self._writer_conn is None:
+            self._writer_conn = _open_connection(self.path)
+        conn = self._writer_conn
         try:
-            conn.execute("PRAGMA journal_mode=WAL;")
-            cursor = conn.execute(sql, params)
+            results = [(True, conn.execute(sql, params).lastrowid) for sql, params in statements]
             conn.commit()
-            return cursor.lastrowid
+            return results
         except Exception as e:
-            logger.error(f"DB Write Error: {e}\nSQL: {sql}\nParams: {params}")
-            raise
-        finally:
-            conn.close()
-    return await loop.run_in_executor(None, _task)
+            conn.rollback()
+            if len(statements) == 1:
+                sql, params = statements[0]
+                logger.error(f"DB Write Error: {e}\nSQL: {sql}\nParams: {params}")
+                return [(False, e)]
+
+        # One bad statement must not fail its neighbours: replay one by one
+        results = []
+        for sql, params in statements:
+            try:
+                cursor = conn.execute(sql, params)
+                conn.commit()
+                results.append((True, cursor.lastrowid))
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"DB Write Error: {e}\nSQL: {sql}\nParams: {params}")
+                results.append((False, e))
+        return results
+
+    async def close(self):
+        if self._writer_task and not self._writer_task.done() and self._loop is asyncio.get_running_loop():
+            await self._queue.put(None)
+            await self._writer_task
+        self._writer_task = None
+
+        def _close_writer():
+            if self._writer_conn is not None:
+                self._writer_conn.close()
+                self._writer_conn = None
+        await asyncio.get_running_loop().run_in_executor(self._writer_executor, _close_writer)
+        self._writer_executor.shutdown(wait=True)
+        self._reader_executor.shutdown(wait=True)
+        with self._reader_conns_lock:
+            for conn in self._reader_conns:
+                conn.close()
+            self._reader_conns.clear()
+
+
+_pool: Optional[_ConnectionPool] = None
+_retiring: Set[asyncio.Task] = set()  # Closes of pools left behind by a DB_FILE swap
+
+def _get_pool() -> _ConnectionPool:
+    global _pool
+    # DB_FILE may be swapped (tests/benchmarks); reopen against the new path.
+    # The old pool still owns a writer task, executor threads and connections: close it
+    # (its queued writes are flushed first). temp_database/close_db do this in order.
+    if _pool is not None and _pool.path != DB_FILE:
+        task = asyncio.get_running_loop().create_task(_pool.close())
+        _retiring.add(task)
+        task.add_done_callback(_retiring.discard)
+        _pool = None
+    if _pool is None:
+        _pool = _ConnectionPool(DB_FILE)
+    return _pool
+
+async def close_db():
+    """Flush pending writes and close all pooled connections."""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+    if _retiring:
+        await asyncio.gather(*_retiring)
+
+async def execute_write(sql: str, params: tuple = ()) -> int:
+    """Execute INSERT/UPDATE/DELETE. Returns lastrowid."""
+    with latency.call('db.write'):  # Queue wait + batch commit
+        return await _get_pool().write(sql, params)
 
 async def execute_read(sql: str, params: tuple = (), fetch_all: bool = False):
     """Execute SELECT. Returns dict or list of dicts."""
-    loop = asyncio.get_running_loop()
-    def _task():
-        conn = get_connection()
-        try:
-            conn.execute("PRAGMA journal_mode=WAL;")
-            cursor = conn.execute(sql, params)
-            if fetch_all:
-                return [dict(row) for row in cursor.fetchall()]
-            else:
-                row = cursor.fetchone()
-                return dict(row) if row else None
-        except Exception as e:
-            logger.error(f"DB Read Error: {e}\nSQL: {sql}\nParams: {params}")
-            raise
-        finally:
-            conn.close()
-    return await loop.run_in_executor(None, _task)
+    with latency.call('db.read'):
+        return await _get_pool().read(sql, params, fetch_all)
 
 async def init_db():
     """Initializes the database."""
@@ -99,6 +259,47 @@ async def init_db():
                 )
             """)
             
+            # Notification Outbox (drained by modules.notifier)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS notifications (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    ticker TEXT,
+                    price REAL,
+                    volume REAL,
+                    profit REAL,
+                    message TEXT NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # Bounded: each insert drops whatever falls out of the newest NOTIFY_OUTBOX_MAX ids
+            conn.execute("DROP TRIGGER IF EXISTS notifications_bound;")
+            conn.execute(f"""
+                CREATE TRIGGER notifications_bound AFTER INSERT ON notifications
+                BEGIN
+                    DELETE FROM notifications WHERE id <= NEW.id - {NOTIFY_OUTBOX_MAX};
+                END
+            """)
+
+            # Order Intent Journal (modules.order_journal)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS order_intents (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    identifier TEXT NOT NULL UNIQUE, -- Client order id sent with the order
+                    coin_ticker TEXT NOT NULL,
+                    side TEXT NOT NULL, -- bid | ask
+                    price REAL NOT NULL,
+                    volume REAL NOT NULL,
+                    ref TEXT, -- ask: buy_order_uuid of the contract being sold
+                    uuid TEXT,
+                    state TEXT NOT NULL, -- INTENT | ACKED | FILLED | FAILED | CANCELED
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_intents_state ON order_intents(coin_ticker, state);")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_intents_uuid ON order_intents(uuid);")
+
             conn.execute("CREATE INDEX IF NOT EXISTS idx_contracts_status ON contracts(status);")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_contracts_uuid ON contracts(order_uuid);")
             conn.commit()
@@ -107,6 +308,24 @@ async def init_db():
             conn.close()
     await loop.run_in_executor(None, _init)
 
+@asynccontextmanager
+async def temp_database(name: str = "temp.db"):
+    """
+    Point the DB layer at a fresh file for the duration of the block (tests, benchmarks,
+    simulator runs), so fake contracts, notifications and order intents never land in
+    the live trading.db.
+    """
+    global DB_FILE
+    original = DB_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        DB_FILE = os.path.join(tmp, name)
+        try:
+            await init_db()
+            yield DB_FILE
+        finally:
+            await close_db()
+            DB_FILE = original
+
 async def set_config(key: str, value: str):
     await execute_write("""
         INSERT INTO config (key, value, updated_at) 
@@ -7,10 +7,14 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from modules.utils import setup_logger
-from database.database import init_db
+from database.database import init_db, close_db
 from modules.upbit_handler import UpbitHandler
 from modules.trading_manager import TradingManager
+from modules.portfolio import Portfolio
 from modules.discord_bot import DiscordBot
+from modules import metrics
+from modules.loop_monitor import lag_monitor
+from modules.notifier import outbox
 
 logger = setup_logger()
 
@@ -32,9 +36,22 @@ async def main():
     
     # 3. Initialize Components
     handler = UpbitHandler(access_key, secret_key)
-    manager = TradingManager(handler)
+    # PORTFOLIO_MODE=1: one grid per ticker, many tickers in this process
+    if os.getenv("PORTFOLIO_MODE", "0") == "1":
+        manager = Portfolio(handler)
+        logger.info("Portfolio mode enabled.")
+    else:
+        manager = TradingManager(handler)
     bot = DiscordBot(manager)
 
+    # Always-on event-loop lag sampler (warns on stalls; /프로파일 digs into them)
+    lag_monitor.start()
+
+    # METRICS_PORT=<port>: Prometheus endpoint on localhost (off by default)
+    metrics_server = metrics.from_env(manager)
+    if metrics_server:
+        await metrics_server.start()
+
     # 4. State Recovery & Startup Check
     # We should run recovery once before accepting commands
     try:
@@ -56,8 +73,16 @@ async def main():
     # For now, let's keep it manual start via Discord for safety.
     
     # Start Bot
-    async with bot:
-        await bot.start(discord_token)
+    try:
+        async with bot:
+            await bot.start(discord_token)
+    finally:
+        lag_monitor.stop()
+        await outbox.stop()  # Unsent notifications stay in the DB for the next run
+        if metrics_server:
+            await metrics_server.stop()
+        await handler.close()
+        await close_db()
 
 if __name__ == "__main__":
     if sys.platform == 'win32':
@@ -37,8 +37,12 @@ class Contract:
         return contract
 
     @classmethod
-    async def get_active_contracts(cls) -> List['Contract']:
-        rows = await execute_read("SELECT * FROM contracts WHERE status = 'ACTIVE'", fetch_all=True)
+    async def get_active_contracts(cls, coin_ticker: Optional[str] = None) -> List['Contract']:
+        if coin_ticker:
+            rows = await execute_read("SELECT * FROM contracts WHERE status = 'ACTIVE' AND coin_ticker = ?",
+                                      (coin_ticker,), fetch_all=True)
+        else:
+            rows = await execute_read("SELECT * FROM contracts WHERE status = 'ACTIVE'", fetch_all=True)
         contracts = []
         for row in rows:
             contracts.append(cls(
@@ -76,6 +80,7 @@ class Contract:
                 target_price=row['target_price'],
                 status=row['status'],
                 order_uuid=row['order_uuid'],
+                buy_order_uuid=row['buy_order_uuid'],
                 created_at=row['created_at'],
                 sell_price=row['sell_price'],
                 profit=row['profit'],
@@ -84,6 +89,10 @@ class Contract:
             )
         return None
 
+    @classmethod
+    async def update_order_uuid(cls, contract_id: int, order_uuid: str):
+        await execute_write("UPDATE contracts SET order_uuid = ? WHERE id = ?", (order_uuid, contract_id))
+
     @classmethod
     async def close_contract(cls, contract_id: int, sell_price: float, profit: float, profit_rate: float):
         await execute_write("""
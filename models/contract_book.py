@@ -0,0 +1,116 @@
+import logging
+from typing import Dict, List, Optional, Set
+
+from models.contract import Contract
+from database.database import execute_read
+
+logger = logging.getLogger("TradingSystem")
+
+# Fields compared by the consistency check (cache vs DB)
+_CHECK_FIELDS = ('coin_ticker', 'buy_price', 'buy_amount', 'target_price', 'status', 'order_uuid', 'buy_order_uuid')
+
+class ContractBook:
+    """
+    Authoritative in-memory book of ACTIVE contracts.
+
+    Loaded once from SQLite, then updated in place by the trading logic.
+    Every mutation is written through to the DB first, so SQLite stays the durable copy
+    while hot-path reads never touch the disk.
+    """
+
+    def __init__(self, coin_ticker: Optional[str] = None):
+        self.coin_ticker = coin_ticker  # Only this ticker's contracts (portfolio grids); None = all
+        self._by_id: Dict[int, Contract] = {}
+        self._id_by_order_uuid: Dict[str, int] = {}
+        self._known_buy_uuids: Set[str] = set()  # Active + closed during this session
+        self.loaded = False
+
+    async def load(self):
+        """(Re)load all ACTIVE contracts (of this book's ticker) from the DB."""
+        contracts = await Contract.get_active_contracts(self.coin_ticker)
+        self._by_id.clear()
+        self._id_by_order_uuid.clear()
+        self._known_buy_uuids.clear()
+        for contract in contracts:
+            self._index(contract)
+        self.loaded = True
+        logger.info(f"ContractBook loaded: {len(self._by_id)} active contract(s).")
+
+    def _index(self, contract: Contract):
+        self._by_id[contract.id] = contract
+        if contract.order_uuid:
+            self._id_by_order_uuid[contract.order_uuid] = contract.id
+        if contract.buy_order_uuid:
+            self._known_buy_uuids.add(contract.buy_order_uuid)
+
+    # --- Reads (memory only) ---
+    def active(self) -> List[Contract]:
+        return list(self._by_id.values())
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, contract_id: int) -> Optional[Contract]:
+        return self._by_id.get(contract_id)
+
+    def get_by_order_uuid(self, uuid: str) -> Optional[Contract]:
+        contract_id = self._id_by_order_uuid.get(uuid)
+        return self._by_id.get(contract_id) if contract_id is not None else None
+
+    async def exists_buy_uuid(self, uuid: str) -> bool:
+        """Memory first; falls back to the DB for contracts closed before this session."""
+        if uuid in self._known_buy_uuids:
+            return True
+        if await Contract.exists_buy_uuid(uuid):
+            self._known_buy_uuids.add(uuid)
+            return True
+        return False
+
+    # --- Writes (write-through) ---
+    async def add(self, contract: Contract) -> Contract:
+        created = await Contract.create(contract)
+        self._index(created)
+        return created
+
+    async def set_order_uuid(self, contract: Contract, order_uuid: str):
+        await Contract.update_order_uuid(contract.id, order_uuid)
+        cached = self._by_id.get(contract.id, contract)
+        if cached.order_uuid:
+            self._id_by_order_uuid.pop(cached.order_uuid, None)
+        cached.order_uuid = order_uuid
+        contract.order_uuid = order_uuid
+        self._id_by_order_uuid[order_uuid] = contract.id
+
+    async def close(self, contract: Contract, sell_price: float, profit: float, profit_rate: float):
+        await Contract.close_contract(contract.id, sell_price, profit, profit_rate)
+        cached = self._by_id.pop(contract.id, None)
+        if cached and cached.order_uuid:
+            self._id_by_order_uuid.pop(cached.order_uuid, None)
+        contract.status = "CLOSED"
+        contract.sell_price = sell_price
+        contract.profit = profit
+        contract.profit_rate = profit_rate
+
+    # --- Consistency check ---
+    async def verify(self) -> dict:
+        """
+        Diff the cache against the DB.
+        Returns {'missing_in_cache': [ids], 'missing_in_db': [ids], 'mismatched': {id: [fields]}}.
+        """
+        rows = await execute_read("SELECT * FROM contracts WHERE status = 'ACTIVE'", fetch_all=True)
+        db_rows = {row['id']: row for row in rows
+                   if not self.coin_ticker or row['coin_ticker'] == self.coin_ticker}
+
+        missing_in_cache = sorted(set(db_rows) - set(self._by_id))
+        missing_in_db = sorted(set(self._by_id) - set(db_rows))
+        mismatched = {}
+        for contract_id in set(db_rows) & set(self._by_id):
+            cached = self._by_id[contract_id]
+            diff = [f for f in _CHECK_FIELDS if getattr(cached, f) != db_rows[contract_id][f]]
+            if diff:
+                mismatched[contract_id] = diff
+
+        report = {'missing_in_cache': missing_in_cache, 'missing_in_db': missing_in_db, 'mismatched': mismatched}
+        if missing_in_cache or missing_in_db or mismatched:
+            logger.warning(f"⚠️ [ContractBook] Cache/DB mismatch: {report}")
+        return report
@@ -0,0 +1,203 @@
+import argparse
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+
+from modules.grid_ladder import GridLadder, sell_target_price
+
+UPBIT_FEE_RATE = 0.0005  # 0.05% per side on KRW markets
+
+# Fill record layout
+FILL_DTYPE = np.dtype([('t', np.int64), ('level', np.int32), ('side', np.int8), ('price', np.float64)])
+BUY, SELL = 1, -1
+
+@dataclass
+class BacktestResult:
+    buys: int
+    sells: int
+    realized_pnl: float        # Closed round trips, after fees
+    fees: float
+    unrealized_pnl: float      # Open inventory marked at the last price (buy fee already paid)
+    final_inventory: float
+    max_inventory: float
+    max_capital: float         # Peak quote currency tied up (positions at cost + resting bids)
+    avg_capital: float
+    fills: np.ndarray = field(repr=False)        # FILL_DTYPE, time-ordered
+    inventory: np.ndarray = field(repr=False)    # Base units held after each tick
+    capital: np.ndarray = field(repr=False)      # Quote tied up after each tick
+
+    @property
+    def return_on_capital(self) -> float:
+        """Realized PnL per unit of peak capital locked."""
+        return self.realized_pnl / self.max_capital if self.max_capital else 0.0
+
+    def summary(self) -> Dict:
+        return {
+            'buys': self.buys,
+            'sells': self.sells,
+            'realized_pnl': round(self.realized_pnl, 4),
+            'fees': round(self.fees, 4),
+            'unrealized_pnl': round(self.unrealized_pnl, 4),
+            'final_inventory': self.final_inventory,
+            'max_inventory': self.max_inventory,
+            'max_capital': round(self.max_capital, 2),
+            'avg_capital': round(self.avg_capital, 2),
+            'return_on_capital': round(self.return_on_capital, 6),
+        }
+
+
+def candles_to_path(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    Expand OHLC candles into a 4-point price path per bar.
+    Up bars are walked open -> low -> high -> close, down bars open -> high -> low -> close
+    (the usual assumption when the intra-bar order is unknown).
+    """
+    up = close >= open_
+    path = np.empty((len(open_), 4), dtype=np.float64)
+    path[:, 0] = open_
+    path[:, 1] = np.where(up, low, high)
+    path[:, 2] = np.where(up, high, low)
+    path[:, 3] = close
+    return path.ravel()
+
+
+def level_events(prices: np.ndarray, level: float, target: float, start_price: float):
+    """
+    Fill times of one grid level (ticks where its buy / sell fills).
+
+    A level is a two-state machine: resting buy at `level`, or holding with a sell at
+    `target`. That is plain hysteresis, so the state changes are the points where the
+    sequence of "price <= level" / "price >= target" signals switches value; no Python
+    loop over ticks is needed. A level above the start price only gets its buy once
+    the price has traded up to it (as _fill_empty_grids only fills levels <= price).
+    """
+    buy_hit = prices <= level
+    sell_hit = prices >= target
+    start = 0
+    if level > start_price:
+        armed = np.flatnonzero(prices >= level)
+        if len(armed) == 0:
+            return None, None, -1
+        start = armed[0] + 1  # Order is placed at the crossing, can fill from the next tick
+    signal_idx = np.flatnonzero(buy_hit[start:] | sell_hit[start:]) + start
+    if len(signal_idx) == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64), (start - 1 if start else 0)
+    signal = np.where(buy_hit[signal_idx], BUY, SELL).astype(np.int8)
+    # Initial state: waiting to buy (same as after a sell)
+    prev = np.concatenate(([SELL], signal[:-1]))
+    changes = signal_idx[signal != prev]
+    kinds = signal[signal != prev]
+    return changes[kinds == BUY], changes[kinds == SELL], (start - 1 if start else 0)
+
+
+def simulate_grid(prices: np.ndarray, levels: np.ndarray, targets: np.ndarray, amount: float,
+                  fee_rate: float = UPBIT_FEE_RATE, keep_fills: bool = True) -> BacktestResult:
+    """
+    Replay a price path through the grid rules of TradingManager:
+    buy at each level, sell at its target, re-enter the buy after every sell.
+    Limit orders fill when the price touches them.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    n = len(prices)
+    start_price = prices[0]
+    inv_delta = np.zeros(n + 1)
+    cap_delta = np.zeros(n + 1)
+    fill_parts = []
+    buys = sells = 0
+    realized = fees = unrealized = 0.0
+    last_price = prices[-1]
+
+    for i, (level, target) in enumerate(zip(levels, targets)):
+        buy_t, sell_t, armed_t = level_events(prices, level, target, start_price)
+        if buy_t is None:
+            continue  # Never armed
+        cost = level * amount
+        # Capital: resting bid from arming, moves into the position on buy, back to a bid on sell
+        cap_delta[armed_t] += cost
+        if len(buy_t):
+            np.add.at(inv_delta, buy_t, amount)
+            np.add.at(inv_delta, sell_t, -amount)
+            n_buys, n_sells = len(buy_t), len(sell_t)
+            buys += n_buys
+            sells += n_sells
+            buy_fee = cost * fee_rate
+            sell_fee = target * amount * fee_rate
+            realized += n_sells * ((target - level) * amount - buy_fee - sell_fee)
+            fees += n_sells * (buy_fee + sell_fee) + (n_buys - n_sells) * buy_fee
+            if n_buys > n_sells:  # Still holding at the end
+                unrealized += (last_price - level) * amount - buy_fee
+            if keep_fills:
+                part = np.empty(n_buys + n_sells, dtype=FILL_DTYPE)
+                part['t'][:n_buys], part['t'][n_buys:] = buy_t, sell_t
+                part['side'][:n_buys], part['side'][n_buys:] = BUY, SELL
+                part['price'][:n_buys], part['price'][n_buys:] = level, target
+                part['level'] = i
+                fill_parts.append(part)
+
+    inventory = np.cumsum(inv_delta[:n])
+    capital = np.cumsum(cap_delta[:n])
+    if fill_parts:
+        fills = np.concatenate(fill_parts)
+        fills = fills[np.argsort(fills['t'], kind='stable')]
+    else:
+        fills = np.empty(0, dtype=FILL_DTYPE)
+
+    return BacktestResult(
+        buys=buys, sells=sells, realized_pnl=realized, fees=fees, unrealized_pnl=unrealized,
+        final_inventory=float(inventory[-1]) if n else 0.0,
+        max_inventory=float(inventory.max()) if n else 0.0,
+        max_capital=float(capital.max()) if n else 0.0,
+        avg_capital=float(capital.mean()) if n else 0.0,
+        fills=fills, inventory=inventory, capital=capital,
+    )
+
+
+def grid_arrays(config: Dict):
+    """Level prices and sell targets for a TradingManager config (same ladder + tick rounding)."""
+    ladder = GridLadder.from_config(config)
+    ticker = config['coin_ticker']
+    profit = config.get('profit_interval', 3.0)
+    levels = np.array(ladder.prices, dtype=np.float64)
+    targets = np.array([sell_target_price(ticker, p, profit) for p in ladder.prices], dtype=np.float64)
+    return levels, targets
+
+
+def run_backtest(config: Dict, prices: np.ndarray, fee_rate: float = UPBIT_FEE_RATE) -> BacktestResult:
+    """Backtest a `!시작` wizard config over a tick path (or candles_to_path output)."""
+    levels, targets = grid_arrays(config)
+    return simulate_grid(prices, levels, targets, float(config['amount_per_grid']), fee_rate)
+
+
+def load_prices(path: str) -> np.ndarray:
+    """.npy of trade prices (memory-mapped), or .csv with open,high,low,close columns."""
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    ohlc = np.genfromtxt(path, delimiter=',', names=True)
+    return candles_to_path(ohlc['open'], ohlc['high'], ohlc['low'], ohlc['close'])
+
+
+def main(argv: Optional[list] = None):
+    """python -m modules.backtest prices.npy --min 1400 --max 1500 --interval 5 --amount 10"""
+    parser = argparse.ArgumentParser(description="Grid backtest over a price path")
+    parser.add_argument('prices', help=".npy of trade prices, or .csv with open,high,low,close columns")
+    parser.add_argument('--ticker', default='KRW-USDT')
+    parser.add_argument('--min', type=float, required=True, dest='min_price')
+    parser.add_argument('--max', type=float, required=True, dest='max_price')
+    parser.add_argument('--interval', type=float, required=True)
+    parser.add_argument('--amount', type=float, required=True)
+    parser.add_argument('--profit', type=float, default=3.0)
+    parser.add_argument('--fee', type=float, default=UPBIT_FEE_RATE)
+    args = parser.parse_args(argv)
+
+    prices = load_prices(args.prices)
+
+    config = {'coin_ticker': args.ticker, 'min_price': args.min_price, 'max_price': args.max_price,
+              'grid_interval': args.interval, 'amount_per_grid': args.amount, 'profit_interval': args.profit}
+    result = run_backtest(config, prices, args.fee)
+    for key, value in result.summary().items():
+        print(f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import logging
 import asyncio
 from typing import Optional
 from modules.trading_manager import TradingManager
+from modules.notifier import outbox
 from models.contract import Contract
 from database.database import get_config
 
@@ -63,7 +64,8 @@ class TradingBotCog(commands.Cog):
     async def cmd_start(self, ctx):
         if not await self.is_admin(ctx): return
 
-        if self.trading_manager.is_running:
+        # Portfolio mode: grids for other tickers can be added while some are running
+        if self.trading_manager.is_running and not getattr(self.trading_manager, 'multi_grid', False):
             await ctx.send("이미 트레이딩이 진행 중입니다.")
             return
 
@@ -117,7 +119,7 @@ class TradingBotCog(commands.Cog):
             
             # Validate Balance
             validation = await self.trading_manager.validate_balance(
-                ticker, grid_count, amount_per_grid, min_price, max_price
+                ticker, grid_count, amount_per_grid, min_price, max_price, grid_interval
             )
             
             await ctx.send(validation['message'])
@@ -163,12 +165,42 @@ class TradingBotCog(commands.Cog):
             await ctx.send(f"설정 중 오류가 발생했습니다: {e}")
 
     @commands.command(name="종료")
-    async def cmd_stop(self, ctx):
+    async def cmd_stop(self, ctx, ticker: str = None):
         if not await self.is_admin(ctx): return
         
+        # 포트폴리오 모드: '!종료 KRW-BTC' 는 해당 그리드만 중단
+        if ticker and getattr(self.trading_manager, 'multi_grid', False):
+            if await self.trading_manager.remove_grid(ticker.upper()):
+                await ctx.send(f"🛑 {ticker.upper()} 그리드가 중단되었습니다.")
+            else:
+                await ctx.send(f"{ticker.upper()} 그리드는 실행 중이 아닙니다.")
+            return
+
         await self.trading_manager.stop_trading()
         await ctx.send("🛑 트레이딩이 중단되었습니다.")
 
+    @commands.command(name="포트폴리오")
+    async def cmd_portfolio(self, ctx):
+        if not await self.is_admin(ctx): return
+
+        if not getattr(self.trading_manager, 'multi_grid', False):
+            await ctx.send("포트폴리오 모드가 아닙니다. (PORTFOLIO_MODE=1)")
+            return
+
+        rows = self.trading_manager.summary()
+        if not rows:
+            await ctx.send("등록된 그리드가 없습니다.")
+            return
+
+        msg = "**포트폴리오 현황**\n```\n"
+        msg += f"{'Ticker':<10} | {'Run':<3} | {'Price':<12} | {'Contracts':<9} | {'Pending':<7}\n"
+        msg += "-"*52 + "\n"
+        for row in rows:
+            price = row['price'] if row['price'] is not None else '-'
+            msg += f"{row['ticker']:<10} | {'ON' if row['running'] else 'OFF':<3} | {price:<12} | {row['contracts']:<9} | {row['pending']:<7}\n"
+        msg += "```"
+        await ctx.send(msg)
+
     @commands.command(name="상태")
     async def cmd_status(self, ctx):
         if not await self.is_admin(ctx): return
@@ -233,10 +265,10 @@ class DiscordBot(commands.Bot):
 
     async def send_notification(self, message: str):
         channel = self.get_channel(self.target_channel_id)
-        if channel:
-            await channel.send(message)
-        else:
-            logger.warning("Target channel not found for notification.")
+        if channel is None:
+            # Raise so the outbox keeps the message and retries (e.g. before on_ready)
+            raise RuntimeError("Target channel not found for notification.")
+        await channel.send(message)
 
     async def setup_hook(self):
         # Load Cogs
@@ -258,6 +290,7 @@ class DiscordBot(commands.Bot):
     async def on_ready(self):
         logger.info(f'Logged in as {self.user} (ID: {self.user.id})')
         logger.info('------')
+        outbox.start()  # Sends what queued up while offline, then drains fills as they come
         channel = self.get_channel(self.target_channel_id)
         if channel:
             await channel.send("🚀 업비트 그리드 트레이딩 봇이 시작되었습니다.")
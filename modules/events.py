@@ -0,0 +1,57 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict
+
+# Timer kinds
+RECONCILE_FILLS = "reconcile_fills"   # REST fill polling (fallback for the private stream)
+SELF_HEAL = "self_heal"               # Balance vs contract sync
+REFILL_GRID = "refill_grid"           # Full grid scan only (fills were reconciled elsewhere)
+
+@dataclass
+class PriceTick:
+    ticker: str
+    price: float
+
+@dataclass
+class OrderEvent:
+    data: Dict  # myOrder payload from the private WebSocket
+    received: float = field(default_factory=time.perf_counter)  # Fill detection time (latency spans)
+
+@dataclass
+class TimerEvent:
+    kind: str
+
+
+class EventQueue:
+    """
+    asyncio queue for the trading engine.
+    Price ticks are coalesced per ticker: if a tick is already waiting, a newer one only
+    replaces its price, so a burst of ticks costs one handler call with the latest price.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._pending_ticks: Dict[str, PriceTick] = {}
+
+    def put(self, event):
+        if isinstance(event, PriceTick):
+            if event.ticker in self._pending_ticks:
+                self._pending_ticks[event.ticker] = event
+                return
+            self._pending_ticks[event.ticker] = event
+        self._queue.put_nowait(event)
+
+    async def get(self):
+        event = await self._queue.get()
+        if isinstance(event, PriceTick):
+            event = self._pending_ticks.pop(event.ticker, event)
+        return event
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def clear(self):
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._pending_ticks.clear()
@@ -0,0 +1,125 @@
+import logging
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+from modules.grid_ladder import GridLadder
+
+logger = logging.getLogger("TradingSystem")
+
+# Level states (priority order when several sources occupy the same level)
+EMPTY = 0
+OPEN_ORDER = 1       # Open buy order seen on the exchange
+PENDING_BUY = 2      # Buy order tracked locally (pending_buy_orders)
+ACTIVE_CONTRACT = 3  # Bought, waiting for the sell to fill
+
+STATE_NAMES = {EMPTY: "EMPTY", OPEN_ORDER: "OPEN", PENDING_BUY: "PENDING", ACTIVE_CONTRACT: "CONTRACT"}
+
+class GridOccupancy:
+    """
+    Occupancy index keyed by integer grid level (index into a GridLadder).
+
+    Each source (contracts, pending buys, exchange open orders) keeps a per-level
+    counter, so a lookup is O(1) and every update only touches the levels that changed.
+    """
+
+    def __init__(self, ladder: GridLadder):
+        self.ladder = ladder
+        self.level_count = ladder.level_count
+
+        self._contracts = [0] * self.level_count
+        self._pending = [0] * self.level_count
+        self._open = [0] * self.level_count
+        self._contract_levels: Dict[int, int] = {}   # contract_id -> level
+        self._pending_levels: Dict[str, int] = {}    # order uuid -> level
+        self._open_levels: Dict[str, int] = {}       # exchange order uuid -> level
+        self._freed: Set[int] = set()                # levels that became EMPTY since take_freed()
+
+    # --- Price <-> level ---
+    def level_of(self, price) -> Optional[int]:
+        """Level index for a price on the grid, or None if the price is off-grid/out of range."""
+        return self.ladder.level_of(price)
+
+    def price_of(self, level: int) -> float:
+        return self.ladder.price_of(level)
+
+    def highest_level_at_or_below(self, price) -> int:
+        """Highest level whose price is <= price (-1 if price is below the grid)."""
+        return self.ladder.highest_level_at_or_below(price)
+
+    # --- Lookups ---
+    def state(self, level: int) -> int:
+        if self._contracts[level]:
+            return ACTIVE_CONTRACT
+        if self._pending[level]:
+            return PENDING_BUY
+        if self._open[level]:
+            return OPEN_ORDER
+        return EMPTY
+
+    def is_free(self, level: int) -> bool:
+        return not (self._contracts[level] or self._pending[level] or self._open[level])
+
+    def is_price_free(self, price: float) -> bool:
+        level = self.level_of(price)
+        return level is None or self.is_free(level)
+
+    def free_levels(self, levels: Iterable[int]) -> Iterator[int]:
+        for level in levels:
+            if self.is_free(level):
+                yield level
+
+    def free_levels_at_or_below(self, price) -> Iterator[int]:
+        return self.free_levels(self.ladder.levels_below(price))
+
+    # --- Updates ---
+    def _add(self, index: Dict, counters: list, key, price) -> Optional[int]:
+        if key in index:
+            return index[key]
+        level = self.level_of(price)
+        if level is None:
+            logger.debug(f"[GRID] {key} @ {price} is off-grid; not indexed.")
+            return None
+        index[key] = level
+        counters[level] += 1
+        return level
+
+    def _remove(self, index: Dict, counters: list, key) -> Optional[int]:
+        level = index.pop(key, None)
+        if level is not None:
+            counters[level] -= 1
+            if self.is_free(level):
+                self._freed.add(level)
+        return level
+
+    def add_contract(self, contract_id: int, buy_price: float) -> Optional[int]:
+        return self._add(self._contract_levels, self._contracts, contract_id, buy_price)
+
+    def remove_contract(self, contract_id: int) -> Optional[int]:
+        return self._remove(self._contract_levels, self._contracts, contract_id)
+
+    def add_pending(self, uuid: str, price: float) -> Optional[int]:
+        return self._add(self._pending_levels, self._pending, uuid, price)
+
+    def remove_pending(self, uuid: str) -> Optional[int]:
+        return self._remove(self._pending_levels, self._pending, uuid)
+
+    def sync_open_orders(self, orders: Iterable[dict]):
+        """Apply an exchange open-order snapshot; only added/removed orders are touched."""
+        snapshot = {}
+        for o in orders:
+            if o.get('side') == 'bid' and o.get('uuid'):
+                snapshot[o['uuid']] = o.get('price', 0)
+        for uuid in [u for u in self._open_levels if u not in snapshot]:
+            self._remove(self._open_levels, self._open, uuid)
+        for uuid, price in snapshot.items():
+            self._add(self._open_levels, self._open, uuid, price)
+
+    def take_freed(self) -> Set[int]:
+        """Levels freed by fills/cancels since the last call (drained on read)."""
+        freed, self._freed = self._freed, set()
+        return freed
+
+    def summary(self) -> Dict[str, int]:
+        counts = {name: 0 for name in STATE_NAMES.values()}
+        for level in range(self.level_count):
+            counts[STATE_NAMES[self.state(level)]] += 1
+        return counts
@@ -0,0 +1,140 @@
+import bisect
+from decimal import Decimal, ROUND_FLOOR, ROUND_CEILING, ROUND_HALF_EVEN
+from typing import Dict, List, Optional
+
+# Upbit KRW market price units (호가 단위): (lower bound, unit), checked top-down
+KRW_PRICE_UNITS = [
+    (Decimal("2000000"), Decimal("1000")),
+    (Decimal("1000000"), Decimal("500")),
+    (Decimal("500000"), Decimal("100")),
+    (Decimal("100000"), Decimal("50")),
+    (Decimal("10000"), Decimal("10")),
+    (Decimal("1000"), Decimal("1")),
+    (Decimal("100"), Decimal("0.1")),
+    (Decimal("10"), Decimal("0.01")),
+    (Decimal("1"), Decimal("0.001")),
+    (Decimal("0.1"), Decimal("0.0001")),
+    (Decimal("0.01"), Decimal("0.00001")),
+    (Decimal("0.001"), Decimal("0.000001")),
+    (Decimal("0.0001"), Decimal("0.0000001")),
+    (Decimal("0"), Decimal("0.00000001")),
+]
+# BTC/USDT quote markets: finest unit, so snapping never coarsens a user's price
+DEFAULT_PRICE_UNIT = Decimal("0.00000001")
+
+def to_decimal(value) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+def get_price_unit(ticker: str, price) -> Decimal:
+    """Upbit price unit for a market at the given price."""
+    if not ticker.startswith("KRW-"):
+        return DEFAULT_PRICE_UNIT
+    price = to_decimal(price)
+    for lower, unit in KRW_PRICE_UNITS:
+        if price >= lower:
+            return unit
+    return DEFAULT_PRICE_UNIT
+
+def snap_price(ticker: str, price, rounding=ROUND_FLOOR) -> Decimal:
+    """Snap a price onto the market's price-unit grid (floor for buys, ceiling for sells)."""
+    price = to_decimal(price)
+    unit = get_price_unit(ticker, price)
+    snapped = (price / unit).to_integral_value(rounding=rounding) * unit
+    # Rounding up can cross into a coarser band (e.g. 999.95 -> 1000.0); re-snap once
+    unit_after = get_price_unit(ticker, snapped)
+    if unit_after != unit:
+        snapped = (snapped / unit_after).to_integral_value(rounding=rounding) * unit_after
+    return snapped
+
+def sell_target_price(ticker: str, buy_price, profit_interval) -> float:
+    """buy + profit_interval computed exactly, rounded UP to a valid price unit."""
+    return float(snap_price(ticker, to_decimal(buy_price) + to_decimal(profit_interval), ROUND_CEILING))
+
+
+class GridLadder:
+    """
+    Exact, precomputed grid ladder.
+
+    Every level is stored as an integer number of `quantum` (the finest price unit in
+    the range), built from Decimal arithmetic and snapped down to Upbit's price unit.
+    All grid code paths share one ladder instead of walking `price += interval` on floats.
+    """
+
+    def __init__(self, ticker: str, min_price, max_price, grid_interval):
+        self.ticker = ticker
+        self.min_price = to_decimal(min_price)
+        self.max_price = to_decimal(max_price)
+        self.interval = to_decimal(grid_interval)
+        if self.interval <= 0:
+            raise ValueError("grid_interval must be positive")
+        if self.max_price < self.min_price:
+            raise ValueError("max_price must be >= min_price")
+
+        # Units only grow with price and each divides the next, so every snapped
+        # level is an exact integer multiple of the unit at min_price
+        self.quantum = get_price_unit(ticker, self.min_price)
+
+        ticks: List[int] = []
+        count = int((self.max_price - self.min_price) / self.interval) + 1
+        for i in range(count):
+            price = snap_price(ticker, self.min_price + self.interval * i)
+            tick = int((price / self.quantum).to_integral_value(rounding=ROUND_FLOOR))
+            if not ticks or tick > ticks[-1]:  # Snapping can merge neighbours in coarse bands
+                ticks.append(tick)
+        self.ticks = ticks
+        self.prices: List[float] = [float(self.quantum * t) for t in ticks]
+        self._level_by_tick: Dict[int, int] = {t: i for i, t in enumerate(ticks)}
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'GridLadder':
+        return cls(config['coin_ticker'], config['min_price'], config['max_price'], config['grid_interval'])
+
+    @property
+    def level_count(self) -> int:
+        return len(self.ticks)
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    # --- Price <-> level ---
+    def to_tick(self, price) -> int:
+        return int((to_decimal(price) / self.quantum).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+    def level_of(self, price) -> Optional[int]:
+        """Exact level for a price (as returned by the exchange), or None if not on the ladder."""
+        return self._level_by_tick.get(self.to_tick(price))
+
+    def price_of(self, level: int) -> float:
+        return self.prices[level]
+
+    def decimal_price(self, level: int) -> Decimal:
+        return self.quantum * self.ticks[level]
+
+    # --- Range helpers (binary search, no walking) ---
+    def levels_below(self, price, inclusive: bool = True) -> range:
+        """Levels priced <= price (or < price)."""
+        tick = to_decimal(price) / self.quantum
+        if inclusive:
+            end = bisect.bisect_right(self.ticks, int(tick.to_integral_value(rounding=ROUND_FLOOR)))
+        else:
+            end = bisect.bisect_left(self.ticks, int(tick.to_integral_value(rounding=ROUND_CEILING)))
+        return range(0, end)
+
+    def levels_above(self, price, inclusive: bool = False) -> range:
+        return range(len(self.levels_below(price, inclusive=not inclusive)), self.level_count)
+
+    def levels_between(self, low, high) -> range:
+        """Levels with low <= price <= high (order of the arguments does not matter)."""
+        low, high = sorted((to_decimal(low), to_decimal(high)))
+        start = len(self.levels_below(low, inclusive=False))
+        end = len(self.levels_below(high, inclusive=True))
+        return range(start, max(start, end))
+
+    def highest_level_at_or_below(self, price) -> int:
+        return len(self.levels_below(price)) - 1
+
+    def total_cost(self, amount, levels: Optional[range] = None) -> Decimal:
+        """Quote currency needed to buy `amount` at each level (all levels by default)."""
+        levels = range(self.level_count) if levels is None else levels
+        tick_sum = sum(self.ticks[i] for i in levels)
+        return self.quantum * tick_sum * to_decimal(amount)
@@ -0,0 +1,253 @@
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from modules.backtest import candles_to_path
+from modules.rate_limiter import PRIORITY_BACKGROUND
+
+logger = logging.getLogger("TradingSystem")
+
+DEFAULT_ROOT = os.path.join("data", "history")
+CANDLES, TRADES = "candles_1m", "trades"
+CANDLE_PAGE = 200   # Max candles per /v1/candles request
+TRADE_PAGE = 500    # Max ticks per /v1/trades/ticks request
+TRADE_MAX_DAYS = 7  # Upbit only serves ticks for the last 7 days
+
+# Column layout per kind (one .npy per column per day)
+COLUMNS = {
+    CANDLES: {'ts': np.int64, 'open': np.float64, 'high': np.float64, 'low': np.float64,
+              'close': np.float64, 'volume': np.float64},
+    TRADES: {'ts': np.int64, 'price': np.float64, 'volume': np.float64, 'side': np.int8, 'seq': np.int64},
+}
+
+Columns = Dict[str, np.ndarray]
+
+def _utc_day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+def _parse_utc(text: str) -> datetime:
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc)
+
+def _empty(kind: str) -> Columns:
+    return {name: np.empty(0, dtype) for name, dtype in COLUMNS[kind].items()}
+
+
+class UpbitHistorySource:
+    """Pages Upbit candles/ticks for one UTC day through the rate-limited REST client."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def fetch_day(self, market: str, kind: str, day: date) -> Columns:
+        if kind == CANDLES:
+            return await self._candles(market, day)
+        if kind == TRADES:
+            return await self._trades(market, day)
+        raise ValueError(f"Unknown history kind: {kind}")
+
+    async def _candles(self, market: str, day: date) -> Columns:
+        day_start = _utc_day_start(day)
+        to = (day_start + timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        rows = []
+        while True:
+            # Newest first; `to` is exclusive
+            page = await self.client.get_minute_candles(market, to=to, count=CANDLE_PAGE, priority=PRIORITY_BACKGROUND)
+            if not page:
+                break
+            times = [_parse_utc(c['candle_date_time_utc']) for c in page]
+            rows.extend((t, c) for t, c in zip(times, page) if t >= day_start)
+            oldest = min(times)
+            if oldest <= day_start or len(page) < CANDLE_PAGE:
+                break
+            to = oldest.strftime('%Y-%m-%dT%H:%M:%SZ')
+        if not rows:
+            return _empty(CANDLES)
+        rows.sort(key=lambda r: r[0])
+        return {
+            'ts': np.array([int(t.timestamp()) for t, _ in rows], np.int64),
+            'open': np.array([c['opening_price'] for _, c in rows], np.float64),
+            'high': np.array([c['high_price'] for _, c in rows], np.float64),
+            'low': np.array([c['low_price'] for _, c in rows], np.float64),
+            'close': np.array([c['trade_price'] for _, c in rows], np.float64),
+            'volume': np.array([c['candle_acc_trade_volume'] for _, c in rows], np.float64),
+        }
+
+    async def _trades(self, market: str, day: date) -> Columns:
+        days_ago = (datetime.now(timezone.utc).date() - day).days
+        if days_ago > TRADE_MAX_DAYS:
+            raise ValueError(f"Upbit only serves ticks for the last {TRADE_MAX_DAYS} days (asked {day})")
+        wanted = day.isoformat()
+        rows, cursor = [], None
+        while True:
+            # Newest first; `cursor` (sequential_id) continues below the previous page
+            page = await self.client.get_trades(market, count=TRADE_PAGE, cursor=cursor,
+                                                days_ago=days_ago or None, priority=PRIORITY_BACKGROUND)
+            page = [t for t in page or [] if t.get('trade_date_utc') == wanted]
+            if not page:
+                break
+            rows.extend(page)
+            cursor = page[-1]['sequential_id']
+            if len(page) < TRADE_PAGE:
+                break
+        if not rows:
+            return _empty(TRADES)
+        rows.sort(key=lambda t: (t['timestamp'], t['sequential_id']))
+        return {
+            'ts': np.array([t['timestamp'] for t in rows], np.int64),
+            'price': np.array([t['trade_price'] for t in rows], np.float64),
+            'volume': np.array([t['trade_volume'] for t in rows], np.float64),
+            'side': np.array([1 if t['ask_bid'] == 'BID' else -1 for t in rows], np.int8),
+            'seq': np.array([t['sequential_id'] for t in rows], np.int64),
+        }
+
+
+class FixtureSource:
+    """Offline stand-in for UpbitHistorySource: a deterministic random walk per (market, day)."""
+
+    def __init__(self, start_price: float = 1450.0, volatility: float = 0.5, trades_per_day: int = 5000):
+        self.start_price = start_price
+        self.volatility = volatility
+        self.trades_per_day = trades_per_day
+        self.calls = 0
+
+    async def fetch_day(self, market: str, kind: str, day: date) -> Columns:
+        self.calls += 1
+        rng = np.random.default_rng(zlib.crc32(f"{market}:{kind}:{day.isoformat()}".encode()))
+        day_ts = int(_utc_day_start(day).timestamp())
+        if kind == CANDLES:
+            close = np.round(self.start_price + np.cumsum(rng.normal(0, self.volatility, 1440)))
+            open_ = np.concatenate(([close[0]], close[:-1]))
+            wick = np.round(np.abs(rng.normal(0, self.volatility, 1440)))
+            return {
+                'ts': day_ts + 60 * np.arange(1440, dtype=np.int64),
+                'open': open_, 'high': np.maximum(open_, close) + wick, 'low': np.minimum(open_, close) - wick,
+                'close': close, 'volume': np.abs(rng.normal(100, 30, 1440)),
+            }
+        n = self.trades_per_day
+        return {
+            'ts': day_ts * 1000 + np.sort(rng.integers(0, 86_400_000, n)).astype(np.int64),
+            'price': np.round(self.start_price + np.cumsum(rng.normal(0, self.volatility / 4, n))),
+            'volume': np.abs(rng.normal(10, 3, n)),
+            'side': rng.choice(np.array([-1, 1], np.int8), n),
+            'seq': np.arange(n, dtype=np.int64),
+        }
+
+
+class HistoryCache:
+    """
+    Day-partitioned columnar cache: {root}/{market}/{kind}/{YYYYMMDD}/{column}.npy
+
+    A day is fetched once and written atomically (temp dir + rename), so an interrupted
+    download resumes from the first missing day. Reads are np.load(mmap_mode='r'):
+    a single day is served zero-copy, and only multi-day loads copy into one array.
+    Only complete UTC days (before today) are cached, and a day that came back empty
+    (lookup failed or market not yet listed) is left uncached so the next run retries it.
+    """
+
+    def __init__(self, source, root: str = DEFAULT_ROOT, concurrency: int = 4):
+        self.source = source
+        self.root = root
+        self.concurrency = concurrency
+
+    def day_dir(self, market: str, kind: str, day: date) -> str:
+        return os.path.join(self.root, market, kind, day.strftime('%Y%m%d'))
+
+    def has(self, market: str, kind: str, day: date) -> bool:
+        return os.path.isdir(self.day_dir(market, kind, day))
+
+    @staticmethod
+    def days(start: date, end: date) -> List[date]:
+        return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+    def _write(self, market: str, kind: str, day: date, columns: Columns):
+        final = self.day_dir(market, kind, day)
+        tmp = f"{final}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, dtype in COLUMNS[kind].items():
+            np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(columns[name], dtype=dtype))
+        os.replace(tmp, final)
+
+    async def ensure(self, market: str, kind: str, start: date, end: date) -> List[date]:
+        """Download every missing day in [start, end]. Returns the days that were fetched (and cached)."""
+        if end >= datetime.now(timezone.utc).date():
+            raise ValueError("Only complete UTC days (before today) can be cached")
+        missing = [d for d in self.days(start, end) if not self.has(market, kind, d)]
+        if not missing:
+            return []
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _fetch(day: date):
+            async with semaphore:
+                columns = await self.source.fetch_day(market, kind, day)
+            if len(columns['ts']) == 0:
+                logger.warning(f"⚠️ [History] {market} {kind} {day}: no rows, not cached")
+                return
+            await asyncio.get_running_loop().run_in_executor(None, self._write, market, kind, day, columns)
+            logger.info(f"📥 [History] {market} {kind} {day}: {len(columns['ts'])} rows")
+
+        # Days are independent; the REST scheduler paces the combined request rate
+        await asyncio.gather(*(_fetch(d) for d in missing))
+        return [d for d in missing if self.has(market, kind, d)]
+
+    def load_day(self, market: str, kind: str, day: date) -> Columns:
+        """Zero-copy memmaps of one cached day."""
+        folder = self.day_dir(market, kind, day)
+        return {name: np.load(os.path.join(folder, f"{name}.npy"), mmap_mode='r') for name in COLUMNS[kind]}
+
+    async def load(self, market: str, kind: str, start: date, end: date) -> Columns:
+        await self.ensure(market, kind, start, end)
+        # Days that came back empty are not cached and contribute no rows
+        parts = [self.load_day(market, kind, d) if self.has(market, kind, d) else _empty(kind)
+                 for d in self.days(start, end)]
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS[kind]}
+
+    async def prices(self, market: str, start: date, end: date, kind: str = CANDLES) -> np.ndarray:
+        """Price path for modules.backtest / modules.sweep."""
+        columns = await self.load(market, kind, start, end)
+        if kind == CANDLES:
+            return candles_to_path(columns['open'], columns['high'], columns['low'], columns['close'])
+        return columns['price']
+
+
+async def _main(args):
+    from modules.upbit_client import UpbitRestClient
+    client = UpbitRestClient("", "")  # Quotation endpoints need no keys
+    try:
+        source = FixtureSource() if args.fixture else UpbitHistorySource(client)
+        cache = HistoryCache(source, args.root)
+        start, end = date.fromisoformat(args.start), date.fromisoformat(args.end)
+        fetched = await cache.ensure(args.market, args.kind, start, end)
+        print(f"Fetched {len(fetched)} day(s); {len(HistoryCache.days(start, end)) - len(fetched)} served from cache.")
+        if args.export:
+            prices = await cache.prices(args.market, start, end, args.kind)
+            np.save(args.export, prices)
+            print(f"Wrote {len(prices):,} prices to {args.export}")
+    finally:
+        await client.close()
+
+
+def main(argv: Optional[list] = None):
+    """python -m modules.history KRW-USDT 2026-09-01 2026-09-30 --export usdt_sep.npy"""
+    parser = argparse.ArgumentParser(description="Download and cache Upbit history")
+    parser.add_argument('market')
+    parser.add_argument('start', help="YYYY-MM-DD (UTC)")
+    parser.add_argument('end', help="YYYY-MM-DD (UTC, inclusive)")
+    parser.add_argument('--kind', choices=[CANDLES, TRADES], default=CANDLES)
+    parser.add_argument('--root', default=DEFAULT_ROOT)
+    parser.add_argument('--export', help="Write the price path as .npy (input for modules.backtest/sweep)")
+    parser.add_argument('--fixture', action='store_true', help="Use the offline fixture source")
+    asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Latency histograms for the fill hot path and exchange calls.
+
+    buy fill detected -> contract persisted -> sell sent -> sell acked
+    sell fill detected -> contract closed -> re-entry buy placed
+
+Every stage is recorded as the time since the fill was detected, so each histogram
+answers "how long after the fill was this step done". Exchange calls made through
+UpbitHandler are recorded as "api.<method>" with their own error counts.
+"""
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+SUB_BUCKET_BITS = 6  # 32 sub-buckets per power of two -> values within ~3%
+_HALF = 1 << (SUB_BUCKET_BITS - 1)
+_EXACT = 1 << SUB_BUCKET_BITS  # Values below this (µs) get their own bucket
+PERCENTILES = (50, 90, 99, 99.9)
+LOG_DIR = "logs"
+
+
+def _bucket(value: int) -> int:
+    if value < _EXACT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return shift * _HALF + (value >> shift)
+
+def _bucket_high(index: int) -> int:
+    """Largest value (µs) that lands in bucket `index`."""
+    if index < _EXACT:
+        return index
+    shift = (index - _EXACT) // _HALF + 1
+    return ((index - shift * _HALF) << shift) + (1 << shift) - 1
+
+
+class Histogram:
+    """
+    HDR-style log-linear histogram of integer microseconds.
+    record() is a couple of integer ops and a dict update; memory grows with the
+    number of distinct buckets hit (a few hundred at most), not with samples.
+    """
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, micros: int):
+        if micros < 0:
+            micros = 0
+        index = _bucket(micros)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        if not self.count or micros < self.min:
+            self.min = micros
+        if micros > self.max:
+            self.max = micros
+        self.count += 1
+        self.total += micros
+
+    def percentile(self, p: float) -> int:
+        """Value (µs) at or below which p% of samples fall (bucket upper bound, capped at max)."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(_bucket_high(index), self.max)
+        return self.max
+
+    def merge(self, other: 'Histogram'):
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        if other.count:
+            self.min = other.min if not self.count else min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def snapshot(self) -> Dict:
+        """Summary in milliseconds."""
+        result = {'count': self.count,
+                  'min_ms': self.min / 1000,
+                  'mean_ms': round(self.total / self.count / 1000, 3) if self.count else 0.0}
+        for p in PERCENTILES:
+            result[f"p{p:g}_ms"] = self.percentile(p) / 1000
+        result['max_ms'] = self.max / 1000
+        return result
+
+
+class _CallTimer:
+    """Context manager: records the block's duration, counts an error if it raised."""
+    __slots__ = ('recorder', 'name', 'start')
+
+    def __init__(self, recorder: 'LatencyRecorder', name: str):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder.record(self.name, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.recorder.error(self.name)
+        return False
+
+
+class FillSpan:
+    """Timing span of one fill; mark(stage) records the time since detection."""
+    __slots__ = ('recorder', 'kind', 'start')
+
+    def __init__(self, recorder: 'LatencyRecorder', kind: str, start: float):
+        self.recorder = recorder
+        self.kind = kind
+        self.start = start
+
+    def mark(self, stage: str):
+        self.recorder.record(f"{self.kind}.{stage}", time.perf_counter() - self.start)
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.started_at = datetime.now()
+
+    def record(self, name: str, seconds: float):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram()
+        hist.record(int(seconds * 1_000_000))
+
+    def error(self, name: str):
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def call(self, name: str) -> _CallTimer:
+        """`with recorder.call('api.buy_limit_order'): ...`"""
+        return _CallTimer(self, name)
+
+    def span(self, kind: str, detected_at: Optional[float] = None) -> FillSpan:
+        """detected_at: time.perf_counter() when the fill was seen (default: now)."""
+        return FillSpan(self, kind, detected_at if detected_at is not None else time.perf_counter())
+
+    def snapshot(self) -> Dict:
+        stats = {}
+        for name in sorted(self.histograms):
+            stats[name] = self.histograms[name].snapshot()
+            stats[name]['errors'] = self.errors.get(name, 0)
+        return {'since': self.started_at.isoformat(timespec='seconds'), 'stats': stats}
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """Write snapshot() as JSON (default: logs/latency-<timestamp>.json); returns the path."""
+        return self._write(self.snapshot(), path)
+
+    async def dump_to_file(self, path: Optional[str] = None) -> str:
+        """dump() for the event loop: the snapshot is taken here, the file is written on an executor."""
+        snapshot = self.snapshot()
+        return await asyncio.get_running_loop().run_in_executor(None, self._write, snapshot, path)
+
+    @staticmethod
+    def _write(snapshot: Dict, path: Optional[str]) -> str:
+        if path is None:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            path = os.path.join(LOG_DIR, f"latency-{datetime.now():%Y%m%d-%H%M%S}.json")
+        with open(path, 'w') as f:
+            json.dump(snapshot, f, indent=1)
+        return path
+
+    def reset(self):
+        self.histograms.clear()
+        self.errors.clear()
+        self.started_at = datetime.now()
+
+
+# Process-wide recorder shared by every handler and grid
+recorder = LatencyRecorder()
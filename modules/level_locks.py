@@ -0,0 +1,70 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Hashable
+
+class LevelLocks:
+    """
+    One asyncio.Lock per grid level, created on first use and dropped when the last
+    holder/waiter leaves. Work on different levels runs concurrently; work on the
+    same level (fill, re-entry buy, scan placement) is serialized.
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, list] = {}  # key -> [lock, holders + waiters]
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    def locked(self, key: Hashable) -> bool:
+        entry = self._locks.get(key)
+        return entry is not None and entry[0].locked()
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+class InFlight:
+    """
+    Counts order placements whose response has not come back yet.
+
+    A fill can reach the private stream before the REST call that placed the order
+    returns, i.e. before its uuid is tracked. Stream handlers that see an unknown uuid
+    wait for settled() and look again.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def __enter__(self):
+        self.count += 1
+        self._idle.clear()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.count -= 1
+        if not self.count:
+            self._idle.set()
+        return False
+
+    async def settled(self, timeout: float) -> bool:
+        """Wait until no placement is in flight (False on timeout)."""
+        if not self.count:
+            return True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
@@ -0,0 +1,205 @@
+"""
+Event-loop health: an always-on lag sampler and an on-demand sampling profiler.
+
+LoopLagMonitor sleeps a fixed interval and records the overshoot, i.e. how long the loop
+was stuck in something else (sync file writes, literal_eval, embed building, ...).
+
+LoopProfiler runs for a fixed window only. While it runs it
+- times every callback the loop executes (task steps are attributed to their coroutine)
+- samples the loop thread's Python stack from a helper thread
+and writes the slowest callbacks and hottest functions to logs/profile-<timestamp>.json.
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from modules.latency import recorder as latency
+
+logger = logging.getLogger("TradingSystem")
+
+LOOP_LAG_INTERVAL = 0.5   # Seconds between lag samples
+STALL_WARN = 0.25         # Log a warning when the loop was stuck at least this long
+STALL_WARN_EVERY = 10.0   # ...but at most this often (seconds)
+PROFILE_MAX_SECONDS = 60
+SAMPLE_INTERVAL = 0.005   # Stack sampling period (seconds)
+TOP_N = 15
+LOG_DIR = "logs"
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+
+class LoopLagMonitor:
+    """Sleeps `interval` in a loop; any overshoot is time the loop was busy with something else."""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.last = 0.0
+        self.max = 0.0
+        self._warned_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            lag = max(0.0, now - started - self.interval)
+            self.last = lag
+            self.max = max(self.max, lag)
+            latency.record('loop.lag', lag)
+            if lag >= STALL_WARN and now - self._warned_at >= STALL_WARN_EVERY:
+                self._warned_at = now
+                logger.warning(f"🐢 [Loop] Event loop stalled {lag * 1000:.0f} ms (use /프로파일 to find it)")
+
+
+def _callback_name(callback) -> str:
+    owner = getattr(callback, '__self__', None)
+    if isinstance(owner, asyncio.Future):
+        coro = owner.get_coro() if isinstance(owner, asyncio.Task) else None
+        if coro is not None:
+            return f"task:{getattr(coro, '__qualname__', type(coro).__name__)}"
+        callback = type(owner).__name__
+    if isinstance(callback, functools.partial):
+        callback = callback.func
+    return getattr(callback, '__qualname__', None) or str(callback)
+
+def _frame_name(code) -> str:
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class LoopProfiler:
+    """Time-boxed profile of the running loop. One at a time."""
+
+    def __init__(self):
+        self.running = False
+        self._callbacks: Dict[str, list] = {}   # name -> [count, total_s, max_s]
+        self._inclusive: Dict[str, int] = {}   # function -> busy samples it was on the stack
+        self._leaf: Dict[str, int] = {}        # function -> busy samples it was the innermost frame
+        self._samples = 0
+        self._busy = 0
+        self._started_at: Optional[datetime] = None
+
+    def _timed_run(self, original):
+        stats = self._callbacks
+
+        def _run(handle):
+            started = time.perf_counter()
+            try:
+                return original(handle)
+            finally:
+                elapsed = time.perf_counter() - started
+                name = _callback_name(handle._callback)
+                entry = stats.get(name)
+                if entry is None:
+                    stats[name] = [1, elapsed, elapsed]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed
+                    if elapsed > entry[2]:
+                        entry[2] = elapsed
+        return _run
+
+    def _sample(self, thread_id: int, stop: threading.Event, interval: float):
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            self._samples += 1
+            if frame.f_code.co_filename.endswith('selectors.py'):  # Idle in select()
+                continue
+            self._busy += 1
+            seen = set()
+            leaf = None
+            while frame is not None:
+                if not frame.f_code.co_filename.startswith(_ASYNCIO_DIR):
+                    name = _frame_name(frame.f_code)
+                    if leaf is None:
+                        leaf = name
+                    if name not in seen:
+                        seen.add(name)
+                        self._inclusive[name] = self._inclusive.get(name, 0) + 1
+                frame = frame.f_back
+            if leaf:
+                self._leaf[leaf] = self._leaf.get(leaf, 0) + 1
+
+    async def profile(self, seconds: float, interval: float = SAMPLE_INTERVAL) -> Dict:
+        """Profile the current loop for `seconds` (capped at PROFILE_MAX_SECONDS) and return the report."""
+        if self.running:
+            raise RuntimeError("A profile is already running")
+        seconds = max(0.1, min(float(seconds), PROFILE_MAX_SECONDS))
+        self.running = True
+        self._callbacks, self._inclusive, self._leaf = {}, {}, {}
+        self._samples = self._busy = 0
+        self._started_at = datetime.now()
+
+        original = asyncio.Handle._run  # TimerHandle inherits it
+        asyncio.Handle._run = self._timed_run(original)
+        stop = threading.Event()
+        sampler = threading.Thread(target=self._sample, args=(threading.get_ident(), stop, interval),
+                                   name="loop-profiler", daemon=True)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            asyncio.Handle._run = original
+            stop.set()
+            sampler.join()
+            self.running = False
+        return self._report(time.perf_counter() - started)
+
+    def _report(self, elapsed: float) -> Dict:
+        def top(items, key):
+            return sorted(items, key=key, reverse=True)[:TOP_N]
+
+        callbacks = [{'name': name, 'count': count, 'total_ms': round(total * 1000, 3),
+                      'max_ms': round(worst * 1000, 3)}
+                     for name, (count, total, worst) in self._callbacks.items()]
+        busy = self._busy or 1
+        return {
+            'started_at': self._started_at.isoformat(timespec='seconds'),
+            'seconds': round(elapsed, 3),
+            'samples': self._samples,
+            'busy_pct': round(self._busy / self._samples * 100, 1) if self._samples else 0.0,
+            'slowest_callbacks': top(callbacks, key=lambda c: c['max_ms']),
+            'costliest_callbacks': top(callbacks, key=lambda c: c['total_ms']),
+            'hot_functions': [{'name': n, 'pct': round(c / busy * 100, 1)}
+                              for n, c in top(self._inclusive.items(), key=lambda i: i[1])],
+            'hot_leaves': [{'name': n, 'pct': round(c / busy * 100, 1)}
+                           for n, c in top(self._leaf.items(), key=lambda i: i[1])],
+        }
+
+    async def profile_to_file(self, seconds: float, path: Optional[str] = None) -> Tuple[str, Dict]:
+        """profile() and write the report as JSON (default: logs/profile-<timestamp>.json)."""
+        report = await self.profile(seconds)
+        if path is None:
+            path = os.path.join(LOG_DIR, f"profile-{datetime.now():%Y%m%d-%H%M%S}.json")
+
+        def _write():
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=1)
+        await asyncio.get_running_loop().run_in_executor(None, _write)
+        logger.info(f"🔬 Loop profile written to {path} (busy {report['busy_pct']}%)")
+        return path, report
+
+
+# Process-wide instances
+lag_monitor = LoopLagMonitor()
+profiler = LoopProfiler()
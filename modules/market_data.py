@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+import time
+import uuid as uuid_lib
+from typing import Dict, Iterable, List, Optional, Set
+
+import websockets
+
+logger = logging.getLogger("TradingSystem")
+
+WS_PUBLIC_URL = "wss://api.upbit.com/websocket/v1"
+SUBSCRIBER_QUEUE_SIZE = 256   # Per-subscriber backlog; the oldest message is dropped when full
+STALE_TIMEOUT = 30.0          # Reconnect if the socket is silent this long
+MAX_BACKOFF = 30.0            # Reconnect backoff cap (seconds)
+PRICE_TYPES = ('ticker', 'trade')  # Message types that carry trade_price
+
+class Subscription:
+    """
+    Bounded queue of market-data messages for one consumer.
+    A slow consumer loses the oldest messages (counted in `dropped`) instead of
+    stalling the socket or the other subscribers.
+    """
+
+    def __init__(self, codes: Iterable[str], types: Iterable[str], maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.codes: Set[str] = set(codes)
+        self.types: Set[str] = set(types)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.closed = False
+
+    def wants(self, msg_type: str, code: str) -> bool:
+        return msg_type in self.types and code in self.codes
+
+    def push(self, message: Dict):
+        if self.closed:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self) -> Optional[Dict]:
+        """Next message, or None once the subscription is closed."""
+        if self.closed and self.queue.empty():
+            return None
+        return await self.queue.get()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)  # Wake up a waiting consumer
+
+
+class MarketDataHub:
+    """
+    One public WebSocket for every code and type any subscriber needs.
+
+    Keeps a per-code latest-price table and fans each message out to the matching
+    subscribers. The socket task is supervised: it reconnects with backoff on errors,
+    on silence longer than STALE_TIMEOUT, and whenever the subscribed code/type set
+    changes. It starts with the first subscriber and stops after the last one leaves.
+    """
+
+    def __init__(self, url: str = WS_PUBLIC_URL, stale_timeout: float = STALE_TIMEOUT):
+        self.url = url
+        self.stale_timeout = stale_timeout
+        self.prices: Dict[str, float] = {}        # code -> last trade price
+        self.price_times: Dict[str, float] = {}   # code -> monotonic time of that price
+        self.last_price: Optional[float] = None   # Last trade price of any code
+        self.last_update_time: Optional[float] = None
+        self.connected = False
+        self._subscribers: List[Subscription] = []
+        self._task: Optional[asyncio.Task] = None
+        self._websocket = None
+        self._stats = {'messages': 0, 'reconnects': 0, 'stale_reconnects': 0}
+
+    # --- Subscribers ---
+    def subscribe(self, codes: Iterable[str], types: Iterable[str] = ('ticker',),
+                  maxsize: int = SUBSCRIBER_QUEUE_SIZE) -> Subscription:
+        sub = Subscription(codes, types, maxsize)
+        before = self._wanted()
+        self._subscribers.append(sub)
+        self._on_subscriptions_changed(before)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        sub.close()
+        if sub not in self._subscribers:
+            return
+        before = self._wanted()
+        self._subscribers.remove(sub)
+        self._on_subscriptions_changed(before)
+
+    def _wanted(self) -> Dict[str, Set[str]]:
+        """type -> codes over all subscribers."""
+        wanted: Dict[str, Set[str]] = {}
+        for sub in self._subscribers:
+            for msg_type in sub.types:
+                wanted.setdefault(msg_type, set()).update(sub.codes)
+        return wanted
+
+    def _on_subscriptions_changed(self, before: Dict[str, Set[str]]):
+        if not self._subscribers:
+            self.stop()
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        elif self._wanted() != before and self._websocket is not None:
+            # Re-subscribe by reconnecting with the new request
+            asyncio.create_task(self._websocket.close())
+
+    # --- Prices ---
+    def live_price(self, code: str, max_age: float) -> Optional[float]:
+        price, updated = self.prices.get(code), self.price_times.get(code)
+        if price is None or updated is None or time.monotonic() - updated > max_age:
+            return None
+        return price
+
+    def _dispatch(self, message: Dict):
+        msg_type = message.get('type')
+        code = message.get('code')
+        self._stats['messages'] += 1
+        if msg_type in PRICE_TYPES and 'trade_price' in message:
+            now = time.monotonic()
+            price = float(message['trade_price'])
+            self.prices[code] = price
+            self.price_times[code] = now
+            self.last_price = price
+            self.last_update_time = now
+        for sub in self._subscribers:
+            if sub.wants(msg_type, code):
+                sub.push(message)
+
+    # --- Socket supervision ---
+    def _request(self) -> List[Dict]:
+        request = [{"ticket": f"hub-{uuid_lib.uuid4()}"}]
+        for msg_type, codes in sorted(self._wanted().items()):
+            request.append({"type": msg_type, "codes": sorted(codes), "isOnlyRealtime": True})
+        request.append({"format": "DEFAULT"})
+        return request
+
+    async def _run(self):
+        backoff = 1.0
+        while self._subscribers:
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    self._websocket = websocket
+                    await websocket.send(json.dumps(self._request()))
+                    self.connected = True
+                    backoff = 1.0
+                    logger.info(f"📡 [MarketData] Connected: {sorted(set().union(*self._wanted().values()))}")
+
+                    while self._subscribers:
+                        try:
+                            msg = await asyncio.wait_for(websocket.recv(), timeout=self.stale_timeout)
+                        except asyncio.TimeoutError:
+                            self._stats['stale_reconnects'] += 1
+                            logger.warning(f"📡 [MarketData] No data for {self.stale_timeout:.0f}s. Reconnecting...")
+                            break
+                        self._dispatch(json.loads(msg))
+            except asyncio.CancelledError:
+                raise
+            except websockets.exceptions.ConnectionClosed:
+                logger.info("📡 [MarketData] Socket closed. Reconnecting...")
+            except Exception as e:
+                logger.error(f"📡 [MarketData] Stream error: {e}. Retrying in {backoff:.0f}s...")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+            finally:
+                self.connected = False
+                self._websocket = None
+            if self._subscribers:
+                self._stats['reconnects'] += 1
+
+    def stop(self):
+        for sub in self._subscribers:
+            sub.close()
+        self._subscribers.clear()
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self.connected = False
+
+    def stats(self) -> Dict:
+        return dict(self._stats,
+                    connected=self.connected,
+                    subscribers=len(self._subscribers),
+                    dropped=sum(sub.dropped for sub in self._subscribers),
+                    codes=len(self.prices))
@@ -0,0 +1,199 @@
+"""
+Local Prometheus metrics endpoint (text exposition format 0.0.4).
+
+    METRICS_PORT=9108 python main.py
+    curl -s localhost:9108/metrics
+
+Nothing is pushed from the trading loop: a scrape reads the counters the engine already
+keeps (latency recorder, request scheduler, market-data hub, contract books), so the hot
+path pays only for the plain int/dict updates it was doing anyway.
+"""
+import logging
+import os
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from modules.latency import recorder as latency, Histogram
+from modules.loop_monitor import LoopLagMonitor, lag_monitor
+from modules.notifier import outbox
+
+logger = logging.getLogger("TradingSystem")
+
+PREFIX = "upbit_grid"
+DEFAULT_HOST = "127.0.0.1"  # Local only; put a reverse proxy in front to expose it
+QUANTILES = (0.5, 0.9, 0.99)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels: Optional[Dict[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class Exposition:
+    """Collects samples grouped by metric family and renders the text format."""
+
+    def __init__(self):
+        self._families: Dict[str, Dict] = {}
+
+    def add(self, name: str, kind: str, help_text: str, value, labels: Optional[Dict[str, str]] = None,
+            suffix: str = ""):
+        family = self._families.setdefault(f"{PREFIX}_{name}", {'kind': kind, 'help': help_text, 'samples': []})
+        family['samples'].append((suffix, labels, value))
+
+    def summary(self, name: str, help_text: str, hist: Histogram, labels: Optional[Dict[str, str]] = None):
+        """Histogram (µs) as a Prometheus summary in seconds."""
+        labels = labels or {}
+        for q in QUANTILES:
+            self.add(name, 'summary', help_text, hist.percentile(q * 100) / 1e6, dict(labels, quantile=str(q)))
+        self.add(name, 'summary', help_text, hist.total / 1e6, labels, suffix="_sum")
+        self.add(name, 'summary', help_text, hist.count, labels, suffix="_count")
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, family in self._families.items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['kind']}")
+            for suffix, labels, value in family['samples']:
+                lines.append(f"{name}{suffix}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _grids(manager) -> list:
+    """A Portfolio exposes its grids; a single TradingManager is its own only grid."""
+    grids = getattr(manager, 'grids', None)
+    return list(grids.values()) if grids is not None else [manager]
+
+def _counts(name: str):
+    hist = latency.histograms.get(name)
+    return (hist.count if hist else 0), latency.errors.get(name, 0)
+
+def collect(manager, lag: Optional[LoopLagMonitor] = None) -> str:
+    """Render every metric for `manager` (TradingManager or Portfolio)."""
+    out = Exposition()
+    handler = manager.handler
+
+    # Orders / fills (counted by the latency recorder on the way through)
+    for side in ('buy', 'sell'):
+        calls, errors = _counts(f"api.{side}_limit_order")
+        out.add('orders_placed_total', 'counter', "Limit orders acknowledged by the exchange", calls - errors,
+                {'side': side})
+        out.add('orders_failed_total', 'counter', "Limit orders that failed or were rejected", errors,
+                {'side': side})
+    out.add('fills_total', 'counter', "Fills processed", _counts('buy_fill.contract_persisted')[0], {'side': 'buy'})
+    out.add('fills_total', 'counter', "Fills processed", _counts('sell_fill.contract_closed')[0], {'side': 'sell'})
+
+    # Grid state
+    for grid in _grids(manager):
+        ticker = grid.config.get('coin_ticker') or grid.ticker or "none"
+        out.add('grid_running', 'gauge', "1 if the grid is trading", int(bool(grid.is_running)), {'ticker': ticker})
+        out.add('active_contracts', 'gauge', "ACTIVE contracts (holding coin, sell resting)",
+                len(grid.contract_book), {'ticker': ticker})
+        out.add('pending_buys', 'gauge', "Buy orders placed and not yet filled",
+                len(grid.pending_buy_orders), {'ticker': ticker})
+
+    # Latency histograms
+    for name in sorted(latency.histograms):
+        hist = latency.histograms[name]
+        if name.startswith('api.'):
+            out.summary('api_call_seconds', "Exchange call latency", hist, {'call': name[4:]})
+        elif name.startswith('db.'):
+            out.summary('db_query_seconds', "DB query time (writes include the writer queue)", hist,
+                        {'op': name[3:]})
+        elif name.startswith(('buy_fill.', 'sell_fill.')):
+            out.summary('fill_stage_seconds', "Time from fill detection to each hot-path stage", hist,
+                        {'stage': name})
+    for name in sorted(latency.errors):
+        if name.startswith('api.'):
+            out.add('api_call_errors_total', 'counter', "Exchange calls that raised or were rejected",
+                    latency.errors[name], {'call': name[4:]})
+        elif name.startswith('db.'):
+            out.add('db_query_errors_total', 'counter', "DB queries that raised", latency.errors[name],
+                    {'op': name[3:]})
+
+    # Rate limiting
+    for group, s in handler.rate_limit_stats().items():
+        labels = {'group': group}
+        out.add('ratelimit_requests_total', 'counter', "Requests through the scheduler", s['requests'], labels)
+        out.add('ratelimit_waits_total', 'counter', "Requests that had to wait for a token", s['waited'], labels)
+        out.add('ratelimit_wait_seconds_total', 'counter', "Time spent waiting for tokens", s['wait_total'], labels)
+        out.add('ratelimit_wait_seconds_max', 'gauge', "Longest single token wait", s['wait_max'], labels)
+        out.add('ratelimit_queue_depth', 'gauge', "Requests currently waiting", s['queue_depth'], labels)
+        out.add('ratelimit_throttled_total', 'counter', "429 responses", s['throttled'], labels)
+
+    # Event loop
+    if lag is not None:
+        out.add('event_loop_lag_seconds', 'gauge', "Last event-loop lag sample", lag.last)
+        out.add('event_loop_lag_seconds_max', 'gauge', "Worst event-loop lag since start", lag.max)
+    hist = latency.histograms.get('loop.lag')
+    if hist is not None:
+        out.summary('event_loop_lag_samples_seconds', "Event-loop lag samples", hist)
+
+    # WebSockets
+    market = getattr(handler, 'market', None)
+    if market is not None:
+        s = market.stats()
+        out.add('websocket_reconnects_total', 'counter', "WebSocket reconnects",
+                s['reconnects'], {'stream': 'market'})
+        out.add('websocket_connected', 'gauge', "1 if the socket is up", int(s['connected']), {'stream': 'market'})
+    if hasattr(handler, 'private_reconnects'):
+        out.add('websocket_reconnects_total', 'counter', "WebSocket reconnects",
+                handler.private_reconnects, {'stream': 'private'})
+        out.add('websocket_connected', 'gauge', "1 if the socket is up",
+                int(handler.private_ws_connected), {'stream': 'private'})
+
+    # Notification outbox
+    for key, help_text in (('posted', "Notifications queued"), ('sent', "Discord messages sent (after coalescing)"),
+                           ('failed', "Discord sends that failed and were retried")):
+        out.add(f'notifications_{key}_total', 'counter', help_text, outbox.stats[key])
+
+    return out.render()
+
+
+class MetricsServer:
+    """aiohttp server for GET /metrics. Starts the shared loop-lag sampler if nothing else has."""
+
+    def __init__(self, manager, host: str = DEFAULT_HOST, port: int = 0):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.lag = lag_monitor
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        try:
+            body = collect(self.manager, self.lag)
+        except Exception as e:
+            logger.error(f"Metrics collection failed: {e}")
+            return web.Response(status=500, text=str(e))
+        return web.Response(body=body.encode(), headers={'Content-Type': CONTENT_TYPE})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/metrics', self._metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if not self.port:  # Ephemeral port (tests)
+            self.port = site._server.sockets[0].getsockname()[1]
+        self.lag.start()
+        logger.info(f"📈 Metrics endpoint: http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def from_env(manager) -> Optional[MetricsServer]:
+    """METRICS_PORT (and optionally METRICS_HOST) enable the endpoint; unset means off."""
+    port = int(os.getenv("METRICS_PORT", "0") or 0)
+    if not port:
+        return None
+    return MetricsServer(manager, os.getenv("METRICS_HOST", DEFAULT_HOST), port)
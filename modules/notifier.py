@@ -0,0 +1,212 @@
+"""
+Notification outbox.
+
+Trading code only posts: the message is written to the `notifications` table (one
+batched insert, no Discord I/O) and the fill carries on. A background sender drains the
+table and coalesces bursts: fills of one kind and ticker posted within the same window
+go out as one summary, e.g. "매수 체결 12건 - 가격: 1,450 ~ 1,470". Rows are deleted
+only after Discord accepted the message, so whatever is unsent at shutdown or crash is
+sent after the restart. Rows older than STALE_AFTER by then go out as one digest
+instead of one message per burst. The table keeps at most NOTIFY_OUTBOX_MAX rows (see init_db).
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from database.database import execute_write, execute_read
+
+logger = logging.getLogger("TradingSystem")
+
+BUY_FILL = 'buy_fill'
+SELL_FILL = 'sell_fill'
+INFO = 'info'  # Sent as-is, never coalesced
+
+COALESCE_WINDOW = 3.0  # Seconds a burst is collected before one summary goes out
+FLUSH_BATCH = 200      # Rows read per drain
+RETRY_MAX = 60.0       # Max backoff (seconds) while Discord is unreachable
+STALE_AFTER = 3600     # Rows older than this (seconds) when the sender starts are collapsed into one digest
+
+
+def _fmt(value: float) -> str:
+    """1450.0 -> '1,450', 0.00012300 -> '0.000123'"""
+    return f"{value:,.8f}".rstrip('0').rstrip('.')
+
+def _range(values: List[float]) -> str:
+    lo, hi = min(values), max(values)
+    return _fmt(lo) if lo == hi else f"{_fmt(lo)} ~ {_fmt(hi)}"
+
+def summarize(kind: str, ticker: str, rows: List[dict]) -> str:
+    """One message for a burst of fills of the same kind and ticker."""
+    prices = [row['price'] for row in rows]
+    volume = sum(row['volume'] or 0.0 for row in rows)
+    if kind == BUY_FILL:
+        return (f"🔔 **매수 체결 알림 ({len(rows)}건)**\n"
+                f"- 티커: {ticker}\n"
+                f"- 가격: {_range(prices)}\n"
+                f"- 총 수량: {_fmt(volume)}")
+    profit = sum(row['profit'] or 0.0 for row in rows)
+    return (f"💰 **익절 알림 (매도 체결 {len(rows)}건)**\n"
+            f"- 티커: {ticker}\n"
+            f"- 매도가: {_range(prices)}\n"
+            f"- 총 수익: {profit:,.2f}")
+
+def digest(rows: List[dict]) -> str:
+    """One message for everything left unsent from an earlier run (rows oldest first)."""
+    lines = [f"📭 **재시작 전 미전송 알림 {len(rows)}건 (요약)**",
+             f"- 기간: {rows[0]['created_at']} ~ {rows[-1]['created_at']} (UTC)"]
+    groups: Dict[tuple, List[dict]] = defaultdict(list)
+    others = 0
+    for row in rows:
+        if row['kind'] in (BUY_FILL, SELL_FILL) and row['price'] is not None:
+            groups[(row['kind'], row['ticker'])].append(row)
+        else:
+            others += 1
+    for (kind, ticker), group in groups.items():
+        prices = _range([row['price'] for row in group])
+        if kind == BUY_FILL:
+            lines.append(f"- 매수 체결 {len(group)}건: {ticker} {prices}")
+        else:
+            profit = sum(row['profit'] or 0.0 for row in group)
+            lines.append(f"- 매도 체결 {len(group)}건: {ticker} {prices}, 총 수익 {profit:,.2f}")
+    if others:
+        lines.append(f"- 기타 알림 {others}건")
+    return "\n".join(lines)
+
+def compose(rows: List[dict]) -> List[Tuple[str, List[int]]]:
+    """Rows (oldest first) -> [(message, row ids it covers)] in order of first appearance."""
+    out: List[Tuple[str, List[int]]] = []
+    groups: Dict[tuple, List[dict]] = defaultdict(list)
+    slots: Dict[tuple, int] = {}
+    for row in rows:
+        if row['kind'] not in (BUY_FILL, SELL_FILL) or row['price'] is None:
+            out.append((row['message'], [row['id']]))
+            continue
+        key = (row['kind'], row['ticker'])
+        if key not in slots:
+            slots[key] = len(out)
+            out.append(None)
+        groups[key].append(row)
+    for key, index in slots.items():
+        group = groups[key]
+        message = group[0]['message'] if len(group) == 1 else summarize(key[0], key[1], group)
+        out[index] = (message, [row['id'] for row in group])
+    return out
+
+
+class Outbox:
+    """Persistent, coalescing notification queue with one background sender."""
+
+    def __init__(self, window: float = COALESCE_WINDOW):
+        self.window = window
+        self.sender: Optional[Callable[[str], Awaitable[None]]] = None
+        self.stats = {'posted': 0, 'sent': 0, 'items': 0, 'failed': 0}  # sent: Discord messages, items: rows they covered
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def set_sender(self, sender: Callable[[str], Awaitable[None]]):
+        self.sender = sender
+        if self._wake is not None:
+            self._wake.set()  # Rows may have piled up with nobody to send them
+
+    def _event(self) -> asyncio.Event:
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        return self._wake
+
+    async def post(self, kind: str, message: str, ticker: Optional[str] = None, price: Optional[float] = None,
+                   volume: Optional[float] = None, profit: Optional[float] = None):
+        """Persist a notification for the sender. Never waits on Discord."""
+        await execute_write(
+            "INSERT INTO notifications (kind, ticker, price, volume, profit, message) VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, ticker, price, volume, profit, message))
+        self.stats['posted'] += 1
+        self._event().set()
+
+    async def pending(self) -> int:
+        row = await execute_read("SELECT COUNT(*) AS n FROM notifications")
+        return row['n'] if row else 0
+
+    async def collapse_stale(self, older_than: float = STALE_AFTER) -> int:
+        """
+        Replace rows queued more than `older_than` seconds ago with one INFO digest (sent
+        like any other row). Nothing is dropped. Returns the number of rows collapsed.
+        """
+        rows = await execute_read("SELECT * FROM notifications WHERE created_at < datetime('now', ?) ORDER BY id",
+                                  (f"-{int(older_than)} seconds",), fetch_all=True)
+        if len(rows) < 2:
+            return 0
+        ids = tuple(row['id'] for row in rows)
+        # Same writer batch: the digest and the delete commit together
+        await asyncio.gather(
+            execute_write("INSERT INTO notifications (kind, message) VALUES (?, ?)", (INFO, digest(rows))),
+            execute_write(f"DELETE FROM notifications WHERE id IN ({','.join('?' * len(ids))})", ids),
+        )
+        return len(rows)
+
+    async def flush(self) -> bool:
+        """Send everything in the outbox now. False if Discord failed (rows are kept)."""
+        if self.sender is None:
+            return False
+        while True:
+            rows = await execute_read("SELECT * FROM notifications ORDER BY id LIMIT ?", (FLUSH_BATCH,), fetch_all=True)
+            for message, ids in compose(rows):
+                try:
+                    await self.sender(message)
+                except Exception as e:
+                    self.stats['failed'] += 1
+                    logger.warning(f"📭 Notification not sent ({len(ids)} queued item(s) kept): {e}")
+                    return False
+                await execute_write(f"DELETE FROM notifications WHERE id IN ({','.join('?' * len(ids))})", tuple(ids))
+                self.stats['sent'] += 1
+                self.stats['items'] += len(ids)
+            if len(rows) < FLUSH_BATCH:
+                return True
+
+    def start(self):
+        """
+        Start the sender (idempotent). Rows left from a previous run are sent first; older
+        ones as one digest (see STALE_AFTER).
+        """
+        if self._task and not self._task.done():
+            return
+        self._wake = asyncio.Event()
+        self._wake.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the sender; unsent rows stay in the outbox for the next start."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        try:
+            collapsed = await self.collapse_stale()
+            if collapsed:
+                logger.info(f"📭 {collapsed} stale notification(s) from before this start collapsed into one digest.")
+        except Exception as e:
+            logger.error(f"Notification outbox digest failed: {e}")
+        backoff = self.window
+        while True:
+            await self._wake.wait()
+            await asyncio.sleep(self.window)  # Let the burst land, then send it as one
+            self._wake.clear()
+            try:
+                ok = await self.flush()
+            except Exception as e:
+                logger.error(f"Notification outbox error: {e}")
+                ok = False
+            if ok:
+                backoff = self.window
+            elif self.sender is not None:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, RETRY_MAX)
+                self._wake.set()
+
+
+outbox = Outbox()
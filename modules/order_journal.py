@@ -0,0 +1,95 @@
+"""
+Order intent journal.
+
+Every order the grid places goes through durable steps in `order_intents`:
+
+    INTENT  written before the request leaves; carries a client order id (identifier)
+    ACKED   the exchange returned the order uuid
+    FILLED / FAILED / CANCELED  terminal
+
+The identifier travels with the order, so an intent that crashed between the request
+and the ack can still be matched to its exchange order. Restart recovery only looks at
+the INTENT/ACKED rows of a ticker instead of crawling open and done orders.
+
+Writes go through the single DB writer, which commits whatever is queued as one
+transaction (synchronous=FULL): fills landing together share one fsync.
+"""
+import logging
+import uuid as uuid_lib
+from typing import Dict, List, Optional
+
+from database.database import execute_write, execute_read
+from modules.upbit_client import OrderRejected
+
+logger = logging.getLogger("TradingSystem")
+
+INTENT = 'INTENT'
+ACKED = 'ACKED'
+FILLED = 'FILLED'
+FAILED = 'FAILED'
+CANCELED = 'CANCELED'
+OPEN_STATES = (INTENT, ACKED)
+
+JOURNAL_KEEP_DAYS = 7  # Terminal rows older than this are pruned
+
+
+class OrderJournal:
+    @staticmethod
+    def new_identifier() -> str:
+        return f"grid-{uuid_lib.uuid4().hex}"
+
+    async def intent(self, ticker: str, side: str, price: float, volume: float, ref: Optional[str] = None) -> str:
+        """Record an order about to be sent. Returns the identifier to send it with."""
+        identifier = self.new_identifier()
+        await execute_write("""
+            INSERT INTO order_intents (identifier, coin_ticker, side, price, volume, ref, state)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (identifier, ticker, side, price, volume, ref, INTENT))
+        return identifier
+
+    async def acked(self, identifier: str, uuid):
+        """
+        The placement call returned: a uuid (ACKED) or OrderRejected (FAILED). None means
+        no answer (timeout, reset, 5xx): the order may be resting, so the row stays INTENT
+        until it is looked up by identifier.
+        """
+        if uuid:
+            await execute_write(
+                "UPDATE order_intents SET uuid = ?, state = ?, updated_at = CURRENT_TIMESTAMP WHERE identifier = ?",
+                (uuid, ACKED, identifier))
+        elif isinstance(uuid, OrderRejected):
+            await self.resolve(identifier, FAILED)
+        else:
+            logger.warning(f"📒 No answer for order {identifier}; kept as INTENT until it is looked up.")
+
+    async def resolve(self, identifier: str, state: str):
+        """Move an intent to a terminal state."""
+        await execute_write(
+            "UPDATE order_intents SET state = ?, updated_at = CURRENT_TIMESTAMP WHERE identifier = ?",
+            (state, identifier))
+
+    async def resolve_uuid(self, uuid: str, state: str):
+        """Same, by exchange uuid (no-op for orders placed before the journal)."""
+        await execute_write(
+            "UPDATE order_intents SET state = ?, updated_at = CURRENT_TIMESTAMP WHERE uuid = ? AND state IN (?, ?)",
+            (state, uuid, *OPEN_STATES))
+
+    async def filled(self, uuid: str):
+        """Mark the order with this exchange uuid as filled."""
+        await self.resolve_uuid(uuid, FILLED)
+
+    async def unresolved(self, ticker: str) -> List[Dict]:
+        """INTENT/ACKED rows of a ticker, oldest first."""
+        return await execute_read(
+            "SELECT * FROM order_intents WHERE coin_ticker = ? AND state IN (?, ?) ORDER BY id",
+            (ticker, *OPEN_STATES), fetch_all=True)
+
+    async def has_history(self, ticker: str) -> bool:
+        """False until the first order of this ticker went through the journal (pre-journal databases)."""
+        row = await execute_read("SELECT 1 FROM order_intents WHERE coin_ticker = ? LIMIT 1", (ticker,))
+        return row is not None
+
+    async def prune(self, keep_days: int = JOURNAL_KEEP_DAYS):
+        await execute_write(
+            "DELETE FROM order_intents WHERE state NOT IN (?, ?) AND updated_at < datetime('now', ?)",
+            (*OPEN_STATES, f"-{keep_days} days"))
@@ -0,0 +1,81 @@
+import time
+from array import array
+from bisect import bisect_right
+from typing import Dict, Optional
+
+BOOK_MAX_AGE = 5.0  # Seconds before a local book is considered stale
+
+class OrderBook:
+    """
+    Local L2 book for one market, rebuilt from Upbit `orderbook` stream snapshots.
+
+    Levels live in flat float arrays (best level first on each side), so an update
+    rewrites four arrays in place and depth queries are a bisect plus a short sum.
+    """
+
+    __slots__ = ('code', 'bid_prices', 'bid_sizes', 'ask_prices', 'ask_sizes',
+                 '_neg_bid_prices', 'timestamp', 'updated')
+
+    def __init__(self, code: str):
+        self.code = code
+        self.bid_prices = array('d')   # Descending
+        self.bid_sizes = array('d')
+        self.ask_prices = array('d')   # Ascending
+        self.ask_sizes = array('d')
+        self._neg_bid_prices = array('d')  # -bid_prices (ascending) for bisect
+        self.timestamp: Optional[int] = None  # Exchange timestamp (ms)
+        self.updated: Optional[float] = None  # Local monotonic time
+
+    def apply(self, message: Dict):
+        """Replace the book with an `orderbook` message (Upbit sends full snapshots)."""
+        units = message.get('orderbook_units') or []
+        self.bid_prices[:] = array('d', (float(u['bid_price']) for u in units))
+        self.bid_sizes[:] = array('d', (float(u['bid_size']) for u in units))
+        self.ask_prices[:] = array('d', (float(u['ask_price']) for u in units))
+        self.ask_sizes[:] = array('d', (float(u['ask_size']) for u in units))
+        self._neg_bid_prices[:] = array('d', (-p for p in self.bid_prices))
+        self.timestamp = message.get('timestamp')
+        self.updated = time.monotonic()
+
+    def is_fresh(self, max_age: float = BOOK_MAX_AGE) -> bool:
+        return self.updated is not None and time.monotonic() - self.updated <= max_age and len(self.ask_prices) > 0
+
+    # --- Top of book ---
+    def best_bid(self) -> Optional[float]:
+        return self.bid_prices[0] if self.bid_prices else None
+
+    def best_ask(self) -> Optional[float]:
+        return self.ask_prices[0] if self.ask_prices else None
+
+    def spread(self) -> Optional[float]:
+        if not self.bid_prices or not self.ask_prices:
+            return None
+        return self.ask_prices[0] - self.bid_prices[0]
+
+    def mid(self) -> Optional[float]:
+        if not self.bid_prices or not self.ask_prices:
+            return None
+        return (self.ask_prices[0] + self.bid_prices[0]) / 2
+
+    # --- Depth ---
+    def bid_depth(self, price: float) -> float:
+        """Bid size resting at prices >= price (the queue a new buy at `price` joins behind)."""
+        return sum(self.bid_sizes[:bisect_right(self._neg_bid_prices, -price)])
+
+    def ask_depth(self, price: float) -> float:
+        """Ask size resting at prices <= price (what a buy at `price` would take)."""
+        return sum(self.ask_sizes[:bisect_right(self.ask_prices, price)])
+
+    def crosses(self, side: str, price: float) -> bool:
+        """True if a limit order at `price` would trade immediately (take the spread)."""
+        if side == 'bid':
+            return bool(self.ask_prices) and price >= self.ask_prices[0]
+        return bool(self.bid_prices) and price <= self.bid_prices[0]
+
+    def snapshot(self, levels: int = 5) -> Dict:
+        return {
+            'code': self.code,
+            'bids': list(zip(self.bid_prices[:levels], self.bid_sizes[:levels])),
+            'asks': list(zip(self.ask_prices[:levels], self.ask_sizes[:levels])),
+            'spread': self.spread(),
+        }
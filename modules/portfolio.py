@@ -0,0 +1,239 @@
+import ast
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from modules.upbit_handler import UpbitHandler
+from modules.trading_manager import (TradingManager, RECONCILE_INTERVAL, FALLBACK_POLL_INTERVAL,
+                                     SELF_HEAL_INTERVAL)
+from modules.events import TimerEvent, SELF_HEAL
+from database.database import set_config, get_config
+
+logger = logging.getLogger("TradingSystem")
+
+PORTFOLIO_KEY = "portfolio_tickers"  # Config key: list of tickers with a saved grid
+DONE_ORDERS_LIMIT = 100              # Recent done orders fetched per reconcile (all markets)
+
+class Portfolio:
+    """
+    Runs many grids (one TradingManager per ticker) in one process.
+
+    All grids share one UpbitHandler, so they share its HTTP session, rate limiter and
+    the database. The portfolio owns one ticker socket and one private socket for every
+    code and routes messages to the matching grid. REST fill reconciliation is batched:
+    one bulk status lookup, one done-orders query and one open-orders crawl per cycle,
+    whatever the number of grids.
+    """
+
+    multi_grid = True  # Lets the Discord wizard add grids while others are running
+
+    def __init__(self, handler: UpbitHandler):
+        self.handler = handler
+        self.grids: Dict[str, TradingManager] = {}
+        self.bot_start_time = datetime.now().timestamp()
+        self.notification_callback = None
+        self._lock = asyncio.Lock()
+        self._timer_task = None
+        self._price_stream_task = None
+        self._book_stream_task = None
+        self._fill_stream_task = None
+
+    # --- TradingManager-compatible surface used by the Discord cogs ---
+    @property
+    def is_running(self) -> bool:
+        return any(grid.is_running for grid in self.grids.values())
+
+    @property
+    def config(self) -> Dict:
+        """Config of the only grid (single-grid views); empty with several grids."""
+        running = self.running_grids()
+        return running[0].config if len(running) == 1 else {}
+
+    @property
+    def pending_buy_orders(self) -> Dict[str, float]:
+        merged = {}
+        for grid in self.grids.values():
+            merged.update(grid.pending_buy_orders)
+        return merged
+
+    def set_notification_callback(self, callback):
+        self.notification_callback = callback
+        for grid in self.grids.values():
+            grid.set_notification_callback(callback)
+
+    async def validate_balance(self, ticker: str, *args, **kwargs) -> dict:
+        """A new grid only gets the balance the other running grids (same quote currency) do not claim."""
+        quote = ticker.split('-')[0]
+        reserved = sum(grid.committed_quote() for grid in self.running_grids()
+                       if grid.ticker != ticker and grid.ticker.split('-')[0] == quote)
+        return await self._grid(ticker).validate_balance(ticker, *args, reserved=reserved, **kwargs)
+
+    async def start_trading(self, config: Dict) -> str:
+        return await self.add_grid(config)
+
+    async def stop_trading(self):
+        await self.stop_all()
+
+    # --- Grids ---
+    def running_grids(self) -> List[TradingManager]:
+        return [grid for grid in self.grids.values() if grid.is_running]
+
+    def get(self, ticker: str) -> Optional[TradingManager]:
+        return self.grids.get(ticker)
+
+    def _grid(self, ticker: str) -> TradingManager:
+        grid = self.grids.get(ticker)
+        if grid is None:
+            grid = TradingManager(self.handler, ticker)
+            grid.set_notification_callback(self.notification_callback)
+            self.grids[ticker] = grid
+        return grid
+
+    async def _save_tickers(self):
+        await set_config(PORTFOLIO_KEY, str(sorted(g.ticker for g in self.running_grids())))
+
+    async def recover_state(self):
+        """Recover every grid that was running when the process stopped (same as single mode: no auto-start)."""
+        saved = await get_config(PORTFOLIO_KEY)
+        tickers = ast.literal_eval(saved) if saved else []
+        logger.info(f"Recovering portfolio: {tickers}")
+        for ticker in tickers:
+            try:
+                await self._grid(ticker).recover_state()
+            except Exception as e:
+                logger.error(f"State Recovery Failed for {ticker}: {e}", exc_info=True)
+
+    async def add_grid(self, config: Dict) -> str:
+        ticker = config['coin_ticker']
+        async with self._lock:
+            grid = self._grid(ticker)
+            if grid.is_running:
+                return f"{ticker} grid is already running."
+            result = await grid.start_trading(config)
+            await self._save_tickers()
+            await self._restart_streams()
+        logger.info(f"📂 [Portfolio] {ticker} added. Running grids: {[g.ticker for g in self.running_grids()]}")
+        return f"[{ticker}] {result}"
+
+    async def remove_grid(self, ticker: str) -> bool:
+        async with self._lock:
+            grid = self.grids.get(ticker)
+            if grid is None or not grid.is_running:
+                return False
+            await grid.stop_trading()
+            await self._save_tickers()
+            await self._restart_streams()
+        logger.info(f"📂 [Portfolio] {ticker} stopped.")
+        return True
+
+    async def stop_all(self):
+        async with self._lock:
+            for grid in self.running_grids():
+                await grid.stop_trading()
+            await self._save_tickers()
+            await self._stop_streams()
+        logger.info("Portfolio Stopped.")
+
+    # --- Shared streams ---
+    async def _stop_streams(self):
+        self.handler.stop_websocket()
+        self.handler.stop_private_websocket()
+        for task in (self._timer_task, self._price_stream_task, self._book_stream_task, self._fill_stream_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._timer_task = self._price_stream_task = self._book_stream_task = self._fill_stream_task = None
+
+    async def _restart_streams(self):
+        """(Re)subscribe both sockets to the current set of codes."""
+        await self._stop_streams()
+        if not self.running_grids():
+            return
+        self._supervise_streams()
+        self._timer_task = asyncio.create_task(self._timer_loop())
+
+    def _supervise_streams(self):
+        codes = sorted(g.ticker for g in self.running_grids())
+        if self._price_stream_task is None or self._price_stream_task.done():
+            self._price_stream_task = asyncio.create_task(self.handler.connect_websocket(codes, callback=self._on_price))
+        if self._book_stream_task is None or self._book_stream_task.done():
+            self._book_stream_task = asyncio.create_task(self.handler.connect_orderbook(codes))
+        if self._fill_stream_task is None or self._fill_stream_task.done():
+            self._fill_stream_task = asyncio.create_task(
+                self.handler.connect_private_websocket(codes, on_order=self._on_order)
+            )
+
+    async def _on_price(self, price: float, code: Optional[str] = None):
+        grid = self.grids.get(code)
+        if grid and grid.is_running:
+            await grid.on_price(price, code)
+
+    async def _on_order(self, event: Dict):
+        grid = self.grids.get(event.get('code'))
+        if grid and grid.is_running:
+            await grid.on_order_event(event)
+
+    # --- Batched reconciliation ---
+    async def _timer_loop(self):
+        await self.reconcile()  # First reconcile + refill right away
+        last_fills = last_heal = time.monotonic()
+        while self.running_grids():
+            await asyncio.sleep(FALLBACK_POLL_INTERVAL)
+            self._supervise_streams()
+            now = time.monotonic()
+            fills_interval = RECONCILE_INTERVAL if self.handler.private_ws_connected else FALLBACK_POLL_INTERVAL
+            if now - last_fills >= fills_interval:
+                last_fills = now
+                await self.reconcile()
+            if now - last_heal >= SELF_HEAL_INTERVAL:
+                last_heal = now
+                for grid in self.running_grids():
+                    grid.events.put(TimerEvent(SELF_HEAL))
+
+    async def reconcile(self):
+        """One batched REST pass for all grids: fill statuses, recent fills, open orders."""
+        grids = self.running_grids()
+        if not grids:
+            return
+        try:
+            watch_uuids = [uuid for grid in grids for uuid in grid.watch_uuids()]
+            statuses, done_orders, open_orders = await asyncio.gather(
+                self.handler.get_orders_by_uuids(watch_uuids) if watch_uuids else asyncio.sleep(0, {}),
+                self.handler.get_completed_orders(None, limit=DONE_ORDERS_LIMIT),
+                self.handler.get_open_orders(None),
+            )
+            open_by_market = defaultdict(list)
+            for order in open_orders or []:
+                open_by_market[order.get('market')].append(order)
+
+            async def _apply(grid: TradingManager):
+                try:
+                    await grid.resolve_unacked()
+                    await grid.apply_fill_statuses(statuses, done_orders)
+                    await grid._fill_empty_grids(open_by_market.get(grid.ticker, []))
+                except Exception as e:
+                    logger.error(f"Error reconciling {grid.ticker}: {e}", exc_info=True)
+
+            await asyncio.gather(*(_apply(grid) for grid in grids))
+        except Exception as e:
+            logger.error(f"Error in portfolio reconcile: {e}", exc_info=True)
+
+    def summary(self) -> List[Dict]:
+        """Per-grid snapshot for status views."""
+        rows = []
+        for ticker, grid in sorted(self.grids.items()):
+            rows.append({
+                'ticker': ticker,
+                'running': grid.is_running,
+                'price': self.handler.prices.get(ticker),
+                'contracts': len(grid.contract_book),
+                'pending': len(grid.pending_buy_orders),
+                'levels': grid.grid.level_count if grid.grid else 0,
+            })
+        return rows
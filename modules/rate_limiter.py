@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger("TradingSystem")
+
+# Priority classes (lower runs first)
+PRIORITY_CRITICAL = 0     # Sell placement after a fill, cancels
+PRIORITY_NORMAL = 1       # Buy placement, fill detection
+PRIORITY_BACKGROUND = 2   # Housekeeping polls (open/closed order crawls, balances)
+
+# Requests per second per Upbit rate-limit group
+DEFAULT_GROUP_LIMITS = {
+    'order': 8,
+    'default': 30,
+    'market': 10,
+    'candles': 10,
+    'crix-trades': 10,
+    'ticker': 10,
+    'orderbook': 10,
+}
+
+def group_for(method: str, path: str) -> str:
+    """Best guess of the Remaining-Req group before the server tells us."""
+    if path in ('/v1/orders', '/v1/order') and method in ('POST', 'DELETE'):
+        return 'order'
+    if path.startswith('/v1/candles'):
+        return 'candles'
+    if path.startswith('/v1/trades'):
+        return 'crix-trades'
+    if path.startswith('/v1/ticker'):
+        return 'ticker'
+    if path.startswith('/v1/orderbook'):
+        return 'orderbook'
+    if path.startswith('/v1/market'):
+        return 'market'
+    return 'default'
+
+def parse_remaining_req(header: Optional[str]) -> Optional[Dict]:
+    """'group=default; min=1800; sec=29' -> {'group': 'default', 'min': 1800, 'sec': 29}"""
+    if not header:
+        return None
+    result = {}
+    for part in header.split(';'):
+        if '=' not in part:
+            continue
+        key, value = part.strip().split('=', 1)
+        result[key] = int(value) if value.isdigit() else value
+    return result if 'group' in result else None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until_token(self) -> float:
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def clamp(self, remaining: int):
+        """Server says only `remaining` calls are left in this second."""
+        self._refill()
+        self.tokens = min(self.tokens, float(remaining))
+
+    def drain(self, seconds: float = 1.0):
+        """After a 429: empty the bucket and push the next token `seconds` out."""
+        self._refill()
+        self.tokens = -self.rate * seconds + 1
+
+
+class RequestScheduler:
+    """
+    Central async scheduler for exchange calls.
+
+    One token bucket per Upbit rate-limit group, corrected by the `Remaining-Req`
+    header of every response. Waiters are served by priority class, then FIFO,
+    so a sell after a fill overtakes queued housekeeping polls.
+    """
+
+    def __init__(self, group_limits: Optional[Dict[str, int]] = None):
+        self.group_limits = dict(DEFAULT_GROUP_LIMITS, **(group_limits or {}))
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._waiters: Dict[str, list] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._seq = itertools.count()
+        self._stats: Dict[str, Dict] = {}
+
+    def _bucket(self, group: str) -> TokenBucket:
+        if group not in self._buckets:
+            self._buckets[group] = TokenBucket(self.group_limits.get(group, self.group_limits['default']))
+            self._waiters[group] = []
+            self._stats[group] = {'requests': 0, 'waited': 0, 'wait_total': 0.0, 'wait_max': 0.0,
+                                  'max_queue_depth': 0, 'throttled': 0}
+        return self._buckets[group]
+
+    async def acquire(self, group: str, priority: int = PRIORITY_NORMAL):
+        """Wait for a token in `group`. Higher-priority waiters are served first."""
+        bucket = self._bucket(group)
+        stats = self._stats[group]
+        stats['requests'] += 1
+        waiters = self._waiters[group]
+
+        if not waiters and bucket.try_take():
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(waiters, (priority, next(self._seq), future))
+        stats['max_queue_depth'] = max(stats['max_queue_depth'], len(waiters))
+        started = time.monotonic()
+        self._pump(group)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Drop our entry; if we already got a token, hand it to the next waiter
+            if future.done() and not future.cancelled():
+                bucket.tokens += 1
+            self._waiters[group] = [w for w in self._waiters[group] if w[2] is not future]
+            heapq.heapify(self._waiters[group])
+            self._pump(group)
+            raise
+        waited = time.monotonic() - started
+        stats['waited'] += 1
+        stats['wait_total'] += waited
+        stats['wait_max'] = max(stats['wait_max'], waited)
+
+    def _pump(self, group: str):
+        timer = self._timers.pop(group, None)
+        if timer:
+            timer.cancel()
+        bucket = self._buckets[group]
+        waiters = self._waiters[group]
+        while waiters:
+            if waiters[0][2].done():  # Cancelled waiter
+                heapq.heappop(waiters)
+                continue
+            if not bucket.try_take():
+                break
+            _, _, future = heapq.heappop(waiters)
+            future.set_result(None)
+        if waiters and group not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[group] = loop.call_later(bucket.time_until_token(), self._pump, group)
+
+    def observe(self, remaining_req_header: Optional[str]):
+        """Feed a response's Remaining-Req header back into its group's bucket."""
+        info = parse_remaining_req(remaining_req_header)
+        if info and isinstance(info.get('sec'), int):
+            self._bucket(info['group']).clamp(info['sec'])
+
+    def throttled(self, group: str, backoff: float = 1.0):
+        """Record a 429 and stall the group for `backoff` seconds."""
+        self._bucket(group).drain(backoff)
+        self._stats[group]['throttled'] += 1
+        logger.warning(f"⏳ [RateLimit] 429 on group '{group}'. Backing off {backoff:.1f}s")
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-group counters plus current queue depth and mean wait (seconds)."""
+        report = {}
+        for group, s in self._stats.items():
+            report[group] = dict(s,
+                                 queue_depth=len(self._waiters[group]),
+                                 wait_avg=(s['wait_total'] / s['waited']) if s['waited'] else 0.0)
+        return report
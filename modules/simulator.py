@@ -0,0 +1,761 @@
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid as uuid_lib
+from bisect import bisect_left, insort
+from collections import deque
+from itertools import islice
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Set, Union
+
+import numpy as np
+import websockets
+
+from modules.grid_ladder import get_price_unit
+from modules.latency import recorder as latency
+from modules.orderbook import OrderBook, BOOK_MAX_AGE
+from modules.rate_limiter import (RequestScheduler, TokenBucket, DEFAULT_GROUP_LIMITS,
+                                  PRIORITY_CRITICAL, PRIORITY_NORMAL, PRIORITY_BACKGROUND)
+from modules.upbit_client import UpbitAPIError, OrderRejected, MAX_THROTTLE_RETRIES
+from modules.upbit_handler import PRICE_MAX_AGE
+
+logger = logging.getLogger("TradingSystem")
+
+SIM_FEE_RATE = 0.0005      # Same as Upbit KRW markets
+CLOSED_ORDERS_KEPT = 10_000
+BOOK_DEPTH = 15            # Levels per side in the synthetic orderbook
+BOOK_SIZE = 1000.0         # Resting size per synthetic level
+UNLIMITED = 1e9            # Requests/sec for scheduler groups when the exchange has no rate limits
+
+def random_walk(start: float, steps: int, volatility: float = 1.0, seed: Optional[int] = None,
+                ticker: str = 'KRW-USDT', bounds: Optional[tuple] = None) -> np.ndarray:
+    """
+    Gaussian random walk snapped to the market's price unit.
+    With bounds=(low, high) the walk is reflected at the edges, so it keeps trading inside a grid.
+    """
+    rng = np.random.default_rng(seed)
+    path = start + np.cumsum(rng.normal(0, volatility, steps))
+    if bounds:
+        low, high = bounds
+        width = high - low
+        path = low + width - np.abs(np.mod(path - low, 2 * width) - width)
+    unit = float(get_price_unit(ticker, start))
+    return np.maximum(np.round(path / unit) * unit, unit)
+
+
+class SimExchange:
+    """
+    In-process Upbit stand-in: limit-order matching, balances and order states.
+
+    Orders rest until the market price trades through them (bids fill at price <= bid,
+    asks at price >= ask, always in full at the limit price). A limit through the
+    last price fills on placement; one at the last price rests. Every REST-style call pays `latency`
+    (+ uniform `jitter`) and, if `rate_limits` is given, takes a token from its Upbit
+    group or fails with a 429 like the real API. Market data and myOrder/myAsset
+    events go to listeners in Upbit's WebSocket message format.
+    """
+
+    def __init__(self, balances: Optional[Dict[str, float]] = None, fee_rate: float = SIM_FEE_RATE,
+                 latency: float = 0.0, jitter: float = 0.0, rate_limits: Optional[Dict[str, int]] = None,
+                 seed: Optional[int] = None):
+        self.fee_rate = fee_rate
+        self.latency = latency
+        self.jitter = jitter
+        self.balances: Dict[str, float] = dict(balances or {'KRW': 1e9})
+        self.locked: Dict[str, float] = {}
+        self.prices: Dict[str, float] = {}
+        self.orders: Dict[str, Dict] = {}           # uuid -> order (Upbit REST format)
+        self.identifiers: Dict[str, str] = {}       # client order id -> uuid
+        self.closed: deque = deque(maxlen=CLOSED_ORDERS_KEPT)  # done/cancel, oldest first
+        # market -> sorted resting prices, and (market, side, price) -> uuids (FIFO)
+        self._bid_prices: Dict[str, List[float]] = {}
+        self._ask_prices: Dict[str, List[float]] = {}
+        self._resting: Dict[tuple, List[str]] = {}
+        self.rate_limits = rate_limits
+        self._buckets = {g: TokenBucket(r) for g, r in rate_limits.items()} if rate_limits else None
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._rng = random.Random(seed)
+        self.stats = {'orders': 0, 'fills': 0, 'cancels': 0, 'calls': 0, 'throttled': 0, 'rejected': 0}
+
+    # --- Listeners (WebSocket-style fan-out) ---
+    def add_listener(self, listener: Callable[[Dict], None]):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Dict], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, message: Dict):
+        for listener in list(self._listeners):
+            listener(message)
+
+    # --- Latency / rate limits ---
+    async def _call(self, group: str):
+        self.stats['calls'] += 1
+        if self._buckets is not None:
+            bucket = self._buckets.get(group) or self._buckets.get('default')
+            if bucket is not None and not bucket.try_take():
+                self.stats['throttled'] += 1
+                await asyncio.sleep(self.latency)
+                raise UpbitAPIError(429, 'too_many_requests', f"Too many requests ({group})")
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        # Always yield, so a zero-latency exchange still interleaves like network I/O
+        await asyncio.sleep(delay)
+
+    def remaining_req(self, group: str) -> Optional[str]:
+        """Remaining-Req header value the real API would send for `group`."""
+        if self._buckets is None:
+            return None
+        bucket = self._buckets.get(group) or self._buckets.get('default')
+        if bucket is None:
+            return None
+        bucket._refill()
+        return f"group={group}; min={int(bucket.rate * 60)}; sec={max(int(bucket.tokens), 0)}"
+
+    # --- Market data ---
+    def set_price(self, market: str, price: float) -> int:
+        """Trade the market at `price`: match resting orders, publish ticker/orderbook. Returns fills."""
+        price = float(price)
+        self.prices[market] = price
+        fills = 0
+        bids = self._bid_prices.get(market)
+        while bids and bids[-1] >= price:  # Highest bid first
+            fills += self._fill_level(market, 'bid', bids.pop())
+        asks = self._ask_prices.get(market)
+        while asks and asks[0] <= price:   # Lowest ask first
+            fills += self._fill_level(market, 'ask', asks.pop(0))
+        now_ms = int(time.time() * 1000)
+        self._emit({'type': 'ticker', 'code': market, 'trade_price': price, 'timestamp': now_ms,
+                    'stream_type': 'REALTIME'})
+        self._emit(self.orderbook_message(market, now_ms))
+        return fills
+
+    def orderbook_message(self, market: str, timestamp: Optional[int] = None) -> Dict:
+        """Synthetic book around the last price, plus the volume of resting simulated orders."""
+        price = self.prices[market]
+        unit = float(get_price_unit(market, price))
+        units = []
+        for i in range(BOOK_DEPTH):
+            bid, ask = price - unit * (i + 1), price + unit * (i + 1)
+            units.append({'bid_price': bid, 'ask_price': ask,
+                          'bid_size': BOOK_SIZE + self._resting_volume(market, 'bid', bid),
+                          'ask_size': BOOK_SIZE + self._resting_volume(market, 'ask', ask)})
+        return {'type': 'orderbook', 'code': market, 'timestamp': timestamp or int(time.time() * 1000),
+                'orderbook_units': units, 'stream_type': 'REALTIME'}
+
+    def _resting_volume(self, market: str, side: str, price: float) -> float:
+        return sum(float(self.orders[u]['remaining_volume']) for u in self._resting.get((market, side, price), ()))
+
+    async def run_path(self, market: str, prices: Iterable[float], interval: float = 0.0,
+                       on_tick: Optional[Callable[[int, float], None]] = None) -> int:
+        """Replay a scripted price path (one trade per `interval` seconds). Returns total fills."""
+        fills = 0
+        for i, price in enumerate(prices):
+            fills += self.set_price(market, float(price))
+            if on_tick:
+                on_tick(i, price)
+            await asyncio.sleep(interval)
+        return fills
+
+    # --- Matching ---
+    def _book(self, market: str, side: str) -> List[float]:
+        books = self._bid_prices if side == 'bid' else self._ask_prices
+        return books.setdefault(market, [])
+
+    def _fill_level(self, market: str, side: str, price: float) -> int:
+        uuids = self._resting.pop((market, side, price), [])
+        for uuid in uuids:
+            self._fill(self.orders[uuid])
+        return len(uuids)
+
+    def _fill(self, order: Dict):
+        market, side = order['market'], order['side']
+        quote, base = market.split('-')
+        price, volume = float(order['price']), float(order['volume'])
+        fee = price * volume * self.fee_rate
+        if side == 'bid':
+            self._unlock(quote, price * volume + float(order['reserved_fee']))
+            self.balances[quote] -= price * volume + fee
+            self.balances[base] = self.balances.get(base, 0.0) + volume
+        else:
+            self._unlock(base, volume)
+            self.balances[base] -= volume
+            self.balances[quote] = self.balances.get(quote, 0.0) + price * volume - fee
+        order.update(state='done', remaining_volume='0', executed_volume=order['volume'],
+                     paid_fee=str(fee), remaining_fee='0', locked='0', trades_count=1)
+        self._close(order)
+        self.stats['fills'] += 1
+        self._emit_order(order, trade_price=price, trade_volume=volume)
+        self._emit_assets(quote, base)
+
+    def _close(self, order: Dict):
+        del self.orders[order['uuid']]
+        self.closed.append(order)
+
+    def _lock(self, currency: str, amount: float):
+        available = self.balances.get(currency, 0.0) - self.locked.get(currency, 0.0)
+        if amount > available + 1e-9:
+            side = 'bid' if currency == 'KRW' else 'ask'
+            self.stats['rejected'] += 1
+            raise UpbitAPIError(400, f'insufficient_funds_{side}', f"Insufficient {currency}: {available} < {amount}")
+        self.locked[currency] = self.locked.get(currency, 0.0) + amount
+
+    def _unlock(self, currency: str, amount: float):
+        self.locked[currency] = max(self.locked.get(currency, 0.0) - amount, 0.0)
+
+    def _emit_order(self, order: Dict, trade_price: Optional[float] = None, trade_volume: Optional[float] = None):
+        self._emit({
+            'type': 'myOrder', 'code': order['market'], 'uuid': order['uuid'],
+            'ask_bid': 'BID' if order['side'] == 'bid' else 'ASK', 'order_type': 'limit',
+            'state': order['state'], 'price': float(order['price']), 'avg_price': float(order['price']),
+            'volume': float(order['volume']), 'remaining_volume': float(order['remaining_volume']),
+            'executed_volume': float(order['executed_volume']), 'trade_price': trade_price,
+            'trade_volume': trade_volume, 'paid_fee': float(order['paid_fee']),
+            'timestamp': int(time.time() * 1000), 'stream_type': 'REALTIME',
+        })
+
+    def _emit_assets(self, *currencies: str):
+        self._emit({'type': 'myAsset', 'assets': [
+            {'currency': c, 'balance': self.balances.get(c, 0.0) - self.locked.get(c, 0.0),
+             'locked': self.locked.get(c, 0.0)} for c in currencies
+        ], 'timestamp': int(time.time() * 1000), 'stream_type': 'REALTIME'})
+
+    # --- REST-style API (same JSON shapes as UpbitRestClient) ---
+    async def place_limit_order(self, market: str, side: str, price: float, volume: float,
+                                identifier: Optional[str] = None) -> Dict:
+        await self._call('order')
+        quote, base = market.split('-')
+        price, volume = float(price), float(volume)
+        if price <= 0 or volume <= 0:
+            raise UpbitAPIError(400, 'invalid_parameter', f"price={price}, volume={volume}")
+        if identifier and identifier in self.identifiers:
+            raise UpbitAPIError(400, 'duplicate_identifier', f"identifier={identifier}")
+        reserved_fee = price * volume * self.fee_rate if side == 'bid' else 0.0
+        if side == 'bid':
+            self._lock(quote, price * volume + reserved_fee)
+        else:
+            self._lock(base, volume)
+        order = {
+            'uuid': str(uuid_lib.uuid4()), 'side': side, 'ord_type': 'limit', 'price': str(price),
+            'state': 'wait', 'market': market, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S+09:00'),
+            'volume': str(volume), 'remaining_volume': str(volume), 'reserved_fee': str(reserved_fee),
+            'remaining_fee': str(reserved_fee), 'paid_fee': '0', 'locked': str(price * volume + reserved_fee
+                                                                            if side == 'bid' else volume),
+            'executed_volume': '0', 'trades_count': 0,
+        }
+        if identifier:
+            order['identifier'] = identifier
+            self.identifiers[identifier] = order['uuid']
+        self.orders[order['uuid']] = order
+        self.stats['orders'] += 1
+        self._emit_order(order)
+        last = self.prices.get(market)
+        if last is not None and (price > last if side == 'bid' else price < last):
+            self._fill(order)  # Marketable limit: takes liquidity right away
+        else:
+            key = (market, side, price)
+            if key not in self._resting:
+                insort(self._book(market, side), price)
+            self._resting.setdefault(key, []).append(order['uuid'])
+        return dict(order)
+
+    async def cancel_order(self, uuid: str) -> Dict:
+        await self._call('order')
+        order = self.orders.get(uuid)
+        if order is None:
+            raise UpbitAPIError(404, 'order_not_found', f"Order {uuid} not found")
+        market, side, price = order['market'], order['side'], float(order['price'])
+        key = (market, side, price)
+        self._resting[key].remove(uuid)
+        if not self._resting[key]:
+            del self._resting[key]
+            book = self._book(market, side)
+            book.pop(bisect_left(book, price))
+        quote, base = market.split('-')
+        if side == 'bid':
+            self._unlock(quote, price * float(order['volume']) + float(order['reserved_fee']))
+        else:
+            self._unlock(base, float(order['volume']))
+        order.update(state='cancel', locked='0')
+        self._close(order)
+        self.stats['cancels'] += 1
+        self._emit_order(order)
+        self._emit_assets(quote, base)
+        return dict(order)
+
+    def _find(self, uuid: str) -> Optional[Dict]:
+        order = self.orders.get(uuid)
+        if order is not None:
+            return order
+        return next((o for o in reversed(self.closed) if o['uuid'] == uuid), None)
+
+    async def get_order(self, uuid: str) -> Dict:
+        await self._call('default')
+        order = self._find(uuid)
+        if order is None:
+            raise UpbitAPIError(404, 'order_not_found', f"Order {uuid} not found")
+        return dict(order)
+
+    async def get_orders_by_uuids(self, uuids: List[str], market: Optional[str] = None) -> List[Dict]:
+        await self._call('default')
+        wanted = set(uuids)
+        found = [o for u, o in self.orders.items() if u in wanted]
+        found += [o for o in self.closed if o['uuid'] in wanted]
+        return [dict(o) for o in found if market is None or o['market'] == market]
+
+    async def get_orders_by_identifiers(self, identifiers: List[str], market: Optional[str] = None) -> List[Dict]:
+        await self._call('default')
+        found = (self._find(self.identifiers[i]) for i in identifiers if i in self.identifiers)
+        return [dict(o) for o in found if o is not None and (market is None or o['market'] == market)]
+
+    async def get_open_orders(self, market: Optional[str] = None, page: int = 1, limit: int = 100) -> List[Dict]:
+        await self._call('default')
+        orders = (o for o in self.orders.values() if market is None or o['market'] == market)
+        return [dict(o) for o in islice(orders, (page - 1) * limit, page * limit)]
+
+    async def get_closed_orders(self, market: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        await self._call('default')
+        result = []
+        for order in reversed(self.closed):  # Newest first, like /v1/orders/closed
+            if market is None or order['market'] == market:
+                result.append(dict(order))
+                if len(result) >= limit:
+                    break
+        return result
+
+    async def get_accounts(self) -> List[Dict]:
+        await self._call('default')
+        return [{'currency': c, 'balance': str(b - self.locked.get(c, 0.0)), 'locked': str(self.locked.get(c, 0.0))}
+                for c, b in self.balances.items()]
+
+    async def get_ticker(self, markets: List[str]) -> List[Dict]:
+        await self._call('ticker')
+        return [{'market': m, 'trade_price': self.prices[m]} for m in markets if m in self.prices]
+
+    def summary(self) -> Dict:
+        return dict(self.stats, open_orders=len(self.orders),
+                    balances={c: round(b, 8) for c, b in self.balances.items()})
+
+
+class SimHandler:
+    """
+    Drop-in UpbitHandler backed by a SimExchange (no network).
+
+    Calls go through the same RequestScheduler as UpbitRestClient (priorities,
+    Remaining-Req feedback, 429 retries) and fail the same way UpbitHandler does
+    (logged, then None / [] / {}). Streams are in-process queues fed by the exchange.
+    The scheduler uses the exchange's rate limits; without any it does not throttle,
+    so a load test measures the bot rather than Upbit's 8 orders/sec.
+    """
+
+    def __init__(self, exchange: SimExchange, scheduler: Optional[RequestScheduler] = None):
+        self.exchange = exchange
+        limits = exchange.rate_limits or {group: UNLIMITED for group in DEFAULT_GROUP_LIMITS}
+        self.scheduler = scheduler or RequestScheduler(limits)
+        self.orderbooks: Dict[str, OrderBook] = {}
+        self.assets: Dict[str, Dict[str, Decimal]] = {}
+        self.private_ws_connected = False
+        self.last_update_time: Optional[float] = None
+        self._price_times: Dict[str, float] = {}
+        self._streams: List[asyncio.Queue] = []          # Market-data streams
+        self._private_streams: List[asyncio.Queue] = []  # myOrder/myAsset streams
+
+    # --- Request path (mirrors UpbitRestClient.request) ---
+    async def _request(self, group: str, priority: int, method, *args):
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            await self.scheduler.acquire(group, priority)
+            try:
+                result = await method(*args)
+            except UpbitAPIError as e:
+                if e.status == 429 and attempt < MAX_THROTTLE_RETRIES:
+                    self.scheduler.throttled(group, backoff=0.5 * (attempt + 1))
+                    continue
+                raise
+            self.scheduler.observe(self.exchange.remaining_req(group))
+            return result
+
+    async def close(self):
+        self.stop_websocket()
+        self.stop_private_websocket()
+
+    # --- Prices ---
+    @property
+    def prices(self) -> Dict[str, float]:
+        return {code: self.exchange.prices[code] for code in self._price_times}
+
+    @property
+    def current_price(self) -> Optional[float]:
+        if not self._price_times:
+            return None
+        return self.exchange.prices[max(self._price_times, key=self._price_times.get)]
+
+    def live_price(self, ticker: Optional[str] = None, max_age: float = PRICE_MAX_AGE) -> Optional[float]:
+        updated = self._price_times.get(ticker) if ticker else self.last_update_time
+        if updated is None or time.monotonic() - updated > max_age:
+            return None
+        return self.exchange.prices.get(ticker) if ticker else self.current_price
+
+    async def get_current_price(self, ticker: str) -> Optional[float]:
+        try:
+            tickers = await self._request('ticker', PRIORITY_NORMAL, self.exchange.get_ticker, [ticker])
+            return float(tickers[0]['trade_price']) if tickers else None
+        except Exception as e:
+            logger.error(f"Error fetching current price for {ticker}: {e}")
+            return None
+
+    # --- Orders ---
+    async def get_completed_orders(self, ticker: str, limit: int = 5) -> list:
+        try:
+            return await self._request('default', PRIORITY_BACKGROUND, self.exchange.get_closed_orders, ticker, limit)
+        except Exception as e:
+            logger.error(f"Error fetching completed orders: {e}")
+            return []
+
+    async def get_open_orders(self, ticker: str) -> list:
+        try:
+            orders, page = [], 1
+            while True:
+                batch = await self._request('default', PRIORITY_BACKGROUND, self.exchange.get_open_orders,
+                                            ticker, page, 100)
+                orders.extend(batch)
+                if len(batch) < 100:
+                    return orders
+                page += 1
+        except Exception as e:
+            logger.error(f"Error fetching open orders: {e}")
+            return []
+
+    async def get_balance(self, ticker: str) -> Decimal:
+        currency = ticker.split("-")[1] if "-" in ticker else ticker
+        try:
+            for b in await self._request('default', PRIORITY_NORMAL, self.exchange.get_accounts):
+                if b['currency'] == currency:
+                    return Decimal(b['balance'])
+            return Decimal("0")
+        except Exception as e:
+            logger.error(f"Error fetching balance for {currency}: {e}")
+            return Decimal("0")
+
+    async def get_total_balance(self, ticker: str) -> Decimal:
+        currency = ticker.split("-")[1] if "-" in ticker else ticker
+        if self.private_ws_connected and currency in self.assets:
+            asset = self.assets[currency]
+            return asset['balance'] + asset['locked']
+        try:
+            for b in await self._request('default', PRIORITY_BACKGROUND, self.exchange.get_accounts):
+                if b['currency'] == currency:
+                    return Decimal(b['balance']) + Decimal(b['locked'])
+            return Decimal("0")
+        except Exception as e:
+            logger.error(f"Error fetching total balance for {currency}: {e}")
+            return Decimal("0")
+
+    async def _place(self, ticker: str, side: str, price: float, amount: float, priority: int,
+                     identifier: Optional[str]) -> Optional[str]:
+        try:
+            # Same histogram names as UpbitHandler, so load tests show order-call latency too
+            with latency.call('api.buy_limit_order' if side == 'bid' else 'api.sell_limit_order'):
+                result = await self._request('order', priority, self.exchange.place_limit_order,
+                                             ticker, side, price, amount, identifier)
+            return result['uuid']
+        except Exception as e:
+            logger.error(f"Error placing {side} order: {e}")
+            return OrderRejected.from_error(e)
+
+    async def buy_limit_order(self, ticker: str, price: float, amount: float,
+                              identifier: Optional[str] = None) -> Optional[str]:
+        return await self._place(ticker, 'bid', price, amount, PRIORITY_NORMAL, identifier)
+
+    async def sell_limit_order(self, ticker: str, price: float, amount: float,
+                               identifier: Optional[str] = None) -> Optional[str]:
+        return await self._place(ticker, 'ask', price, amount, PRIORITY_CRITICAL, identifier)
+
+    async def cancel_order(self, uuid: str) -> bool:
+        try:
+            await self._request('order', PRIORITY_CRITICAL, self.exchange.cancel_order, uuid)
+            return True
+        except Exception as e:
+            logger.error(f"Error canceling order {uuid}: {e}")
+            return False
+
+    async def get_order_status(self, uuid: str) -> Optional[Dict]:
+        try:
+            return await self._request('default', PRIORITY_NORMAL, self.exchange.get_order, uuid)
+        except Exception as e:
+            logger.error(f"Error getting order status {uuid}: {e}")
+            return None
+
+    async def get_orders_by_uuids(self, uuids: List[str], ticker: Optional[str] = None,
+                                  strict: bool = False) -> Dict[str, Dict]:
+        unique = list(dict.fromkeys(u for u in uuids if u))
+        result: Dict[str, Dict] = {}
+        for i in range(0, len(unique), 100):
+            try:
+                orders = await self._request('default', PRIORITY_NORMAL, self.exchange.get_orders_by_uuids,
+                                             unique[i:i + 100], ticker)
+            except Exception as e:
+                if strict:
+                    raise
+                logger.error(f"Error fetching bulk order status: {e}")
+                continue
+            result.update((o['uuid'], o) for o in orders)
+        return result
+
+    async def get_orders_by_identifiers(self, identifiers: List[str], ticker: Optional[str] = None) -> Dict[str, Dict]:
+        unique = list(dict.fromkeys(i for i in identifiers if i))
+        orders = await self._request('default', PRIORITY_NORMAL, self.exchange.get_orders_by_identifiers,
+                                     unique, ticker) if unique else []
+        return {o['identifier']: o for o in orders}
+
+    def rate_limit_stats(self) -> Dict[str, Dict]:
+        return self.scheduler.stats()
+
+    # --- Streams ---
+    async def _stream(self, streams: List[asyncio.Queue], wants: Callable[[Dict], bool], consume):
+        """Feed matching exchange messages to `consume` until the queue gets None (stop_*)."""
+        queue: asyncio.Queue = asyncio.Queue()
+        delay = self.exchange.latency
+        loop = asyncio.get_running_loop()
+
+        def listener(message: Dict):
+            if wants(message):
+                if delay:
+                    loop.call_later(delay, queue.put_nowait, message)
+                else:
+                    queue.put_nowait(message)
+
+        self.exchange.add_listener(listener)
+        streams.append(queue)
+        try:
+            while True:
+                message = await queue.get()
+                if message is None:
+                    break
+                await consume(message)
+        finally:
+            self.exchange.remove_listener(listener)
+            if queue in streams:
+                streams.remove(queue)
+
+    async def connect_websocket(self, ticker: Union[str, List[str]], callback=None):
+        codes = {ticker} if isinstance(ticker, str) else set(ticker)
+
+        async def consume(message: Dict):
+            now = time.monotonic()
+            self._price_times[message['code']] = self.last_update_time = now
+            if callback:
+                try:
+                    await callback(float(message['trade_price']), message['code'])
+                except Exception as e:
+                    logger.error(f"WebSocket callback error: {e}")
+
+        await self._stream(self._streams, lambda m: m['type'] == 'ticker' and m['code'] in codes, consume)
+
+    async def connect_orderbook(self, codes: List[str]):
+        wanted = set(codes)
+
+        async def consume(message: Dict):
+            book = self.orderbooks.get(message['code'])
+            if book is None:
+                book = self.orderbooks[message['code']] = OrderBook(message['code'])
+            book.apply(message)
+
+        await self._stream(self._streams, lambda m: m['type'] == 'orderbook' and m['code'] in wanted, consume)
+
+    def orderbook(self, code: str, max_age: float = BOOK_MAX_AGE) -> Optional[OrderBook]:
+        book = self.orderbooks.get(code)
+        return book if book is not None and book.is_fresh(max_age) else None
+
+    def stop_websocket(self):
+        for queue in self._streams:
+            queue.put_nowait(None)
+
+    async def connect_private_websocket(self, codes: List[str], on_order=None, on_asset=None):
+        wanted = set(codes)
+
+        async def consume(message: Dict):
+            if message['type'] == 'myOrder':
+                if on_order:
+                    await on_order(message)
+                return
+            for asset in message['assets']:
+                self.assets[asset['currency']] = {'balance': Decimal(str(asset['balance'])),
+                                                  'locked': Decimal(str(asset['locked']))}
+            if on_asset:
+                await on_asset(self.assets)
+
+        self.assets.clear()
+        self.private_ws_connected = True
+        try:
+            await self._stream(self._private_streams, lambda m: m['type'] == 'myAsset' or (m['type'] == 'myOrder' and m['code'] in wanted),
+                               consume)
+        finally:
+            self.private_ws_connected = False
+
+    def stop_private_websocket(self):
+        for queue in self._private_streams:
+            queue.put_nowait(None)
+        self.private_ws_connected = False
+
+
+class SimServer:
+    """
+    Stand-in for Upbit's WebSocket endpoints, streaming a SimExchange.
+
+    Speaks the same subscription request format ([{ticket}, {type, codes}, ..., {format}])
+    on ws://host:port/websocket/v1 (ticker, trade, orderbook) and
+    ws://host:port/websocket/v1/private (myOrder, myAsset; JWT is not checked),
+    so the real UpbitHandler / MarketDataHub can run against it.
+    """
+
+    def __init__(self, exchange: SimExchange, host: str = '127.0.0.1', port: int = 0):
+        self.exchange = exchange
+        self.host = host
+        self.port = port
+        self._server = None
+        self.connections = 0
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/websocket/v1"
+
+    @property
+    def private_url(self) -> str:
+        return f"{self.url}/private"
+
+    async def start(self):
+        self._server = await websockets.serve(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    @staticmethod
+    def _parse_request(request: List[Dict]) -> Dict[str, Optional[Set[str]]]:
+        """type -> codes (None: every code, as for myAsset)"""
+        wanted = {}
+        for field in request:
+            if 'type' in field:
+                wanted[field['type']] = set(field['codes']) if field.get('codes') else None
+        return wanted
+
+    @staticmethod
+    def _outgoing(message: Dict, wanted: Dict[str, Optional[Set[str]]]) -> List[Dict]:
+        """Messages this connection gets for one exchange event (a ticker also feeds 'trade')."""
+        types = ('ticker', 'trade') if message['type'] == 'ticker' else (message['type'],)
+        out = []
+        for msg_type in types:
+            if msg_type not in wanted:
+                continue
+            codes = wanted[msg_type]
+            if codes is None or message.get('code') in codes:
+                out.append(message if msg_type == message['type'] else dict(message, type=msg_type))
+        return out
+
+    async def _serve(self, websocket):
+        self.connections += 1
+        try:
+            wanted = self._parse_request(json.loads(await websocket.recv()))
+        except (websockets.exceptions.ConnectionClosed, ValueError):
+            return
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def listener(message: Dict):
+            for out in self._outgoing(message, wanted):
+                queue.put_nowait(out)
+
+        async def pump():
+            while True:
+                await websocket.send(json.dumps(await queue.get()))
+
+        self.exchange.add_listener(listener)
+        sender = asyncio.create_task(pump())
+        closed = asyncio.create_task(websocket.wait_closed())
+        try:
+            # The sender would otherwise sit on an empty queue after the client went away
+            await asyncio.wait({sender, closed}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.exchange.remove_listener(listener)
+            for task in (sender, closed):
+                task.cancel()
+            await asyncio.gather(sender, closed, return_exceptions=True)
+
+
+async def load_test(manager_factory, config: Dict, ticks: int = 20_000, interval: float = 0.0,
+                    volatility: float = 2.0, seed: int = 1, latency: float = 0.0,
+                    rate_limits: Optional[Dict[str, int]] = None) -> Dict:
+    """
+    Run a TradingManager (built by `manager_factory(handler)`) against a random walk.
+    Returns exchange counters plus fills per minute of wall time.
+    """
+    ticker = config['coin_ticker']
+    start = (config['min_price'] + config['max_price']) / 2
+    exchange = SimExchange(latency=latency, rate_limits=rate_limits)
+    exchange.set_price(ticker, start)
+    handler = SimHandler(exchange)
+    manager = manager_factory(handler)
+    await manager.start_trading(config)
+    await asyncio.sleep(0.05)  # Streams subscribe
+
+    t0 = time.perf_counter()
+    path = random_walk(start, ticks, volatility, seed, ticker, bounds=(config['min_price'], config['max_price']))
+    await exchange.run_path(ticker, path, interval)
+    await asyncio.sleep(0.2)  # Drain the last events
+    elapsed = time.perf_counter() - t0
+    await manager.stop_trading()
+    await handler.close()
+    report = exchange.summary()
+    report.update(ticks=ticks, seconds=round(elapsed, 2),
+                  fills_per_minute=round(report['fills'] / elapsed * 60) if elapsed else 0,
+                  rate_limits=handler.rate_limit_stats())
+    return report
+
+
+def main(argv: Optional[list] = None):
+    """python -m modules.simulator --ticks 20000 --min 1400 --max 1500 --interval 5"""
+    parser = argparse.ArgumentParser(description="Load-test TradingManager against the local exchange simulator")
+    parser.add_argument('--ticker', default='KRW-USDT')
+    parser.add_argument('--min', type=float, default=1400.0, dest='min_price')
+    parser.add_argument('--max', type=float, default=1500.0, dest='max_price')
+    parser.add_argument('--interval', type=float, default=5.0)
+    parser.add_argument('--amount', type=float, default=1.0)
+    parser.add_argument('--profit', type=float, default=5.0)
+    parser.add_argument('--ticks', type=int, default=20_000)
+    parser.add_argument('--tick-interval', type=float, default=0.0, help="Seconds between simulated trades")
+    parser.add_argument('--volatility', type=float, default=2.0)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds per exchange call")
+    parser.add_argument('--rate-limits', action='store_true', help="Enforce Upbit's per-group limits (429s)")
+    args = parser.parse_args(argv)
+
+    from database.database import temp_database
+    from modules.trading_manager import TradingManager
+
+    async def _run():
+        # Throwaway DB: simulated contracts, config, notifications and order intents must
+        # never reach the live trading.db that the next real start recovers from
+        async with temp_database("simulator.db"):
+            config = {'coin_ticker': args.ticker, 'min_price': args.min_price, 'max_price': args.max_price,
+                      'grid_interval': args.interval, 'amount_per_grid': args.amount, 'profit_interval': args.profit}
+            report = await load_test(TradingManager, config, args.ticks, args.tick_interval, args.volatility,
+                                     latency=args.latency,
+                                     rate_limits=DEFAULT_GROUP_LIMITS if args.rate_limits else None)
+            print(json.dumps(report, indent=1, default=str))
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,8 @@ from datetime import datetime
 from modules.trading_manager import TradingManager
 from models.contract import Contract
 from models.trade import Trade
+from modules.latency import recorder as latency
+from modules.loop_monitor import profiler, lag_monitor, PROFILE_MAX_SECONDS
 
 logger = logging.getLogger("TradingSystem")
 
@@ -325,6 +327,64 @@ async def create_profit_embed(trading_manager: TradingManager) -> discord.Embed:
     return embed
 
 
+def _latency_table(stats: dict) -> str:
+    lines = [f"{'stage':<24}{'n':>6}{'p50':>8}{'p99':>8}{'max':>8}"]
+    for name, s in stats.items():
+        errors = f" ⚠{s['errors']}" if s['errors'] else ""
+        lines.append(f"{name:<24}{s['count']:>6}{s['p50_ms']:>8.1f}{s['p99_ms']:>8.1f}{s['max_ms']:>8.1f}{errors}")
+    return "```\n" + "\n".join(lines)[:1000] + "\n```"
+
+
+def create_latency_embed() -> discord.Embed:
+    """Create fill-path / exchange-call latency embed (ms)"""
+    snapshot = latency.snapshot()
+    embed = discord.Embed(
+        title="⏱️ 지연 시간 (ms)",
+        description=f"{snapshot['since'].replace('T', ' ')} 이후 누적",
+        color=discord.Color.purple(),
+        timestamp=datetime.now()
+    )
+
+    stats = snapshot['stats']
+    fills = {k: v for k, v in stats.items() if k.startswith(('buy_fill.', 'sell_fill.'))}
+    calls = {k[len('api.'):]: v for k, v in stats.items() if k.startswith('api.')}
+    others = {k: v for k, v in stats.items() if k not in fills and not k.startswith('api.')}  # db.*, loop.lag
+
+    embed.add_field(
+        name="⚡ 체결 감지 이후",
+        value=_latency_table(fills) if fills else "아직 체결이 없습니다",
+        inline=False
+    )
+    embed.add_field(
+        name="🌐 거래소 API",
+        value=_latency_table(calls) if calls else "아직 호출이 없습니다",
+        inline=False
+    )
+    if others:
+        embed.add_field(name="🗄️ DB · 이벤트 루프", value=_latency_table(others), inline=False)
+    return embed
+
+
+def create_profile_embed(path: str, report: dict) -> discord.Embed:
+    """Create loop profile summary embed"""
+    embed = discord.Embed(
+        title=f"🔬 이벤트 루프 프로파일 ({report['seconds']:.0f}초)",
+        description=f"루프 사용률 {report['busy_pct']}% · 최대 지연 {lag_monitor.max * 1000:.0f}ms (시작 이후)",
+        color=discord.Color.dark_teal(),
+        timestamp=datetime.now()
+    )
+
+    slowest = "\n".join(f"{c['max_ms']:>8.1f}ms ×{c['count']:<5} {c['name'][:40]}"
+                         for c in report['slowest_callbacks'][:8])
+    embed.add_field(name="🐢 가장 느린 콜백 (1회 최대)", value=f"```\n{slowest or '없음'}\n```", inline=False)
+
+    hot = "\n".join(f"{f['pct']:>5.1f}% {f['name'][:50]}" for f in report['hot_leaves'][:8])
+    embed.add_field(name="🔥 루프 점유 함수 (샘플 비율)", value=f"```\n{hot or '없음'}\n```", inline=False)
+
+    embed.set_footer(text=f"전체 결과: {path}")
+    return embed
+
+
 class SlashCommandsCog(commands.Cog):
     """Modern slash commands for better UX"""
     
@@ -378,6 +438,42 @@ class SlashCommandsCog(commands.Cog):
         view = RefreshView(self.trading_manager, "profit")
         
         await interaction.followup.send(embed=embed, view=view)
+    
+    @app_commands.command(name="지연시간", description="체결→주문 구간 및 API 지연 시간 조회")
+    @app_commands.describe(dump="logs/ 에 JSON 파일로도 저장")
+    async def latency_stats(self, interaction: discord.Interaction, dump: bool = False):
+        """Latency histograms (optionally dumped to a file)"""
+        if not self.is_admin(interaction):
+            await interaction.response.send_message("🚫 관리자만 사용할 수 있습니다", ephemeral=True)
+            return
+
+        embed = create_latency_embed()
+        if dump:
+            try:
+                path = await latency.dump_to_file()
+                embed.set_footer(text=f"저장됨: {path}")
+            except OSError as e:
+                logger.error(f"Failed to dump latency stats: {e}")
+                embed.set_footer(text=f"저장 실패: {e}")
+
+        await interaction.response.send_message(embed=embed)
+    
+    @app_commands.command(name="프로파일", description="이벤트 루프 샘플링 프로파일 (logs/ 에 저장)")
+    @app_commands.describe(seconds=f"측정 시간 (초, 최대 {PROFILE_MAX_SECONDS})")
+    async def profile(self, interaction: discord.Interaction,
+                      seconds: app_commands.Range[int, 1, PROFILE_MAX_SECONDS] = 10):
+        """Time-boxed event-loop profile"""
+        if not self.is_admin(interaction):
+            await interaction.response.send_message("🚫 관리자만 사용할 수 있습니다", ephemeral=True)
+            return
+        if profiler.running:
+            await interaction.response.send_message("⏳ 이미 프로파일링 중입니다", ephemeral=True)
+            return
+
+        await interaction.response.defer()
+
+        path, report = await profiler.profile_to_file(seconds)
+        await interaction.followup.send(embed=create_profile_embed(path, report))
 
 
 async def setup(bot: commands.Bot):
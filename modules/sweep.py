@@ -0,0 +1,156 @@
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.backtest import UPBIT_FEE_RATE, level_events, grid_arrays, load_prices
+
+BATCH_SIZE = 64  # Combinations per task (amortizes IPC)
+
+# Worker-process state: the shared price path and a per-level fill cache
+_shm: Optional[shared_memory.SharedMemory] = None
+_prices: Optional[np.ndarray] = None
+_level_cache: Dict[Tuple[float, float], Tuple[int, int, bool]] = {}
+
+
+class SharedPrices:
+    """Price path copied once into shared memory; workers map it instead of unpickling it per task."""
+
+    def __init__(self, prices: np.ndarray):
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+        self.shape, self.dtype = prices.shape, prices.dtype
+        self.shm = shared_memory.SharedMemory(create=True, size=max(prices.nbytes, 1))
+        np.ndarray(self.shape, self.dtype, buffer=self.shm.buf)[:] = prices
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(name: str, shape: tuple, dtype: str):
+    global _shm, _prices
+    _shm = shared_memory.SharedMemory(name=name)
+    _prices = np.ndarray(shape, np.dtype(dtype), buffer=_shm.buf)
+    _level_cache.clear()
+
+
+def _level_stats(level: float, target: float) -> Tuple[int, int, bool]:
+    """(buys, sells, armed) of one level. Levels repeat across combinations, so they are cached."""
+    key = (level, target)
+    stats = _level_cache.get(key)
+    if stats is None:
+        buy_t, sell_t, _ = level_events(_prices, level, target, _prices[0])
+        stats = (0, 0, False) if buy_t is None else (len(buy_t), len(sell_t), True)
+        _level_cache[key] = stats
+    return stats
+
+
+def evaluate(config: Dict, fee_rate: float = UPBIT_FEE_RATE) -> Dict:
+    """
+    Score one config against the worker's price path.
+    Capital never goes down in the grid model (an armed level always holds either its
+    bid or its coins), so peak capital is the cost of every level that got armed.
+    """
+    levels, targets = grid_arrays(config)
+    amount = float(config['amount_per_grid'])
+    last_price = _prices[-1]
+    realized = unrealized = capital = 0.0
+    buys = sells = 0
+    for level, target in zip(levels.tolist(), targets.tolist()):
+        n_buys, n_sells, armed = _level_stats(level, target)
+        if not armed:
+            continue
+        cost = level * amount
+        buy_fee = cost * fee_rate
+        capital += cost
+        buys += n_buys
+        sells += n_sells
+        realized += n_sells * ((target - level) * amount - buy_fee - target * amount * fee_rate)
+        if n_buys > n_sells:
+            unrealized += (last_price - level) * amount - buy_fee
+    return dict(config,
+                levels=len(levels), buys=buys, sells=sells,
+                realized_pnl=realized, unrealized_pnl=unrealized, max_capital=capital,
+                score=realized / capital if capital else 0.0)
+
+
+def _evaluate_batch(batch: List[Dict], fee_rate: float) -> List[Dict]:
+    return [evaluate(config, fee_rate) for config in batch]
+
+
+def param_grid(ticker: str, min_prices: Iterable[float], max_prices: Iterable[float],
+               intervals: Iterable[float], amounts: Iterable[float], profits: Iterable[float]) -> List[Dict]:
+    """Every valid (range, interval, amount, profit) combination as a wizard-style config."""
+    configs = []
+    for lo, hi, interval, amount, profit in itertools.product(min_prices, max_prices, intervals, amounts, profits):
+        if lo >= hi or interval <= 0 or interval > hi - lo:
+            continue
+        configs.append({'coin_ticker': ticker, 'min_price': lo, 'max_price': hi, 'grid_interval': interval,
+                        'amount_per_grid': amount, 'profit_interval': profit})
+    return configs
+
+
+def sweep(prices: np.ndarray, configs: Sequence[Dict], workers: Optional[int] = None,
+          fee_rate: float = UPBIT_FEE_RATE, batch_size: int = BATCH_SIZE) -> List[Dict]:
+    """Evaluate configs on all cores; results ranked by realized PnL per unit of capital locked."""
+    batches = [list(configs[i:i + batch_size]) for i in range(0, len(configs), batch_size)]
+    with SharedPrices(prices) as shared:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_attach,
+                                 initargs=(shared.shm.name, shared.shape, shared.dtype.str)) as pool:
+            results = [r for batch in pool.map(_evaluate_batch, batches, itertools.repeat(fee_rate)) for r in batch]
+    results.sort(key=lambda r: (r['score'], r['realized_pnl']), reverse=True)
+    return results
+
+
+def _range(spec: str) -> List[float]:
+    """'1400' | '1400,1420' | '1400:1500:20' (inclusive)"""
+    if ':' in spec:
+        start, stop, step = (float(x) for x in spec.split(':'))
+        return [round(v, 10) for v in np.arange(start, stop + step / 2, step)]
+    return [float(x) for x in spec.split(',')]
+
+
+def main(argv: Optional[list] = None):
+    """python -m modules.sweep prices.npy --min 1380:1420:10 --max 1480:1520:10 --interval 2,5,10 --profit 1:5:1"""
+    parser = argparse.ArgumentParser(description="Grid parameter sweep")
+    parser.add_argument('prices', help=".npy of trade prices, or .csv with open,high,low,close columns")
+    parser.add_argument('--ticker', default='KRW-USDT')
+    parser.add_argument('--min', required=True, dest='min_price')
+    parser.add_argument('--max', required=True, dest='max_price')
+    parser.add_argument('--interval', required=True)
+    parser.add_argument('--amount', default='1')
+    parser.add_argument('--profit', default='3')
+    parser.add_argument('--fee', type=float, default=UPBIT_FEE_RATE)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--json', help="Write the full ranking to this file")
+    args = parser.parse_args(argv)
+
+    prices = load_prices(args.prices)
+
+    configs = param_grid(args.ticker, _range(args.min_price), _range(args.max_price), _range(args.interval),
+                         _range(args.amount), _range(args.profit))
+    print(f"Evaluating {len(configs):,} combinations over {len(prices):,} prices...")
+    results = sweep(prices, configs, args.workers, args.fee)
+
+    print(f"{'#':>3} {'min':>12} {'max':>12} {'interval':>9} {'amount':>8} {'profit':>7} "
+          f"{'sells':>6} {'pnl':>12} {'capital':>14} {'pnl/cap':>9}")
+    for rank, r in enumerate(results[:args.top], 1):
+        print(f"{rank:>3} {r['min_price']:>12} {r['max_price']:>12} {r['grid_interval']:>9} {r['amount_per_grid']:>8} "
+              f"{r['profit_interval']:>7} {r['sells']:>6} {r['realized_pnl']:>12,.2f} {r['max_capital']:>14,.0f} "
+              f"{r['score']:>9.5f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
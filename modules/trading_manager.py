@@ -1,40 +1,225 @@
 import asyncio
 import logging
+import os
+import time
 from typing import List, Optional, Dict
 from decimal import Decimal
 from datetime import datetime
 
 from modules.upbit_handler import UpbitHandler
 from models.contract import Contract
+from models.contract_book import ContractBook
+from modules.grid_index import GridOccupancy, OPEN_ORDER, PENDING_BUY, ACTIVE_CONTRACT
+from modules.grid_ladder import GridLadder, sell_target_price
+from modules.level_locks import LevelLocks, InFlight
+from modules.events import EventQueue, PriceTick, OrderEvent, TimerEvent, RECONCILE_FILLS, SELF_HEAL, REFILL_GRID
 from models.trade import Trade
+from modules.latency import recorder as latency
+from modules.notifier import outbox, BUY_FILL, SELL_FILL, INFO
+from modules.order_journal import OrderJournal, INTENT, FAILED, CANCELED, FILLED
+from modules.utils import THROTTLED
 from database.database import set_config, get_config
 
 logger = logging.getLogger("TradingSystem")
 
+# With the private fill stream connected, REST fill polling only reconciles this often (seconds)
+RECONCILE_INTERVAL = 30
+FALLBACK_POLL_INTERVAL = 2   # REST fill polling period while the private stream is down
+SELF_HEAL_INTERVAL = 60      # Balance vs contract sync period
+UNKNOWN_FILL_WAIT = 5.0      # Max seconds a stream fill for an untracked uuid waits for in-flight placements
+
 class TradingManager:
-    def __init__(self, handler: UpbitHandler):
+    def __init__(self, handler: UpbitHandler, ticker: Optional[str] = None):
+        """
+        ticker: set when the manager is one grid of a Portfolio. It then only sees that
+        ticker's contracts, keeps its own saved config, and leaves the WebSocket streams
+        and reconcile timers to the portfolio.
+        """
         self.handler = handler
+        self.ticker = ticker
+        self.config_key = f"grid_config:{ticker}" if ticker else "last_grid_config"
         self.config = {}
         self.is_running = False
-        self._monitor_task = None
-        self._lock = asyncio.Lock()
+        # Event-driven engine: ticks, fills and timers are routed through one queue
+        self.events = EventQueue()
+        self._event_handlers = {
+            PriceTick: self._on_price_tick,
+            OrderEvent: self._on_order_event,
+            TimerEvent: self._on_timer,
+        }
+        self._engine_task = None
+        self._timer_task = None
+        self._price_stream_task = None  # Public ticker WebSocket
+        self._book_stream_task = None  # Local orderbook (orderbook stream)
+        self._fill_stream_task = None  # Private WebSocket (myOrder/myAsset) fill stream
+        self._last_refill_price = None  # Price the incremental refill last processed
+        self._lock = asyncio.Lock()  # start_trading only
+        # Grid work is locked per level: fills on different levels run concurrently,
+        # while a fill, its re-entry buy and scan placements on one level stay serialized
+        self._level_locks = LevelLocks()
+        self._scan_lock = asyncio.Lock()  # One full/incremental scan at a time (not held by fills)
+        self._placing = InFlight()  # Order placements awaiting their uuid
+        self._fill_tasks = set()  # Order events handled beside the engine loop
         self.bot_start_time = datetime.now().timestamp()
         self.pending_buy_orders = {}  # Changed from set to dict {uuid: price} for tracking order prices
+        # Placements that got no answer (may be resting), by journal identifier; see resolve_unacked
+        self.unacked_buys: Dict[str, float] = {}
+        self.unacked_sells: Dict[str, Contract] = {}
         self.notification_callback = None # Async callback for messages
+        self.outbox = outbox  # Notifications are persisted here and sent by its background sender
+        self.contract_book = ContractBook(ticker)  # In-memory ACTIVE contracts (write-through to DB)
+        self.journal = OrderJournal()  # Durable intent -> ack -> fill record of every order placed
+        self.ladder: Optional[GridLadder] = None  # Exact price levels of the current grid
+        self.grid: Optional[GridOccupancy] = None  # Level-indexed occupancy of the current grid
+        self.consistency_check = os.getenv("CONTRACT_BOOK_CHECK", "0") == "1"  # Diff cache vs DB on each self-heal sync
 
     def set_notification_callback(self, callback):
         self.notification_callback = callback
+        if callback:
+            self.outbox.set_sender(callback)
     
-    async def _send_notification(self, message: str):
-        if self.notification_callback:
-            try:
-                await self.notification_callback(message)
-            except Exception as e:
-                logger.error(f"Failed to send notification: {e}")
+    async def _send_notification(self, message: str, kind: str = INFO, **fields):
+        """Queue a message in the outbox; Discord I/O happens in the outbox sender, not here."""
+        try:
+            await self.outbox.post(kind, message, **fields)
+        except Exception as e:
+            logger.error(f"Failed to queue notification: {e}")
+
+    def _build_grid(self):
+        """(Re)build the ladder and occupancy index from config, contract book and pending orders."""
+        if not all(k in self.config for k in ('coin_ticker', 'min_price', 'max_price', 'grid_interval')):
+            self.ladder = None
+            self.grid = None
+            return
+        self.ladder = GridLadder.from_config(self.config)
+        self.grid = GridOccupancy(self.ladder)
+        for contract in self.contract_book.active():
+            self.grid.add_contract(contract.id, float(contract.buy_price))
+        for uuid, price in self.pending_buy_orders.items():
+            self.grid.add_pending(uuid, price)
+        for identifier, price in self.unacked_buys.items():
+            self.grid.add_pending(identifier, price)  # May be resting: the level stays taken until it is looked up
+
+    def _track_pending(self, uuid: str, price: float):
+        self.pending_buy_orders[uuid] = price
+        if self.grid:
+            self.grid.add_pending(uuid, price)
+
+    async def _place_buy(self, ticker: str, price: float, amount: float) -> Optional[str]:
+        """Journaled buy: the intent is durable before the request leaves; tracked as pending once acked."""
+        identifier = await self.journal.intent(ticker, 'bid', price, amount)
+        with self._placing:
+            uuid = await self.handler.buy_limit_order(ticker, price, amount, identifier=identifier)
+            if uuid:
+                self._track_pending(uuid, price)
+            elif uuid is None:
+                # No answer: it may be resting, so its level stays occupied until resolve_unacked
+                self.unacked_buys[identifier] = price
+                if self.grid:
+                    self.grid.add_pending(identifier, price)
+        await self.journal.acked(identifier, uuid)
+        return uuid
+
+    async def _place_sell(self, contract: Contract, identifier: Optional[str] = None, span=None) -> Optional[str]:
+        """
+        Journaled sell of a contract at its target price. identifier: an intent already
+        written by the caller (process_buy_fill batches it with the contract insert).
+        """
+        if identifier is None:
+            identifier = await self.journal.intent(contract.coin_ticker, 'ask', contract.target_price,
+                                                   contract.buy_amount, contract.buy_order_uuid)
+        if span:
+            span.mark('sell_sent')
+        with self._placing:
+            uuid = await self.handler.sell_limit_order(contract.coin_ticker, contract.target_price,
+                                                       contract.buy_amount, identifier=identifier)
+            if uuid:
+                if span:
+                    span.mark('sell_acked')
+                await asyncio.gather(self.contract_book.set_order_uuid(contract, uuid),
+                                     self.journal.acked(identifier, uuid))
+            elif uuid is None:
+                self.unacked_sells[identifier] = contract  # No answer: it may be resting
+        if not uuid:
+            await self.journal.acked(identifier, uuid)
+        return uuid
+
+    def _level_key(self, price: float):
+        """Lock key for a price: its grid level, or the price itself when off-grid / no grid."""
+        level = self.grid.level_of(price) if self.grid else None
+        return level if level is not None else ('price', float(price))
+
+    def _untrack_pending(self, uuid: str):
+        self.pending_buy_orders.pop(uuid, None)
+        if self.grid:
+            self.grid.remove_pending(uuid)
+
+    async def resolve_unacked(self):
+        """
+        Look up placements that got no answer by their identifier (one request): adopt the
+        orders that landed, close out the ones the exchange never received.
+        """
+        if not self.unacked_buys and not self.unacked_sells:
+            return
+        identifiers = list(self.unacked_buys) + list(self.unacked_sells)
+        try:
+            found = await self.handler.get_orders_by_identifiers(identifiers, self.config.get('coin_ticker'))
+        except Exception as e:
+            logger.warning(f"📒 Lookup of {len(identifiers)} unanswered order(s) failed, retrying later: {e}")
+            return
+
+        for identifier, price in list(self.unacked_buys.items()):
+            del self.unacked_buys[identifier]
+            order = found.get(identifier)
+            state = order.get('state') if order else None
+            # Swap the level's placeholder for the real order in one step (no await in between)
+            if self.grid:
+                self.grid.remove_pending(identifier)
+            if order is not None and state != 'cancel':
+                self._track_pending(order['uuid'], price)
+            if order is None:
+                await self.journal.resolve(identifier, FAILED)  # Never reached the exchange
+                continue
+            uuid = order['uuid']
+            await self.journal.acked(identifier, uuid)
+            if state == 'cancel':
+                await self.journal.resolve_uuid(uuid, CANCELED)
+                continue
+            logger.info(f"📒 Unanswered buy landed: {price} (UUID: {uuid})")
+            if state == 'done':
+                volume = float(order.get('executed_volume') or order.get('volume') or 0)
+                await self.process_buy_fill(uuid, float(order.get('price') or price), volume)
+                self._untrack_pending(uuid)
+
+        for identifier, contract in list(self.unacked_sells.items()):
+            del self.unacked_sells[identifier]
+            order = found.get(identifier)
+            if self.contract_book.get(contract.id) is None:
+                await self.journal.resolve(identifier, FILLED if order else FAILED)  # Closed meanwhile
+            elif order is None:
+                await self.journal.resolve(identifier, FAILED)
+                logger.warning(f"📒 Sell of Contract {contract.id} never reached the exchange. Re-placing...")
+                await self._place_sell(contract)
+            else:
+                logger.info(f"📒 Unanswered sell of Contract {contract.id} landed (UUID: {order['uuid']})")
+                await asyncio.gather(self.contract_book.set_order_uuid(contract, order['uuid']),
+                                     self.journal.acked(identifier, order['uuid']))
 
-    async def validate_balance(self, ticker: str, grid_count: int, amount_per_grid: float, min_price: float, max_price: float) -> dict:
+    def committed_quote(self) -> float:
+        """
+        Quote currency this running grid's buy levels claim: resting buys (locked on the
+        exchange) plus levels still to be bought. Contract levels are held as coin.
+        """
+        if self.grid is None or not self.config:
+            return 0.0
+        levels = [level for level in range(self.grid.level_count) if self.grid.state(level) != ACTIVE_CONTRACT]
+        return float(self.grid.ladder.total_cost(self.config['amount_per_grid'], levels))
+
+    async def validate_balance(self, ticker: str, grid_count: int, amount_per_grid: float, min_price: float, max_price: float,
+                               grid_interval: Optional[float] = None, reserved: float = 0.0) -> dict:
         """
         Validate if user has enough balance to start the grid.
+        reserved: quote currency already committed to other running grids (see Portfolio).
         Returns dict with 'valid' (bool), 'required', 'balance', 'message'.
         """
         try:
@@ -70,23 +255,29 @@ class TradingManager:
             # Max required = Max Price * Amount * Grid Count (Safe upper bound)
             # More accurate = Sum of grid prices * Amount
             
-            # Re-calculate grid prices
-            interval = (max_price - min_price) / (grid_count - 1) if grid_count > 1 else 0
-            # Wait, grid_count calculation in bot was (max-min)/interval + 1.
-            # Let's use the estimated grid count passed in.
-            
-            # Let's just use Average Price * Amount * Count for checking.
-            avg_price = (min_price + max_price) / 2
-            total_required_quote = avg_price * amount_per_grid * grid_count
+            # Re-calculate grid prices: exact sum over the ladder levels
+            # (grid_count from the wizard is (max-min)/interval + 1)
+            interval = grid_interval
+            if not interval:
+                interval = (max_price - min_price) / (grid_count - 1) if grid_count > 1 else (max_price - min_price) or 1
+            ladder = GridLadder(ticker, min_price, max_price, interval)
+            total_required_quote = float(ladder.total_cost(amount_per_grid))
             
             # Check Balance
-            balance = await self.handler.get_balance(quote)
+            if reserved:
+                # Other grids' resting buys are locked and the rest of their levels will be:
+                # measure against the total balance minus everything they claim
+                balance = await self.handler.get_total_balance(quote) - Decimal(str(reserved))
+            else:
+                balance = await self.handler.get_balance(quote)
             
             valid = balance >= Decimal(str(total_required_quote))
             
             msg = f"**[자금 점검]**\n" \
-                  f"- 필요 자금(예상): {total_required_quote:,.2f} {quote}\n" \
-                  f"- 보유 자금: {balance:,.2f} {quote}\n"
+                  f"- 필요 자금(예상): {total_required_quote:,.2f} {quote}\n"
+            if reserved:
+                msg += f"- 다른 그리드 사용 자금: {reserved:,.2f} {quote}\n"
+            msg += f"- 보유 자금: {balance:,.2f} {quote}\n"
             
             if valid:
                 msg += "✅ 자금이 충분합니다."
@@ -102,21 +293,60 @@ class TradingManager:
     async def recover_state(self):
         """
         Recover state on startup.
-        Recovers both active contracts (sell orders) and pending buy orders.
+        Replays the order journal (orders in flight at shutdown/crash), then checks the
+        sell order of every active contract.
         """
         logger.info("Starting State Recovery...")
         
+        # Saved config (meaning trading was active): needed to replay fills
+        saved_config = await get_config(self.config_key)
+        if saved_config:
+            try:
+                import ast
+                self.config = ast.literal_eval(saved_config)
+            except Exception as e:
+                logger.error(f"Error reading saved config: {e}", exc_info=True)
+        ticker = self.ticker or self.config.get('coin_ticker')
+
         # 1. Recover Active Contracts (Sell Orders)
-        active_contracts = await Contract.get_active_contracts()
-        logger.info(f"Found {len(active_contracts)} active contracts from DB.")
-        
+        await self.contract_book.load()
+        logger.info(f"Found {len(self.contract_book)} active contracts from DB.")
+
+        # 2. Replay in-flight orders from the journal (pending buys, unacked sells, missed fills)
+        journaled = False
+        if ticker:
+            try:
+                journaled = await self.journal.has_history(ticker)
+                if journaled:
+                    await self._replay_journal(ticker)
+            except Exception as e:
+                logger.error(f"Error replaying order journal: {e}", exc_info=True)
+            # Rows the replay could not resolve may be resting: keep their levels/contracts taken
+            # and let the reconcile look them up again (resolve_unacked)
+            try:
+                await self._load_unacked(ticker)
+            except Exception as e:
+                logger.error(f"Error loading unresolved order intents: {e}", exc_info=True)
+
+        # 3. Sell orders of active contracts
+        active_contracts = self.contract_book.active()
+        # One bulk lookup instead of a status call per contract
+        statuses = await self.handler.get_orders_by_uuids([c.order_uuid for c in active_contracts if c.order_uuid])
+
         active_sell_count = 0
         for contract in active_contracts:
             uuid = contract.order_uuid
             if not uuid:
                 continue
+            if uuid == contract.buy_order_uuid:
+                if contract in self.unacked_sells.values():
+                    continue  # Its sell may be resting; resolve_unacked finds out
+                # Still the placeholder: the sell was never acknowledged
+                logger.warning(f"Contract {contract.id} has no sell order. Placing...")
+                await self._place_sell(contract)
+                continue
                 
-            status = await self.handler.get_order_status(uuid)
+            status = statuses.get(uuid)
             if not status or 'error' in status:
                 logger.error(f"Order {uuid} for Contract {contract.id} not found.")
                 continue
@@ -130,10 +360,8 @@ class TradingManager:
                 await self.process_sell_fill(contract, contract.target_price, contract.buy_amount)
             elif state == 'cancel':
                 logger.warning(f"Contract {contract.id} Sell Order {uuid} was CANCELED. Re-placing...")
-                new_uuid = await self.handler.sell_limit_order(contract.coin_ticker, contract.target_price, contract.buy_amount)
-                if new_uuid:
-                    from database.database import execute_write
-                    await execute_write("UPDATE contracts SET order_uuid = ? WHERE id = ?", (new_uuid, contract.id))
+                await self.journal.resolve_uuid(uuid, CANCELED)
+                await self._place_sell(contract)
         
         # Summary for active sell orders
         if active_sell_count > 0:
@@ -143,95 +371,264 @@ class TradingManager:
         else:
             logger.info("No active sell orders to recover.")
         
-        # 2. Recover Pending Buy Orders (CRITICAL FIX for restart)
-        # Check if we have a saved config (meaning trading was active)
-        saved_config = await get_config("last_grid_config")
-        if saved_config:
+        # 4. Pending buys of a database that predates the journal: crawl the exchange once
+        if saved_config and ticker and not journaled:
             try:
-                import ast
-                self.config = ast.literal_eval(saved_config)
-                ticker = self.config.get('coin_ticker')
-                
-                if ticker:
-                    logger.info(f"Recovering pending buy orders for {ticker}...")
-                    
-                    # Get all open buy orders from exchange
-                    open_orders = await self.handler.get_open_orders(ticker)
-                    
-                    recovered_count = 0
-                    if open_orders:
-                        for order in open_orders:
-                            if order.get('side') == 'bid':  # Buy order
-                                order_uuid = order.get('uuid')
-                                order_price = float(order.get('price', 0))
-                                
-                                # Check if this order is not yet a contract
-                                if not await Contract.exists_buy_uuid(order_uuid):
-                                    self.pending_buy_orders[order_uuid] = order_price
-                                    recovered_count += 1
-                                    logger.info(f"Recovered Pending Buy Order: {order_price} (UUID: {order_uuid})")
-                    
-                    # NEW: Also check recently completed orders just in case some filled while bot was starting
-                    done_orders = await self.handler.get_completed_orders(ticker, limit=20)
-                    if isinstance(done_orders, list):
-                        for order in done_orders:
-                            if order.get('side') == 'bid' and order.get('state') == 'done':
-                                uuid = order.get('uuid')
-                                if not await Contract.exists_buy_uuid(uuid):
-                                    # This order was filled but we have no contract!
-                                    # We can't put it in pending_buy_orders (it's done), 
-                                    # so we should process it as a fill immediately if it's within our expected grids
-                                    # For safety, we'll let the self-healing sync catch this.
-                                    pass
-
-                    if recovered_count > 0:
-                        logger.info(f"✅ Successfully recovered {recovered_count} pending buy order(s).")
-                    else:
-                        logger.info("No pending buy orders found to recover.")
+                await self._recover_pending_from_exchange(ticker)
             except Exception as e:
                 logger.error(f"Error recovering pending buy orders: {e}", exc_info=True)
 
+        if saved_config:
+            self._build_grid()
+            if self.pending_buy_orders:
+                logger.info(f"✅ Successfully recovered {len(self.pending_buy_orders)} pending buy order(s).")
+            else:
+                logger.info("No pending buy orders found to recover.")
+
+    async def _replay_journal(self, ticker: str):
+        """
+        Resolve every INTENT/ACKED journal row of the ticker: at most one identifier lookup
+        and one bulk status lookup, instead of crawling open and done orders.
+        """
+        rows = await self.journal.unresolved(ticker)
+        logger.info(f"📒 Replaying {len(rows)} in-flight order(s) from the journal.")
+        if not rows:
+            return
+
+        # a. Sent but never acked (crash between request and response): find it by identifier
+        unacked = [row for row in rows if not row['uuid']]
+        if unacked:
+            found = await self.handler.get_orders_by_identifiers([row['identifier'] for row in unacked], ticker)
+            for row in unacked:
+                order = found.get(row['identifier'])
+                if order:
+                    row['uuid'] = order['uuid']
+                    await self.journal.acked(row['identifier'], row['uuid'])
+                else:
+                    await self.journal.resolve(row['identifier'], FAILED)  # Never reached the exchange
+
+        # b. Where is each order now?
+        uuids = [row['uuid'] for row in rows if row['uuid']]
+        # strict: a failed chunk raises (rows kept for the next start) instead of reading as "unknown"
+        statuses = await self.handler.get_orders_by_uuids(uuids, ticker, strict=True)
+        for row in rows:
+            uuid = row['uuid']
+            if not uuid:
+                continue
+            status = statuses.get(uuid)
+            if not status or 'error' in status:
+                # The exchange does not know this uuid (e.g. written by another environment):
+                # close it out instead of looking it up again on every start
+                logger.warning(f"📒 Journaled order {uuid} unknown to the exchange. Closing it out.")
+                await self.journal.resolve(row['identifier'], FAILED)
+                continue
+            state = status.get('state')
+
+            if row['side'] == 'bid':
+                if await self.contract_book.exists_buy_uuid(uuid):
+                    await self.journal.resolve(row['identifier'], FILLED)
+                elif state == 'wait':
+                    self.pending_buy_orders[uuid] = row['price']
+                    logger.info(f"Recovered Pending Buy Order: {row['price']} (UUID: {uuid})")
+                elif state == 'done':
+                    logger.info(f"📒 Buy {uuid} filled while offline @ {row['price']}. Replaying fill...")
+                    volume = float(status.get('executed_volume') or row['volume'])
+                    await self.process_buy_fill(uuid, float(status.get('price') or row['price']), volume)
+                elif state == 'cancel':
+                    await self.journal.resolve(row['identifier'], CANCELED)
+            else:
+                contract = next((c for c in self.contract_book.active() if c.buy_order_uuid == row['ref']), None)
+                if contract is None:
+                    # Contract already closed: the sell fill was processed
+                    await self.journal.resolve(row['identifier'], FILLED if state == 'done' else CANCELED)
+                elif state == 'cancel' and contract.order_uuid != uuid:
+                    await self.journal.resolve(row['identifier'], CANCELED)
+                elif contract.order_uuid == contract.buy_order_uuid:
+                    # Crashed before the contract learned its sell uuid; step 3 takes it from here
+                    await self.contract_book.set_order_uuid(contract, uuid)
+
+        await self.journal.prune()
+
+    async def _load_unacked(self, ticker: str):
+        """
+        Buys still INTENT without a uuid -> unacked_buys; sells of contracts that do not know
+        their sell uuid yet -> unacked_sells. Empty after a successful replay.
+        """
+        placeholders = {c.buy_order_uuid: c for c in self.contract_book.active() if c.order_uuid == c.buy_order_uuid}
+        for row in await self.journal.unresolved(ticker):
+            if row['side'] == 'bid':
+                if row['state'] == INTENT and not row['uuid']:
+                    self.unacked_buys[row['identifier']] = row['price']
+            elif row['ref'] in placeholders:
+                self.unacked_sells[row['identifier']] = placeholders[row['ref']]
+
+    async def _recover_pending_from_exchange(self, ticker: str):
+        """Pre-journal recovery: rebuild pending buys from the exchange's open orders."""
+        logger.info(f"Recovering pending buy orders for {ticker}...")
+        
+        # Get all open buy orders from exchange
+        open_orders = await self.handler.get_open_orders(ticker)
+        
+        if open_orders:
+            for order in open_orders:
+                if order.get('side') == 'bid':  # Buy order
+                    order_uuid = order.get('uuid')
+                    order_price = float(order.get('price', 0))
+                    
+                    # Check if this order is not yet a contract
+                    if not await self.contract_book.exists_buy_uuid(order_uuid):
+                        self.pending_buy_orders[order_uuid] = order_price
+                        logger.info(f"Recovered Pending Buy Order: {order_price} (UUID: {order_uuid})")
+        # Buys that filled while the bot was down are left to the self-healing sync
+
     async def start_trading(self, config: Dict) -> str:
         # 🔒 CRITICAL: Lock으로 동시 start_trading 호출 방지
         async with self._lock:
             if self.is_running:
                 return "Trading is already running."
+            if self.ticker and config.get('coin_ticker') != self.ticker:
+                return f"This grid only trades {self.ticker}."
 
             # 기존 태스크가 있다면 명시적으로 취소
-            if self._monitor_task and not self._monitor_task.done():
-                logger.warning("Cancelling existing monitor task...")
-                self._monitor_task.cancel()
+            if self._engine_task and not self._engine_task.done():
+                logger.warning("Cancelling existing engine task...")
+                self._engine_task.cancel()
                 try:
-                    await self._monitor_task
+                    await self._engine_task
                 except asyncio.CancelledError:
-                    logger.info("Previous monitor task cancelled successfully.")
+                    logger.info("Previous engine task cancelled successfully.")
 
             self.config = config
             self.is_running = True
             self.pending_buy_orders.clear() # Clear old tracking
+            if not self.contract_book.loaded:
+                await self.contract_book.load()
+            self._build_grid()
             
             logger.info(f"Starting trading with config: {config}")
-            await set_config("last_grid_config", str(config))
+            await set_config(self.config_key, str(config))
 
             await self._place_initial_orders()
-            self._monitor_task = asyncio.create_task(self._monitor_loop())
+            self._start_engine()
             
             return "Trading System Started."
 
     async def stop_trading(self):
         self.is_running = False
-        if self._monitor_task:
-            self._monitor_task.cancel()
+        if not self.ticker:  # Portfolio grids share the streams; the portfolio stops them
+            self.handler.stop_websocket()
+            self.handler.stop_private_websocket()
+        for task in (self._engine_task, self._timer_task, self._price_stream_task, self._book_stream_task,
+                     self._fill_stream_task):
+            if task:
+                task.cancel()
+        self._engine_task = self._timer_task = self._price_stream_task = self._book_stream_task = None
+        self._fill_stream_task = None
         logger.info("Trading System Stopped.")
 
+    # --- Event-driven engine ---
+    def _start_engine(self):
+        ticker = self.config['coin_ticker']
+        self.events.clear()
+        self._last_refill_price = None
+        self._engine_task = asyncio.create_task(self._engine_loop())
+        if self.ticker:
+            return  # Streams and timers come from the portfolio
+        self._timer_task = asyncio.create_task(self._timer_loop())
+        self._supervise_streams()
+        # Kick off one reconcile + refill right away
+        self.events.put(TimerEvent(RECONCILE_FILLS))
+
+    def _supervise_streams(self):
+        """(Re)start the market-data and private fill streams if they are not running."""
+        ticker = self.config['coin_ticker']
+        if self._price_stream_task is None or self._price_stream_task.done():
+            if self._price_stream_task is not None:
+                logger.warning("📡 Price stream stopped unexpectedly. Restarting...")
+            self._price_stream_task = asyncio.create_task(
+                self.handler.connect_websocket(ticker, callback=self.on_price)
+            )
+        if self._book_stream_task is None or self._book_stream_task.done():
+            self._book_stream_task = asyncio.create_task(self.handler.connect_orderbook([ticker]))
+        if self._fill_stream_task is None or self._fill_stream_task.done():
+            if self._fill_stream_task is not None:
+                logger.warning("📡 Fill stream stopped unexpectedly. Restarting...")
+            self._fill_stream_task = asyncio.create_task(
+                self.handler.connect_private_websocket([ticker], on_order=self.on_order_event)
+            )
+
+    async def _engine_loop(self):
+        """
+        Waits for events and routes each one to its handler. No work without events.
+        Order events get their own task so a fill never queues behind a scan; ticks and
+        timers are handled one at a time.
+        """
+        while self.is_running:
+            event = await self.events.get()
+            handler = self._event_handlers.get(type(event))
+            if handler is None:
+                logger.warning(f"No handler for event {event!r}")
+                continue
+            if isinstance(event, OrderEvent):
+                task = asyncio.create_task(self._dispatch(handler, event))
+                self._fill_tasks.add(task)
+                task.add_done_callback(self._fill_tasks.discard)
+                continue
+            await self._dispatch(handler, event)
+
+    async def _dispatch(self, handler, event):
+        try:
+            await handler(event)
+        except Exception as e:
+            logger.error(f"Error handling {type(event).__name__}: {e}", exc_info=True)
+
+    async def _timer_loop(self):
+        """Posts reconciliation timers. REST fill polling is slow while the private stream is up."""
+        last_fills = last_heal = time.monotonic()
+        while self.is_running:
+            await asyncio.sleep(FALLBACK_POLL_INTERVAL)
+            self._supervise_streams()
+            now = time.monotonic()
+            fills_interval = RECONCILE_INTERVAL if self.handler.private_ws_connected else FALLBACK_POLL_INTERVAL
+            if now - last_fills >= fills_interval:
+                last_fills = now
+                self.events.put(TimerEvent(RECONCILE_FILLS))
+            if now - last_heal >= SELF_HEAL_INTERVAL:
+                last_heal = now
+                self.events.put(TimerEvent(SELF_HEAL))
+
+    async def on_price(self, price: float, code: Optional[str] = None):
+        """Ticker WebSocket callback."""
+        self.events.put(PriceTick(self.config.get('coin_ticker'), price))
+
+    async def on_order_event(self, event: Dict):
+        """Private WebSocket (myOrder) callback."""
+        self.events.put(OrderEvent(event))
+
+    async def _on_price_tick(self, tick: PriceTick):
+        await self._refill_incremental(tick.price)
+
+    async def _on_order_event(self, event: OrderEvent):
+        await self.handle_order_event(event.data, event.received)
+        # A fill may have freed a level; only freed levels are looked at
+        price = self._last_refill_price
+        if price is not None:
+            await self._refill_incremental(price)
+
+    async def _on_timer(self, event: TimerEvent):
+        if event.kind == RECONCILE_FILLS:
+            await self._reconcile_fills()
+            await self._fill_empty_grids()
+        elif event.kind == REFILL_GRID:
+            await self._fill_empty_grids()
+        elif event.kind == SELF_HEAL:
+            await self._sync_with_exchange_balance()
+
     async def _place_initial_orders(self):
         ticker = self.config['coin_ticker']
-        min_price = self.config['min_price']
-        max_price = self.config['max_price']
-        interval = self.config['grid_interval']
         amount = self.config['amount_per_grid']
 
-        current_price = self.handler.current_price
+        current_price = self.handler.live_price(ticker)
         if not current_price:
             current_price = await self.handler.get_current_price(ticker)
         
@@ -241,115 +638,148 @@ class TradingManager:
 
         logger.info(f"Setting up grid. Current Price: {current_price}")
 
-        # Get both active contracts and currently open orders on exchange
-        active_contracts = await Contract.get_active_contracts()
-        existing_grid_prices = {float(c.buy_price) for c in active_contracts}
-        
+        # Index currently open orders on exchange (contracts/pending are already in self.grid)
         open_orders = await self.handler.get_open_orders(ticker)
-        open_buy_prices = set()
-        if open_orders:
-            for o in open_orders:
-                if o.get('side') == 'bid':
-                    open_buy_prices.add(float(o.get('price')))
-        
-        current_grid = min_price
-        epsilon = 1e-4
-        
-        while current_grid <= max_price:
-            is_exist = False
-            # Check DB
-            for exist_p in existing_grid_prices:
-                if abs(exist_p - current_grid) < epsilon:
-                    is_exist = True
-                    break
-            
-            # Check Exchange Open Orders
-            if not is_exist:
-                for open_p in open_buy_prices:
-                    if abs(open_p - current_grid) < epsilon:
-                        is_exist = True
-                        # Also add to our local tracking if missing
-                        # This handles cases where orders existed but weren't in memory
-                        break
+        self.grid.sync_open_orders(open_orders or [])
+
+        for level in range(self.grid.level_count):
+            current_grid = self.grid.price_of(level)
+            is_exist = not self.grid.is_free(level)
 
             if not is_exist and current_grid <= current_price:
-                uuid = await self.handler.buy_limit_order(ticker, current_grid, amount)
+                if self._skip_by_orderbook(ticker, current_grid):
+                    continue
+                async with self._level_locks.hold(level):
+                    uuid = await self._place_buy(ticker, current_grid, amount)
                 if uuid:
-                    self.pending_buy_orders[uuid] = current_grid
-                    logger.info(f"Placed Initial Buy: {current_grid} (UUID: {uuid})")
+                    logger.info("Placed Initial Buy: %s (UUID: %s)", current_grid, uuid, extra=THROTTLED)
             elif is_exist:
-                logger.info(f"Skipping Grid {current_grid}: Already occupied (Contract or Open Order).")
-                
-            current_grid += interval
+                logger.info("Skipping Grid %s: Already occupied (Contract or Open Order).", current_grid, extra=THROTTLED)
 
-    async def _monitor_loop(self):
-        # NEW: Self-healing sync counter
-        sync_counter = 0
+    def _skip_by_orderbook(self, ticker: str, price: float) -> bool:
+        """
+        Local-orderbook check before a buy (no REST). Skips a level that would cross the
+        spread, or (if config 'min_depth_ahead' is set) one with less resting bid volume
+        at or above it than that. Without a fresh book nothing is skipped; skipped levels
+        stay empty and are retried on later ticks/scans.
+        """
+        book = self.handler.orderbook(ticker)
+        if book is None:
+            return False
+        if book.crosses('bid', price):
+            logger.info("📖 [GRID] Skip %s: would cross the spread (ask %s)", price, book.best_ask(), extra=THROTTLED)
+            return True
+        min_depth = float(self.config.get('min_depth_ahead', 0) or 0)
+        if min_depth and book.bid_depth(price) < min_depth:
+            logger.info("📖 [GRID] Skip %s: thin bid depth ahead (%s < %s)", price, book.bid_depth(price), min_depth,
+                        extra=THROTTLED)
+            return True
+        return False
 
-        while self.is_running:
-            try:
-                # 1. Sync Active Contracts (Sell Fills)
-                active_contracts = await Contract.get_active_contracts()
-                for contract in active_contracts:
-                    await self._check_sell_fill(contract)
-                
-                # 2. Check for New Buy Fills (Robust Polling)
-                ticker = self.config.get('coin_ticker')
-                if ticker:
-                    # Method A: Specific status check for ALL pending orders (Most Reliable)
-                    pending_uuids = list(self.pending_buy_orders.keys())
-                    for uuid in pending_uuids:
-                        status = await self.handler.get_order_status(uuid)
-                        if status and status.get('state') == 'done':
-                            price = float(status.get('price', 0))
-                            volume = float(status.get('volume', 0))
-                            executed_vol = float(status.get('executed_volume', volume))
-                            
-                            logger.info(f"✅ [Robust Check] Detected Buy Fill: {uuid} @ {price}")
-                            await self.process_buy_fill(uuid, price, executed_vol)
-                            self.pending_buy_orders.pop(uuid, None)
-                    
-                    # Method B: Fast Polling of recent done orders (Good for high frequency)
-                    done_orders = await self.handler.get_completed_orders(ticker, limit=20)
-                    if isinstance(done_orders, list):
-                        for order in done_orders:
-                            if order.get('side') != 'bid': continue
-                            uuid = order.get('uuid')
-                            
-                            if uuid in self.pending_buy_orders:
-                                # Found one through fast polling
-                                price = float(order.get('price', 0)) 
-                                volume = float(order.get('volume', 0)) 
-                                executed_vol = float(order.get('executed_volume', volume))
-                                
-                                logger.info(f"Detected Buy Fill (Fast Poll): {uuid} @ {price}")
-                                await self.process_buy_fill(uuid, price, executed_vol)
-                                self.pending_buy_orders.pop(uuid, None)
-                
-                # 3. Fill Empty Grids
-                await self._fill_empty_grids()
+    def watch_uuids(self) -> List[str]:
+        """Every order whose fill this grid is waiting for (sell orders + pending buys)."""
+        # A contract still holding its buy uuid has no acknowledged sell yet: nothing to watch
+        return ([c.order_uuid for c in self.contract_book.active() if c.order_uuid and c.order_uuid != c.buy_order_uuid]
+                + list(self.pending_buy_orders))
 
-                # 4. Periodic Self-Healing Sync (Every 1 minute approx)
-                sync_counter += 1
-                if sync_counter >= 30: # 2s * 30 = 60s
-                    await self._sync_with_exchange_balance()
-                    sync_counter = 0
+    async def _reconcile_fills(self):
+        """
+        REST fill detection. Fills normally arrive through the private WebSocket;
+        this runs on the reconcile timer as the fallback.
+        """
+        await self.resolve_unacked()
+        # 0. One bulk status lookup for every sell order and pending buy
+        # (a few requests per cycle regardless of grid size)
+        watch_uuids = self.watch_uuids()
+        statuses = await self.handler.get_orders_by_uuids(watch_uuids) if watch_uuids else {}
+        ticker = self.config.get('coin_ticker')
+        done_orders = await self.handler.get_completed_orders(ticker, limit=20) if ticker else []
+        await self.apply_fill_statuses(statuses, done_orders)
 
-                await asyncio.sleep(2)
-            except Exception as e:
-                logger.error(f"Error in monitor loop: {e}", exc_info=True)
-                await asyncio.sleep(5)
+    async def apply_fill_statuses(self, statuses: Dict[str, Dict], done_orders: List[Dict]):
+        """
+        Apply a bulk status snapshot ({uuid: order}) and a list of recently done orders.
+        The portfolio fetches both once for all grids and hands each grid the same data.
+        """
+        # 1. Sync Active Contracts (Sell Fills)
+        for contract in self.contract_book.active():
+            await self._check_sell_fill(contract, statuses.get(contract.order_uuid))
 
-    async def process_buy_fill(self, order_uuid: str, price: float, volume: float):
-        async with self._lock:
+        # 2. Check for New Buy Fills (Robust Polling)
+        pending_uuids = list(self.pending_buy_orders.keys())
+
+        # Method A: Specific status check for ALL pending orders (Most Reliable)
+        for uuid in pending_uuids:
+            status = statuses.get(uuid)
+            if status and status.get('state') == 'done':
+                detected_at = time.perf_counter()
+                price = float(status.get('price', 0))
+                volume = float(status.get('volume', 0))
+                executed_vol = float(status.get('executed_volume', volume))
+
+                logger.info(f"✅ [Robust Check] Detected Buy Fill: {uuid} @ {price}")
+                await self.process_buy_fill(uuid, price, executed_vol, detected_at)
+                self._untrack_pending(uuid)
+
+        # Method B: Fast Polling of recent done orders (Good for high frequency)
+        if isinstance(done_orders, list):
+            for order in done_orders:
+                if order.get('side') != 'bid': continue
+                uuid = order.get('uuid')
+
+                if uuid in self.pending_buy_orders:
+                    # Found one through fast polling
+                    detected_at = time.perf_counter()
+                    price = float(order.get('price', 0))
+                    volume = float(order.get('volume', 0))
+                    executed_vol = float(order.get('executed_volume', volume))
+
+                    logger.info(f"Detected Buy Fill (Fast Poll): {uuid} @ {price}")
+                    await self.process_buy_fill(uuid, price, executed_vol, detected_at)
+                    self._untrack_pending(uuid)
+
+    async def handle_order_event(self, event: Dict, received: Optional[float] = None):
+        """
+        myOrder event from the private WebSocket.
+        A 'done' order is routed straight into process_buy_fill / process_sell_fill.
+        received: time.perf_counter() when the event came off the socket (latency spans)
+        """
+        if event.get('state') != 'done':
+            return
+
+        uuid = event.get('uuid')
+        price = float(event.get('price') or event.get('avg_price') or 0)
+        executed_vol = float(event.get('executed_volume') or event.get('volume') or 0)
+
+        if event.get('ask_bid') == 'BID':
+            if uuid not in self.pending_buy_orders:
+                # Filled before the placing call returned its uuid?
+                await self._placing.settled(UNKNOWN_FILL_WAIT)
+            if uuid in self.pending_buy_orders:
+                logger.info(f"⚡ [Stream] Detected Buy Fill: {uuid} @ {price}")
+                await self.process_buy_fill(uuid, price, executed_vol, received)
+                self._untrack_pending(uuid)
+        elif event.get('ask_bid') == 'ASK':
+            contract = self.contract_book.get_by_order_uuid(uuid)
+            if contract is None and await self._placing.settled(UNKNOWN_FILL_WAIT):
+                contract = self.contract_book.get_by_order_uuid(uuid)
+            if contract:
+                logger.info(f"⚡ [Stream] Detected Sell Fill: Contract {contract.id} @ {price}")
+                await self.process_sell_fill(contract, price, contract.buy_amount, received)
+
+    async def process_buy_fill(self, order_uuid: str, price: float, volume: float,
+                               detected_at: Optional[float] = None):
+        """detected_at: time.perf_counter() of fill detection; stages are timed from it."""
+        span = latency.span('buy_fill', detected_at)
+        async with self._level_locks.hold(self._level_key(self.pending_buy_orders.get(order_uuid, price))):
             # Check idempotency again
-            if await Contract.exists_buy_uuid(order_uuid):
+            if await self.contract_book.exists_buy_uuid(order_uuid):
                 logger.warning(f"Contract for buy order {order_uuid} already exists. Skipping.")
                 return
 
             ticker = self.config['coin_ticker']
             profit_target = self.config.get('profit_interval', 3.0)
-            target_price = price + profit_target
+            target_price = sell_target_price(ticker, price, profit_target)
             
             # Create Contract
             contract = Contract(
@@ -361,21 +791,28 @@ class TradingManager:
                 order_uuid=order_uuid, # Temp, updated below
                 buy_order_uuid=order_uuid 
             )
-            created_contract = await Contract.create(contract)
+            # One writer batch (one fsync): the contract, the sell intent and the buy marked filled
+            created_contract, sell_identifier, _ = await asyncio.gather(
+                self.contract_book.add(contract),
+                self.journal.intent(ticker, 'ask', target_price, volume, order_uuid),
+                self.journal.filled(order_uuid),
+            )
+            span.mark('contract_persisted')
+            if self.grid:
+                self.grid.add_contract(created_contract.id, price)
             logger.info(f"Created Contract {created_contract.id} for Order {order_uuid}")
             
             await self._send_notification(f"🔔 **매수 체결 알림**\n"
                                           f"- 티커: {ticker}\n"
                                           f"- 가격: {price}\n"
                                           f"- 수량: {volume}\n"
-                                          f"- 계약 ID: {created_contract.id}")
+                                          f"- 계약 ID: {created_contract.id}",
+                                          BUY_FILL, ticker=ticker, price=price, volume=volume)
 
             # Place Sell Order
-            sell_uuid = await self.handler.sell_limit_order(ticker, target_price, volume)
+            sell_uuid = await self._place_sell(created_contract, sell_identifier, span)
             
             if sell_uuid:
-                from database.database import execute_write
-                await execute_write("UPDATE contracts SET order_uuid = ? WHERE id = ?", (sell_uuid, created_contract.id))
                 logger.info(f"Updated Contract {created_contract.id} with Sell UUID {sell_uuid}")
             else:
                 logger.error(f"Failed to place sell order for Contract {created_contract.id}")
@@ -390,12 +827,11 @@ class TradingManager:
                 profit=0.0
             ))
 
-    async def _check_sell_fill(self, contract: Contract):
-        # Check status of the sell order
-        if not contract.order_uuid:
-            return
+    async def _check_sell_fill(self, contract: Contract, status: Optional[Dict]):
+        # Check status of the sell order (status comes from the bulk lookup)
+        if not contract.order_uuid or contract.order_uuid == contract.buy_order_uuid:
+            return  # No sell acknowledged yet (the buy uuid is a placeholder)
 
-        status = await self.handler.get_order_status(contract.order_uuid)
         if status and status.get('state') == 'done':
             # Filled!
             price = float(status.get('price', contract.target_price)) # Use target if price missing
@@ -404,22 +840,35 @@ class TradingManager:
             
             await self.process_sell_fill(contract, price, contract.buy_amount)
 
-    async def process_sell_fill(self, contract: Contract, price: float, volume: float):
-        async with self._lock:
+    async def process_sell_fill(self, contract: Contract, price: float, volume: float,
+                                detected_at: Optional[float] = None):
+        span = latency.span('sell_fill', detected_at)
+        async with self._level_locks.hold(self._level_key(contract.buy_price)):
+            # The same fill can arrive from the WebSocket and the REST fallback
+            if self.contract_book.get(contract.id) is None:
+                logger.warning(f"Contract {contract.id} is already closed. Skipping sell fill.")
+                return
+
             logger.info(f"Processing Sell Fill for Contract {contract.id}")
             
             # 1. Close Contract
             profit = (price - contract.buy_price) * volume
             profit_rate = (price - contract.buy_price) / contract.buy_price
             
-            await Contract.close_contract(contract.id, price, profit, profit_rate)
+            await asyncio.gather(self.contract_book.close(contract, price, profit, profit_rate),
+                                 self.journal.filled(contract.order_uuid))
+            span.mark('contract_closed')
+            if self.grid:
+                self.grid.remove_contract(contract.id)
             logger.info(f"Closed Contract {contract.id}. Profit: {profit}")
             
             await self._send_notification(f"💰 **익절 알림 (매도 체결)**\n"
                                           f"- 티커: {contract.coin_ticker}\n"
                                           f"- 매도가: {price}\n"
                                           f"- 수익: {profit:.2f} ({(profit_rate*100):.2f}%)\n"
-                                          f"- 계약 ID: {contract.id}")
+                                          f"- 계약 ID: {contract.id}",
+                                          SELL_FILL, ticker=contract.coin_ticker, price=price, volume=volume,
+                                          profit=profit)
 
             # 2. Record Trade
             await Trade.create(Trade(
@@ -436,9 +885,9 @@ class TradingManager:
             re_buy_price = contract.buy_price
             re_buy_amount = contract.buy_amount 
             
-            new_buy_uuid = await self.handler.buy_limit_order(ticker, re_buy_price, re_buy_amount)
+            new_buy_uuid = await self._place_buy(ticker, re_buy_price, re_buy_amount)  # Tracked with price
             if new_buy_uuid:
-                self.pending_buy_orders[new_buy_uuid] = re_buy_price  # Track with price
+                span.mark('reentry_placed')
                 logger.info(f"Re-entry Buy Order Placed: {re_buy_price}, UUID: {new_buy_uuid}")
             else:
                 logger.error("Failed to place Re-entry Buy Order")
@@ -449,139 +898,148 @@ class TradingManager:
         
         "야, 나 이 가격에 주문 낼거다~" → "괜찮아/안돼"
         
-        이 함수는 반드시 락(lock) 안에서만 호출되어야 합니다.
+        이 함수는 반드시 해당 레벨의 락(self._level_locks) 안에서만 호출되어야 합니다.
         주문 직전에 마지막으로 중복을 확인합니다.
+
+        거래소 미체결 주문은 호출자가 스캔 시작 시 한 번 가져와 self.grid 에 반영해 둔
+        스냅샷을 사용합니다 (주문마다 다시 조회하지 않음). 그 이후 이 봇이 낸 주문은
+        pending 으로 추적되고, 응답 없이 끝난 주문(journal INTENT)도 확인될 때까지
+        레벨을 점유하므로 확인은 레벨당 O(1) 입니다.
         """
-        epsilon = 1e-4
-        
+        level = self.grid.level_of(price) if self.grid else None
+
         # 마지막 순간 재확인: "이미 주문 있어?"
-        # 1. 로컬 pending 확인
-        for existing_price in self.pending_buy_orders.values():
-            if abs(existing_price - price) < epsilon:
+        # 1. 로컬 pending / 2. 메모리 ContractBook / 3. 스캔 시점의 거래소 미체결 주문
+        if level is not None:
+            state = self.grid.state(level)
+            if state == PENDING_BUY:
                 logger.warning(f"🚫 Order rejected: Already have pending order at {price}")
                 return None
-        
-        # 2. DB에서 active contracts 확인
-        active_contracts = await Contract.get_active_contracts()
-        for contract in active_contracts:
-            if abs(float(contract.buy_price) - price) < epsilon:
+            if state == ACTIVE_CONTRACT:
                 logger.warning(f"🚫 Order rejected: Active contract exists at {price}")
                 return None
-        
-        # 3. 거래소에 실제 주문 확인 (최종 방어선)
-        open_orders = await self.handler.get_open_orders(ticker)
-        if open_orders:
-            for order in open_orders:
-                if order.get('side') == 'bid' and abs(float(order.get('price', 0)) - price) < epsilon:
-                    logger.warning(f"🚫 Order rejected: Open order exists at {price}")
-                    return None
+            if state == OPEN_ORDER:
+                logger.warning(f"🚫 Order rejected: Open order exists at {price}")
+                return None
         
         # ✅ 모든 체크 통과! "괜찮아~ 주문 넣어!"
-        logger.info(f"✅ All checks passed. Placing order at {price}")
-        uuid = await self.handler.buy_limit_order(ticker, price, amount)
+        logger.info("✅ All checks passed. Placing order at %s", price, extra=THROTTLED)
+        uuid = await self._place_buy(ticker, price, amount)
         
         if uuid:
-            self.pending_buy_orders[uuid] = price
-            logger.info(f"📝 Order registered: UUID={uuid}, Price={price}")
+            logger.info("📝 Order registered: UUID=%s, Price=%s", uuid, price, extra=THROTTLED)
         
         return uuid
 
-    async def _fill_empty_grids(self):
+    async def _fill_empty_grids(self, open_orders: Optional[List[Dict]] = None):
         """
         Check for empty grid levels below current price where no order/contract exists,
         and place buy orders there.
+        open_orders: exchange open orders for this ticker, if the caller already fetched them.
         
-        🔒 전체 함수가 락(lock)으로 보호됩니다 - Race Condition 방지
+        🔒 스캔은 _scan_lock, 각 레벨의 주문은 레벨 락으로 보호됩니다 - Race Condition 방지
+        (다른 레벨의 체결 처리는 스캔을 기다리지 않습니다)
         """
-        # 🔒 CRITICAL: 전체 함수를 락으로 보호 (문지기 패턴)
-        async with self._lock:
+        async with self._scan_lock:
             try:
                 ticker = self.config.get('coin_ticker')
                 if not ticker: return
                 
-                min_price = self.config['min_price']
-                max_price = self.config['max_price']
-                interval = self.config['grid_interval']
                 amount = self.config['amount_per_grid']
+                if self.grid is None:
+                    self._build_grid()
                 
-                # 1. Get Current Market Price
-                current_price = await self.handler.get_current_price(ticker)
+                # 1. Get Current Market Price (live WebSocket price, REST only if stale)
+                current_price = self.handler.live_price(ticker) or await self.handler.get_current_price(ticker)
                 if not current_price: return
 
-                # 2. Get All Active States
-                # Active Contracts (already bought)
-                active_contracts = await Contract.get_active_contracts()
-                active_buy_prices = {float(c.buy_price) for c in active_contracts}
-                
-                # Pending Buy Orders (locally tracked)
-                pending_buy_prices = set(self.pending_buy_orders.values())
-                
-                # Also check exchange open orders as backup validation
-                open_orders = await self.handler.get_open_orders(ticker)
-                open_buy_prices = set()
-                if open_orders:
-                    for o in open_orders:
-                        if o.get('side') == 'bid':
-                             open_buy_prices.add(float(o.get('price')))
-                
-                # 3. Scan Grids
-                current_grid = min_price
-                epsilon = 1e-4
+                # 2. Refresh exchange open orders as backup validation
+                # (Active contracts and pending buys are kept up to date in self.grid)
+                if open_orders is None:
+                    open_orders = await self.handler.get_open_orders(ticker)
+                self.grid.sync_open_orders(open_orders or [])
                 
-                while current_grid <= max_price:
-                    # Target must be <= Current Price (Don't buy above market)
-                    if current_grid <= current_price:
-                        
-                        # Check if occupied by Active Contract
-                        is_contract_active = False
-                        for price in active_buy_prices:
-                            if abs(price - current_grid) < epsilon:
-                                is_contract_active = True
-                                break
-                        
-                        # Check if occupied by Pending Buy Order (LOCAL TRACKING)
-                        is_pending = False
-                        for price in pending_buy_prices:
-                            if abs(price - current_grid) < epsilon:
-                                is_pending = True
-                                break
-                        
-                        # Check if occupied by Open Buy Order (EXCHANGE VERIFICATION)
-                        is_order_open = False
-                        for price in open_buy_prices:
-                            if abs(price - current_grid) < epsilon:
-                                is_order_open = True
-                                break
-                        
-                        # If EMPTY (no contract, no pending, no open order), place buy order
-                        if not is_contract_active and not is_pending and not is_order_open:
-                            logger.info(f"🔍 [GRID] Found Empty Grid at {current_grid} (Curr: {current_price})")
-                            logger.info(f"🔍 [GRID] Checks - Contract:{is_contract_active} Pending:{is_pending} Open:{is_order_open}")
-                            
-                            # FINAL CHECK: Double-check DB right before ordering
-                            final_check = await Contract.get_active_contracts()
-                            has_duplicate = any(abs(float(c.buy_price) - current_grid) < 1e-4 for c in final_check)
-                            
-                            if has_duplicate:
-                                logger.warning(f"⚠️ [GRID] DUPLICATE DETECTED at {current_grid} in final check - SKIP")
-                                continue
-                            
-                            # 🔒 원자적 주문 실행 (이미 락 안에 있음)
-                            logger.info(f"📤 [GRID] Placing order at {current_grid}...")
-                            uuid = await self._place_order_atomic(ticker, current_grid, amount)
-                            if uuid:
-                                logger.info(f"✅ [GRID] Order placed successfully at {current_grid} (UUID: {uuid[:8]}...)")
-                            else:
-                                logger.warning(f"⚠️ [GRID] Order rejected at {current_grid} (duplicate detected)")
-                        else:
-                            if is_contract_active or is_pending or is_order_open:
-                                logger.debug(f"⏭️ [GRID] Skip {current_grid} - Contract:{is_contract_active} Pending:{is_pending} Open:{is_order_open}")
+                # Full scan covers everything the incremental refill tracks
+                self.grid.take_freed()
+                self._last_refill_price = current_price
+
+                # 3. Scan Grids: only levels <= Current Price (Don't buy above market)
+                for level in list(self.grid.free_levels_at_or_below(current_price)):
+                    current_grid = self.grid.price_of(level)
+                    # Re-check: a fill handled during this scan may have taken the level
+                    if not self.grid.is_free(level):
+                        continue
+
+                    logger.info("🔍 [GRID] Found Empty Grid at %s (Curr: %s)", current_grid, current_price, extra=THROTTLED)
                     
-                    current_grid += interval
+                    # 🔒 원자적 주문 실행 (레벨 락 안에서)
+                    logger.info("📤 [GRID] Placing order at %s...", current_grid, extra=THROTTLED)
+                    if self._skip_by_orderbook(ticker, current_grid):
+                        continue
+                    async with self._level_locks.hold(level):
+                        if not self.grid.is_free(level):
+                            continue  # Taken while we waited (fill re-entry on this level)
+                        uuid = await self._place_order_atomic(ticker, current_grid, amount)
+                    if uuid:
+                        logger.info("✅ [GRID] Order placed successfully at %s (UUID: %.8s...)", current_grid, uuid,
+                                    extra=THROTTLED)
+                    else:
+                        logger.warning(f"⚠️ [GRID] Order rejected at {current_grid} (duplicate detected)")
 
             except Exception as e:
                 logger.error(f"Error in _fill_empty_grids: {e}")
 
+    async def _refill_incremental(self, price: float):
+        """
+        Refill only the levels that can have changed since the last processed price:
+        levels crossed on the way up, plus levels freed by fills/cancels.
+        Cost scales with price movement, not grid size: no exchange reads, one REST call per
+        placed order (the atomic check uses the open orders the last full scan indexed).
+        The reconcile timer still runs the full _fill_empty_grids scan as a safety net.
+        """
+        if self.grid is None:
+            return
+        last_price = self._last_refill_price
+        if last_price is None:
+            # Nothing processed yet: one full scan establishes the baseline
+            await self._fill_empty_grids()
+            return
+
+        async with self._scan_lock:
+            try:
+                ticker = self.config.get('coin_ticker')
+                if not ticker: return
+                self._last_refill_price = price
+
+                # Freed levels above the price are dropped: crossing them later re-checks them
+                candidates = {level for level in self.grid.take_freed() if self.grid.price_of(level) <= price}
+                if price > last_price:
+                    candidates.update(self.grid.ladder.levels_between(last_price, price))
+                free = sorted(self.grid.free_levels(candidates), reverse=True)
+                if not free:
+                    return
+
+                amount = self.config['amount_per_grid']
+                for level in free:
+                    if not self.grid.is_free(level):
+                        continue
+                    current_grid = self.grid.price_of(level)
+                    logger.info("🔍 [GRID] Level %s reopened (Curr: %s). Placing order...", current_grid, price, extra=THROTTLED)
+                    if self._skip_by_orderbook(ticker, current_grid):
+                        continue
+                    async with self._level_locks.hold(level):
+                        if not self.grid.is_free(level):
+                            continue  # Taken while we waited (fill re-entry on this level)
+                        uuid = await self._place_order_atomic(ticker, current_grid, amount)
+                    if uuid:
+                        logger.info("✅ [GRID] Order placed successfully at %s (UUID: %.8s...)", current_grid, uuid,
+                                    extra=THROTTLED)
+                    else:
+                        logger.warning(f"⚠️ [GRID] Order rejected at {current_grid} (duplicate detected)")
+
+            except Exception as e:
+                logger.error(f"Error in _refill_incremental: {e}")
+
     async def _sync_with_exchange_balance(self):
         """
         Self-Healing Mechanism:
@@ -597,7 +1055,9 @@ class TradingManager:
             actual_base_bal = await self.handler.get_total_balance(base)
             
             # 2. Get Sum of base currency held in DB contracts
-            active_contracts = await Contract.get_active_contracts()
+            if self.consistency_check:
+                await self.contract_book.verify()
+            active_contracts = self.contract_book.active()
             db_base_sum = sum(Decimal(str(c.buy_amount)) for c in active_contracts)
             
             # 3. Calculate Gap
@@ -619,7 +1079,7 @@ class TradingManager:
                         
                         if order.get('side') == 'bid' and order.get('state') == 'done':
                             uuid = order.get('uuid')
-                            if not await Contract.exists_buy_uuid(uuid):
+                            if not await self.contract_book.exists_buy_uuid(uuid):
                                 # FOUND AN ORPHAN!
                                 price = float(order.get('price', 0))
                                 volume = float(order.get('volume', 0))
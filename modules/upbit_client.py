@@ -0,0 +1,224 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import uuid as uuid_lib
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+import aiohttp
+from yarl import URL
+
+from modules.rate_limiter import RequestScheduler, group_for, PRIORITY_NORMAL, PRIORITY_CRITICAL
+
+logger = logging.getLogger("TradingSystem")
+
+SERVER_URL = "https://api.upbit.com"
+MAX_THROTTLE_RETRIES = 3  # 429s are retried (the exchange did not execute the call)
+
+Params = Sequence[Tuple[str, Any]]
+
+class UpbitAPIError(Exception):
+    """Non-2xx response from the Upbit REST API."""
+
+    def __init__(self, status: int, name: str, message: str):
+        super().__init__(f"[{status}] {name}: {message}")
+        self.status = status
+        self.name = name
+        self.message = message
+
+class OrderRejected:
+    """
+    Falsy result of an order the exchange definitely refused (4xx): nothing is resting.
+    Order calls return None instead when there was no answer (timeout, reset, 5xx):
+    that order may still have landed.
+    """
+
+    def __init__(self, error: UpbitAPIError):
+        self.status = error.status
+        self.name = error.name
+        self.message = error.message
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return f"OrderRejected({self.status}, {self.name!r})"
+
+    @staticmethod
+    def from_error(error: Exception) -> Optional['OrderRejected']:
+        """OrderRejected for a 4xx UpbitAPIError, None for anything ambiguous."""
+        if isinstance(error, UpbitAPIError) and 400 <= error.status < 500:
+            return OrderRejected(error)
+        return None
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def format_number(value) -> str:
+    """Plain decimal string for price/volume params (never scientific notation)."""
+    text = format(Decimal(str(value)), 'f')
+    return text.rstrip('0').rstrip('.') if '.' in text else text
+
+def build_query_string(params: Optional[Params]) -> str:
+    """Upbit signs the literal query string; array keys must stay as `key[]`."""
+    if not params:
+        return ""
+    return urlencode([(k, v) for k, v in params if v is not None]).replace('%5B%5D', '[]')
+
+
+class JWTSigner:
+    """
+    HS256 JWT signer for Upbit private endpoints.
+    The header segment and the HMAC key schedule are computed once; each token only
+    hashes the payload (nonce is unique per request, so tokens themselves cannot be cached).
+    """
+
+    _HEADER = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+    def __init__(self, access_key: str, secret_key: str):
+        self.access_key = access_key
+        self._mac = hmac.new(secret_key.encode(), digestmod=hashlib.sha256)
+
+    def token(self, query_string: str = "") -> str:
+        payload = {'access_key': self.access_key, 'nonce': str(uuid_lib.uuid4())}
+        if query_string:
+            payload['query_hash'] = hashlib.sha512(query_string.encode()).hexdigest()
+            payload['query_hash_alg'] = 'SHA512'
+        signing_input = self._HEADER + b"." + _b64url(json.dumps(payload, separators=(",", ":")).encode())
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return (signing_input + b"." + _b64url(mac.digest())).decode()
+
+    def headers(self, query_string: str = "") -> Dict[str, str]:
+        return {'Authorization': f'Bearer {self.token(query_string)}'}
+
+
+class UpbitRestClient:
+    """
+    Native async Upbit REST client.
+    One pooled aiohttp ClientSession (keep-alive, reused TLS) shared by every call;
+    no executor threads are involved.
+    """
+
+    def __init__(self, access_key: str, secret_key: str, base_url: str = SERVER_URL,
+                 timeout: float = 10.0, max_connections: int = 100,
+                 scheduler: Optional[RequestScheduler] = None):
+        self.signer = JWTSigner(access_key, secret_key)
+        self.scheduler = scheduler or RequestScheduler()  # Every call goes through the rate-limit scheduler
+        self.base_url = base_url
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._max_connections, keepalive_timeout=60, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self._timeout,
+                headers={'Accept': 'application/json'},
+            )
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def request(self, method: str, path: str, params: Optional[Params] = None,
+                      body: Optional[Dict[str, Any]] = None, auth: bool = False,
+                      priority: int = PRIORITY_NORMAL):
+        """
+        Send one request and return the decoded JSON.
+        GET/DELETE parameters go in the query string; POST parameters go in a JSON body.
+        Waits for a rate-limit token first; 429s back off and retry.
+        Raises UpbitAPIError on non-2xx responses and on bodies that are not JSON.
+        """
+        session = await self._get_session()
+        query_string = build_query_string(params)
+        url = f"{self.base_url}{path}" + (f"?{query_string}" if query_string else "")
+        group = group_for(method, path)
+        # For POST the hash covers the urlencoded body
+        signed = build_query_string(list(body.items())) if body else query_string
+
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            await self.scheduler.acquire(group, priority)
+            headers = self.signer.headers(signed) if auth else {}  # Fresh nonce per attempt
+
+            # encoded=True: send exactly the string that was signed (keep `[]` unescaped)
+            async with session.request(method, URL(url, encoded=True), json=body, headers=headers) as resp:
+                self.scheduler.observe(resp.headers.get('Remaining-Req'))
+                if resp.status == 429 and attempt < MAX_THROTTLE_RETRIES:
+                    self.scheduler.throttled(group, backoff=0.5 * (attempt + 1))
+                    continue
+                try:
+                    data = await resp.json(content_type=None)
+                except ValueError:
+                    # Gateway / maintenance pages (429, 5xx) come back as HTML or plain text
+                    text = (await resp.text()).strip()
+                    name = 'http_error' if resp.status >= 400 else 'invalid_response'
+                    raise UpbitAPIError(resp.status, name, text[:200] or str(resp.reason))
+                if resp.status >= 400:
+                    error = (data or {}).get('error', {}) if isinstance(data, dict) else {}
+                    detail = str(data) if data is not None else str(resp.reason)  # Empty body
+                    raise UpbitAPIError(resp.status, error.get('name', 'http_error'), error.get('message', detail))
+                return data
+
+    # --- Quotation (public) ---
+    async def get_ticker(self, markets: List[str]) -> List[Dict]:
+        return await self.request('GET', '/v1/ticker', [('markets', ','.join(markets))])
+
+    async def get_minute_candles(self, market: str, to: Optional[str] = None, count: int = 200, unit: int = 1,
+                                 priority: int = PRIORITY_NORMAL) -> List[Dict]:
+        params = [('market', market), ('to', to), ('count', count)]
+        return await self.request('GET', f'/v1/candles/minutes/{unit}', params, priority=priority)
+
+    async def get_trades(self, market: str, count: int = 500, cursor: Optional[str] = None,
+                         days_ago: Optional[int] = None, priority: int = PRIORITY_NORMAL) -> List[Dict]:
+        params = [('market', market), ('count', count), ('cursor', cursor), ('daysAgo', days_ago)]
+        return await self.request('GET', '/v1/trades/ticks', params, priority=priority)
+
+    # --- Exchange (private) ---
+    async def get_accounts(self, priority: int = PRIORITY_NORMAL) -> List[Dict]:
+        return await self.request('GET', '/v1/accounts', auth=True, priority=priority)
+
+    async def get_order(self, uuid: str, priority: int = PRIORITY_NORMAL) -> Dict:
+        return await self.request('GET', '/v1/order', [('uuid', uuid)], auth=True, priority=priority)
+
+    async def get_orders_by_uuids(self, uuids: List[str], market: Optional[str] = None,
+                                  priority: int = PRIORITY_NORMAL) -> List[Dict]:
+        params = [('market', market)] + [('uuids[]', u) for u in uuids]
+        return await self.request('GET', '/v1/orders/uuids', params, auth=True, priority=priority)
+
+    async def get_orders_by_identifiers(self, identifiers: List[str], market: Optional[str] = None,
+                                        priority: int = PRIORITY_NORMAL) -> List[Dict]:
+        params = [('market', market)] + [('identifiers[]', i) for i in identifiers]
+        return await self.request('GET', '/v1/orders/uuids', params, auth=True, priority=priority)
+
+    async def get_open_orders(self, market: str, page: int = 1, limit: int = 100,
+                              priority: int = PRIORITY_NORMAL) -> List[Dict]:
+        params = [('market', market), ('states[]', 'wait'), ('states[]', 'watch'), ('page', page), ('limit', limit)]
+        return await self.request('GET', '/v1/orders/open', params, auth=True, priority=priority)
+
+    async def get_closed_orders(self, market: str, limit: int = 100, priority: int = PRIORITY_NORMAL) -> List[Dict]:
+        params = [('market', market), ('states[]', 'done'), ('limit', limit), ('order_by', 'desc')]
+        return await self.request('GET', '/v1/orders/closed', params, auth=True, priority=priority)
+
+    async def place_limit_order(self, market: str, side: str, price, volume,
+                                priority: int = PRIORITY_NORMAL, identifier: Optional[str] = None) -> Dict:
+        body = {
+            'market': market,
+            'side': side,  # 'bid' | 'ask'
+            'ord_type': 'limit',
+            'price': format_number(price),
+            'volume': format_number(volume),
+        }
+        if identifier:
+            body['identifier'] = identifier  # Client order id (unique per account)
+        return await self.request('POST', '/v1/orders', body=body, auth=True, priority=priority)
+
+    async def cancel_order(self, uuid: str) -> Dict:
+        return await self.request('DELETE', '/v1/order', [('uuid', uuid)], auth=True, priority=PRIORITY_CRITICAL)
@@ -1,44 +1,96 @@
-import pyupbit
 import asyncio
 import os
 import json
 import logging
+import time
+import uuid as uuid_lib
 import websockets
 from decimal import Decimal
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Union
+
+from modules.upbit_client import UpbitRestClient, OrderRejected
+from modules.market_data import MarketDataHub, Subscription, WS_PUBLIC_URL, MAX_BACKOFF
+from modules.orderbook import OrderBook, BOOK_MAX_AGE
+from modules.rate_limiter import PRIORITY_CRITICAL, PRIORITY_NORMAL, PRIORITY_BACKGROUND
+from modules.latency import recorder as latency
+
+WS_PRIVATE_URL = "wss://api.upbit.com/websocket/v1/private"
+ORDER_UUIDS_CHUNK = 100  # Max uuids[] per /v1/orders/uuids request
+OPEN_ORDERS_PAGE = 100   # Max orders per /v1/orders/open page
+PRICE_MAX_AGE = 5.0      # Seconds a WebSocket trade price is trusted before falling back to REST
+PRIVATE_RETRY_MIN = 1.0      # First private-stream reconnect delay (seconds), also after a clean close
+PRIVATE_STABLE_AFTER = 30.0  # A session up this long resets the reconnect backoff
 
 logger = logging.getLogger("TradingSystem")
 
 class UpbitHandler:
-    def __init__(self, access_key: str, secret_key: str):
+    def __init__(self, access_key: str, secret_key: str, ws_url: str = WS_PUBLIC_URL,
+                 ws_private_url: str = WS_PRIVATE_URL):
         self.access = access_key
         self.secret = secret_key
-        self.upbit = pyupbit.Upbit(access_key, secret_key)
-        self.websocket = None
-        self.current_price = None
-        self._ws_task = None
-        self._running = False
-        self.last_update_time = None
+        self.client = UpbitRestClient(access_key, secret_key)  # Shared aiohttp session, no executor threads
+        # One public socket for every code/type (ticker, trade, orderbook), fanned out to subscribers
+        self.market = MarketDataHub(ws_url)
+        self.ws_private_url = ws_private_url  # URLs are overridable for the local simulator (modules.simulator)
+        self._stream_subs: List[Subscription] = []  # Subscriptions opened by connect_websocket/connect_orderbook
+        self.orderbooks: Dict[str, OrderBook] = {}  # code -> local L2 book (orderbook stream)
+        # Private stream (myOrder / myAsset)
+        self._private_running = False
+        self.private_ws_connected = False
+        self.private_reconnects = 0
+        self.assets: Dict[str, Dict[str, Decimal]] = {}  # currency -> {'balance', 'locked'} from myAsset
+
+    async def close(self):
+        """Stop streams and close the pooled HTTP session."""
+        self.stop_websocket()
+        self.market.stop()
+        self.stop_private_websocket()
+        await self.client.close()
+
+    @property
+    def current_price(self) -> Optional[float]:
+        """Last trade price seen on the market-data stream (any code)."""
+        return self.market.last_price
+
+    @property
+    def last_update_time(self) -> Optional[float]:
+        return self.market.last_update_time
+
+    @property
+    def prices(self) -> Dict[str, float]:
+        """code -> last streamed trade price"""
+        return self.market.prices
+
+    def live_price(self, ticker: Optional[str] = None, max_age: float = PRICE_MAX_AGE) -> Optional[float]:
+        """Latest WebSocket trade price (of `ticker`, if given), or None if stale or not streamed."""
+        if ticker:
+            return self.market.live_price(ticker, max_age)
+        if self.current_price is None or self.last_update_time is None:
+            return None
+        if time.monotonic() - self.last_update_time > max_age:
+            return None
+        return self.current_price
 
     async def get_current_price(self, ticker: str) -> float:
         """
         Get current price via REST API.
         """
-        loop = asyncio.get_running_loop()
-        price = await loop.run_in_executor(None, pyupbit.get_current_price, ticker)
-        return float(price) if price else None
+        try:
+            with latency.call('api.get_current_price'):
+                tickers = await self.client.get_ticker([ticker])
+            price = tickers[0].get('trade_price') if tickers else None
+            return float(price) if price else None
+        except Exception as e:
+            logger.error(f"Error fetching current price for {ticker}: {e}")
+            return None
 
     async def get_completed_orders(self, ticker: str, limit: int = 5) -> list:
         """
         Get recently completed (done) orders.
         """
         try:
-            loop = asyncio.get_running_loop()
-            # pyupbit doesn't have a direct wrapper for filtering 'done' with limit easily in one func?
-            # It has `get_order(ticker, state='done', ...)`
-            # Let's use the underlying request or pyupbit's get_order
-            # pyupbit.get_order(ticker_or_uuid, state, ...) returns list if ticker provided
-            orders = await loop.run_in_executor(None, self.upbit.get_order, ticker, 'done', 1, limit)
+            with latency.call('api.get_completed_orders'):
+                orders = await self.client.get_closed_orders(ticker, limit=limit, priority=PRIORITY_BACKGROUND)
             return orders if orders else []
         except Exception as e:
             logger.error(f"Error fetching completed orders: {e}")
@@ -49,9 +101,17 @@ class UpbitHandler:
         Get all open (wait) orders.
         """
         try:
-            loop = asyncio.get_running_loop()
-            orders = await loop.run_in_executor(None, self.upbit.get_order, ticker, 'wait')
-            return orders if orders else []
+            orders = []
+            page = 1
+            while True:
+                with latency.call('api.get_open_orders'):  # Per page
+                    batch = await self.client.get_open_orders(ticker, page=page, limit=OPEN_ORDERS_PAGE,
+                                                              priority=PRIORITY_BACKGROUND)
+                orders.extend(batch or [])
+                if not batch or len(batch) < OPEN_ORDERS_PAGE:
+                    break
+                page += 1
+            return orders
         except Exception as e:
             logger.error(f"Error fetching open orders: {e}")
             return []
@@ -63,22 +123,32 @@ class UpbitHandler:
         If ticker is "KRW", it returns KRW balance.
         """
         currency = ticker.split("-")[1] if "-" in ticker else ticker
-        
-        # Pyupbit get_balance returns float or 0
-        loop = asyncio.get_running_loop()
-        # API call is blocking, run in executor
-        balance = await loop.run_in_executor(None, self.upbit.get_balance, currency)
-        return Decimal(str(balance)) if balance else Decimal("0")
+
+        try:
+            with latency.call('api.get_balance'):
+                balances = await self.client.get_accounts()
+            for b in balances:
+                if b.get('currency') == currency:
+                    return Decimal(str(b.get('balance', 0)))
+            return Decimal("0")
+        except Exception as e:
+            logger.error(f"Error fetching balance for {currency}: {e}")
+            return Decimal("0")
 
     async def get_total_balance(self, ticker: str) -> Decimal:
         """
         Get TOTAL balance (available + locked) of specific ticker.
         """
         currency = ticker.split("-")[1] if "-" in ticker else ticker
+
+        # Live private stream already knows the balance; skip the REST call
+        if self.private_ws_connected and currency in self.assets:
+            asset = self.assets[currency]
+            return asset['balance'] + asset['locked']
         
         try:
-            loop = asyncio.get_running_loop()
-            balances = await loop.run_in_executor(None, self.upbit.get_balances)
+            with latency.call('api.get_total_balance'):
+                balances = await self.client.get_accounts(priority=PRIORITY_BACKGROUND)
             
             for b in balances:
                 if b.get('currency') == currency:
@@ -89,56 +159,59 @@ class UpbitHandler:
             logger.error(f"Error fetching total balance for {currency}: {e}")
             return Decimal("0")
 
-    async def buy_limit_order(self, ticker: str, price: float, amount: float) -> Optional[str]:
+    async def buy_limit_order(self, ticker: str, price: float, amount: float,
+                              identifier: Optional[str] = None) -> Union[str, OrderRejected, None]:
         """
         Place a buy limit order.
-        Returns UUID of the order if successful, None otherwise.
+        identifier: client order id (see OrderJournal); lets recovery find the order without its uuid.
+        Returns UUID of the order if successful, OrderRejected (falsy) if the exchange refused it,
+        None if the outcome is unknown (timeout, connection reset, 5xx: it may be resting).
         """
         try:
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(None, 
-                self.upbit.buy_limit_order, 
-                ticker, price, amount
-            )
+            with latency.call('api.buy_limit_order'):
+                result = await self.client.place_limit_order(ticker, 'bid', price, amount, priority=PRIORITY_NORMAL,
+                                                             identifier=identifier)
             
             if result and 'uuid' in result:
                 logger.info(f"Buy Order Placed: {ticker} @ {price}, Vol: {amount}, UUID: {result['uuid']}")
                 return result['uuid']
             
+            latency.error('api.buy_limit_order')
             logger.error(f"Buy Order Failed: {result}")
             return None
         except Exception as e:
             logger.error(f"Error placing buy order: {e}")
-            return None
+            return OrderRejected.from_error(e)
 
-    async def sell_limit_order(self, ticker: str, price: float, amount: float) -> Optional[str]:
+    async def sell_limit_order(self, ticker: str, price: float, amount: float,
+                               identifier: Optional[str] = None) -> Union[str, OrderRejected, None]:
         """
-        Place a sell limit order.
+        Place a sell limit order. Same results as buy_limit_order.
         """
         try:
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(None, 
-                self.upbit.sell_limit_order, 
-                ticker, price, amount
-            )
+            # Sell after a fill jumps ahead of everything else queued on the order group
+            with latency.call('api.sell_limit_order'):
+                result = await self.client.place_limit_order(ticker, 'ask', price, amount, priority=PRIORITY_CRITICAL,
+                                                             identifier=identifier)
             
             if result and 'uuid' in result:
                 logger.info(f"Sell Order Placed: {ticker} @ {price}, Vol: {amount}, UUID: {result['uuid']}")
                 return result['uuid']
             
+            latency.error('api.sell_limit_order')
             logger.error(f"Sell Order Failed: {result}")
             return None
         except Exception as e:
             logger.error(f"Error placing sell order: {e}")
-            return None
+            return OrderRejected.from_error(e)
 
     async def cancel_order(self, uuid: str) -> bool:
         """
         Cancel an order by UUID.
         """
         try:
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(None, self.upbit.cancel_order, uuid)
+            with latency.call('api.cancel_order'):
+                result = await self.client.cancel_order(uuid)
             if result and 'uuid' in result:
                 logger.info(f"Order Cancelled: {uuid}")
                 return True
@@ -153,59 +226,196 @@ class UpbitHandler:
         Returns dict with keys: 'uuid', 'state', 'volume', 'remaining_volume', 'price', etc.
         """
         try:
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(None, self.upbit.get_order, uuid)
-            return result
+            with latency.call('api.get_order_status'):
+                return await self.client.get_order(uuid)
         except Exception as e:
             logger.error(f"Error getting order status {uuid}: {e}")
             return None
 
-    async def connect_websocket(self, ticker: str, callback=None):
+    def rate_limit_stats(self) -> Dict[str, Dict]:
+        """Queue depth / wait-time metrics of the request scheduler, per rate-limit group."""
+        return self.client.scheduler.stats()
+
+    async def get_orders_by_uuids(self, uuids: List[str], ticker: Optional[str] = None,
+                                  strict: bool = False) -> Dict[str, Dict]:
         """
-        Connect to Upbit WebSocket for real-time price updates.
-        ticker: e.g. "KRW-USDT"
-        callback: async function(price) to call when price updates
+        Bulk order status via GET /v1/orders/uuids.
+        Requests are chunked to the exchange limit (100 uuids each).
+        Returns {uuid: order dict}; uuids missing from the response are simply absent.
+        A failed chunk is logged and skipped, so its uuids are absent too. strict=True raises
+        instead, for callers that treat "absent" as "unknown to the exchange".
         """
-        self._running = True
-        uri = "wss://api.upbit.com/websocket/v1"
-        
+        unique = list(dict.fromkeys(u for u in uuids if u))
+        result: Dict[str, Dict] = {}
+        chunks = [unique[i:i + ORDER_UUIDS_CHUNK] for i in range(0, len(unique), ORDER_UUIDS_CHUNK)]
+        # Chunks share one pooled session, so they can be in flight at the same time
+        responses = await asyncio.gather(
+            *(self._timed_orders_by_uuids(chunk, ticker) for chunk in chunks),
+            return_exceptions=True
+        )
+        for chunk, orders in zip(chunks, responses):
+            if isinstance(orders, Exception):
+                if strict:
+                    raise orders
+                logger.error(f"Error fetching bulk order status ({len(chunk)} uuids): {orders}")
+                continue
+            for order in orders or []:
+                if isinstance(order, dict) and order.get('uuid'):
+                    result[order['uuid']] = order
+        return result
+
+    async def _timed_orders_by_uuids(self, chunk: List[str], ticker: Optional[str]) -> List[Dict]:
+        with latency.call('api.get_orders_by_uuids'):  # Per chunk
+            return await self.client.get_orders_by_uuids(chunk, ticker)
+
+    async def get_orders_by_identifiers(self, identifiers: List[str], ticker: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        Bulk lookup by client order id (same endpoint, identifiers[]).
+        Returns {identifier: order dict}; orders that never reached the exchange are absent.
+        Raises on request errors: "absent" must not be confused with "lookup failed".
+        """
+        unique = list(dict.fromkeys(i for i in identifiers if i))
+        result: Dict[str, Dict] = {}
+        for i in range(0, len(unique), ORDER_UUIDS_CHUNK):
+            with latency.call('api.get_orders_by_identifiers'):
+                orders = await self.client.get_orders_by_identifiers(unique[i:i + ORDER_UUIDS_CHUNK], ticker)
+            for order in orders or []:
+                if isinstance(order, dict) and order.get('identifier'):
+                    result[order['identifier']] = order
+        return result
+
+    async def connect_websocket(self, ticker: Union[str, List[str]], callback=None):
+        """
+        Real-time price updates for ticker(s), served by the shared market-data hub.
+        ticker: e.g. "KRW-USDT", or a list of codes
+        callback: async function(price, code) to call when price updates
+        Runs until stop_websocket() is called.
+        """
+        codes = [ticker] if isinstance(ticker, str) else list(ticker)
+        sub = self.market.subscribe(codes, types=('ticker',))
+        self._stream_subs.append(sub)
+        try:
+            while True:
+                data = await sub.get()
+                if data is None:  # Subscription closed
+                    break
+                if callback and 'trade_price' in data:
+                    try:
+                        await callback(float(data['trade_price']), data.get('code', codes[0]))
+                    except Exception as e:
+                        logger.error(f"WebSocket callback error: {e}")
+        finally:
+            if sub in self._stream_subs:
+                self._stream_subs.remove(sub)
+            self.market.unsubscribe(sub)
+
+    async def connect_orderbook(self, codes: List[str]):
+        """
+        Maintain a local L2 book per code from the hub's `orderbook` messages.
+        Runs until stop_websocket() is called.
+        """
+        sub = self.market.subscribe(codes, types=('orderbook',), maxsize=len(codes) * 4)
+        self._stream_subs.append(sub)
+        try:
+            while True:
+                data = await sub.get()
+                if data is None:
+                    break
+                code = data.get('code')
+                book = self.orderbooks.get(code)
+                if book is None:
+                    book = self.orderbooks[code] = OrderBook(code)
+                book.apply(data)
+        finally:
+            if sub in self._stream_subs:
+                self._stream_subs.remove(sub)
+            self.market.unsubscribe(sub)
+
+    def orderbook(self, code: str, max_age: float = BOOK_MAX_AGE) -> Optional[OrderBook]:
+        """Local book for `code`, or None if it is not streamed or stale."""
+        book = self.orderbooks.get(code)
+        return book if book is not None and book.is_fresh(max_age) else None
+
+    def stop_websocket(self):
+        for sub in list(self._stream_subs):
+            self.market.unsubscribe(sub)
+        self._stream_subs.clear()
+
+    def _ws_connect(self, uri: str, headers: Optional[dict] = None):
+        if not headers:
+            return websockets.connect(uri)
+        # websockets>=14 renamed extra_headers -> additional_headers
+        if int(websockets.__version__.split('.')[0]) >= 14:
+            return websockets.connect(uri, additional_headers=headers)
+        return websockets.connect(uri, extra_headers=headers)
+
+    async def connect_private_websocket(self, codes: List[str], on_order=None, on_asset=None):
+        """
+        Connect to Upbit's authenticated WebSocket (myOrder + myAsset).
+        on_order: async function(order_event dict) called for every myOrder message
+        on_asset: async function(assets dict) called after balances are updated
+        Reconnects until stop_private_websocket() is called, with backoff: a server that
+        keeps closing the socket (cleanly or not) is not hammered with new handshakes.
+        """
+        self._private_running = True
         subscribe_fmt = [
-            {"ticket": "UNIQUE_TICKET_ID"},
-            {"type": "ticker", "codes": [ticker], "isOnlyRealtime": True}
+            {"ticket": f"private-{uuid_lib.uuid4()}"},
+            {"type": "myOrder", "codes": codes},
+            {"type": "myAsset"},
+            {"format": "DEFAULT"}
         ]
-        
-        while self._running:
+
+        backoff = PRIVATE_RETRY_MIN
+        while self._private_running:
+            connected_at = None
             try:
-                async with websockets.connect(uri) as websocket:
-                    self.websocket = websocket
+                # JWT without query hash; a fresh nonce on every (re)connect
+                async with self._ws_connect(self.ws_private_url, self.client.signer.headers()) as websocket:
                     await websocket.send(json.dumps(subscribe_fmt))
-                    logger.info(f"Connected to WebSocket for {ticker}")
-                    
-                    while self._running:
+                    self.assets.clear()  # myAsset only sends changes; drop anything missed while disconnected
+                    self.private_ws_connected = True
+                    connected_at = time.monotonic()
+                    logger.info(f"Connected to private WebSocket (myOrder/myAsset) for {codes}")
+
+                    while self._private_running:
                         try:
                             msg = await websocket.recv()
                             data = json.loads(msg)
-                            
-                            if 'trade_price' in data:
-                                price = float(data['trade_price'])
-                                self.current_price = price
-                                
-                                # Call callback if provided
-                                if callback:
-                                    await callback(price)
-                                    
+                            msg_type = data.get('type')
+
+                            if msg_type == 'myOrder':
+                                if on_order:
+                                    await on_order(data)
+                            elif msg_type == 'myAsset':
+                                for asset in data.get('assets', []):
+                                    self.assets[asset['currency']] = {
+                                        'balance': Decimal(str(asset.get('balance', 0))),
+                                        'locked': Decimal(str(asset.get('locked', 0))),
+                                    }
+                                if on_asset:
+                                    await on_asset(self.assets)
+
                         except websockets.exceptions.ConnectionClosed:
-                            logger.warning("WebSocket connection closed. Reconnecting...")
+                            logger.warning("Private WebSocket connection closed.")
                             break
                         except Exception as e:
-                            logger.error(f"WebSocket Error: {e}")
+                            logger.error(f"Private WebSocket Error: {e}")
                             break
             except Exception as e:
-                logger.error(f"WebSocket Connection Failed: {e}. Retrying in 5s...")
-                await asyncio.sleep(5)
+                logger.error(f"Private WebSocket Connection Failed: {e}")
+            finally:
+                self.private_ws_connected = False
+            if not self._private_running:
+                break
+            self.private_reconnects += 1
+            # Only a session that stayed up resets the backoff; one that drops right away keeps growing it
+            if connected_at is not None and time.monotonic() - connected_at >= PRIVATE_STABLE_AFTER:
+                backoff = PRIVATE_RETRY_MIN
+            logger.warning(f"Private WebSocket reconnecting in {backoff:.0f}s...")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
 
-    def stop_websocket(self):
-        self._running = False
-        if self._ws_task:
-            self._ws_task.cancel()
+    def stop_private_websocket(self):
+        self._private_running = False
+        self.private_ws_connected = False
 
@@ -1,12 +1,91 @@
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import time
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
-def setup_logger(name: str = "TradingSystem", log_file: str = "logs/system.log", level=logging.INFO):
+# Pass as `extra=` on chatty per-level logs (grid scans); see ThrottleFilter
+THROTTLED = {'throttle': True}
+THROTTLE_WINDOW = 10.0  # Seconds
+THROTTLE_BURST = 5      # Records per call site per window before suppressing
+
+_listeners: List[QueueListener] = []
+
+
+class JsonFormatter(logging.Formatter):
+    """One compact JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'src': f"{record.module}:{record.lineno}",
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+
+
+class ThrottleFilter(logging.Filter):
+    """
+    Rate-limits records marked with extra=THROTTLED: at most `burst` per call site per
+    `window`; the next record that gets through carries the number that were dropped.
+    Warnings and above are never throttled.
+    """
+
+    def __init__(self, window: float = THROTTLE_WINDOW, burst: int = THROTTLE_BURST):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self._sites: Dict[Tuple[str, int], list] = {}  # (path, line) -> [window start, passed, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, 'throttle', False) or record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        site = self._sites.get((record.pathname, record.lineno))
+        if site is None:
+            self._sites[(record.pathname, record.lineno)] = [now, 1, 0]
+            return True
+        if now - site[0] >= self.window:
+            if site[2]:
+                record.msg = f"{record.msg} [+{site[2]} similar suppressed]"
+            site[:] = [now, 1, 0]
+            return True
+        if site[1] < self.burst:
+            site[1] += 1
+            return True
+        site[2] += 1
+        return False
+
+
+class _LazyQueueHandler(QueueHandler):
+    """Enqueue the record untouched; the listener thread does getMessage() and formatting."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logger(name: str = "TradingSystem", log_file: str = "logs/system.log", level=logging.INFO,
+                 async_mode: Optional[bool] = None, json_format: Optional[bool] = None):
     """
     Sets up a logger that writes to console and a rotating file.
+
+    async_mode (env LOG_ASYNC, default on): the logger only enqueues records; a background
+    thread formats them and does the file/console I/O, so the event loop never waits on disk.
+    json_format (env LOG_FORMAT=json): JSON lines instead of the plain text format.
     """
+    if async_mode is None:
+        async_mode = os.getenv("LOG_ASYNC", "1") == "1"
+    if json_format is None:
+        json_format = os.getenv("LOG_FORMAT", "text").lower() == "json"
+
     # Create logs directory if it doesn't exist
     log_dir = os.path.dirname(log_file)
     if log_dir and not os.path.exists(log_dir):
@@ -15,15 +94,18 @@ def setup_logger(name: str = "TradingSystem", log_file: str = "logs/system.log",
     logger = logging.getLogger(name)
     logger.setLevel(level)
 
-    # Avoid adding handlers multiple times
-    if logger.hasHandlers():
+    # Avoid adding handlers multiple times (own handlers only: pytest puts one on the root logger)
+    if logger.handlers:
         return logger
 
     # Formatter
-    formatter = logging.Formatter(
-        '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    if json_format:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
 
     # File Handler (Rotating)
     file_handler = RotatingFileHandler(log_file, maxBytes=10*1024*1024, backupCount=5, encoding='utf-8')
@@ -35,11 +117,29 @@ def setup_logger(name: str = "TradingSystem", log_file: str = "logs/system.log",
     console_handler.setFormatter(formatter)
     console_handler.setLevel(logging.INFO) # Console captures INFO and above
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    if async_mode:
+        # SimpleQueue: put() never blocks the caller
+        log_queue = queue.SimpleQueue()
+        queue_handler = _LazyQueueHandler(log_queue)
+        listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        listener.start()
+        _listeners.append(listener)
+        logger.addHandler(queue_handler)
+    else:
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+    # Logger-level: runs before any handler, so dropped records are never enqueued or formatted
+    logger.addFilter(ThrottleFilter())
 
     return logger
 
+def stop_logging():
+    """Flush queued records and stop the background logging thread(s)."""
+    while _listeners:
+        _listeners.pop().stop()
+
+atexit.register(stop_logging)
+
 def test_logger():
     """
     Test function to verify logger setup.
@@ -49,6 +149,7 @@ def test_logger():
     logger.debug("Logger test: DEBUG message")
     logger.warning("Logger test: WARNING message")
     logger.error("Logger test: ERROR message")
+    stop_logging()
     print("Logger test complete. Check console and logs/system.log")
 
 if __name__ == "__main__":
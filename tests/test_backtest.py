@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.backtest import run_backtest, simulate_grid, candles_to_path, grid_arrays
+
+CONFIG = {'coin_ticker': 'KRW-USDT', 'min_price': 1400.0, 'max_price': 1500.0,
+          'grid_interval': 10.0, 'amount_per_grid': 2.0, 'profit_interval': 5.0}
+
+def reference(prices, levels, targets):
+    """Tick-by-tick version of the same rules (what TradingManager does live)."""
+    state = ['bid' if lv <= prices[0] else 'idle' for lv in levels]
+    buys = sells = 0
+    for t, p in enumerate(prices):
+        for i, (lv, tg) in enumerate(zip(levels, targets)):
+            if state[i] == 'idle':
+                if p >= lv:
+                    state[i] = 'armed'   # Buy placed now, can fill from the next tick
+            elif state[i] == 'armed':
+                state[i] = 'bid'
+                if p <= lv:
+                    state[i] = 'hold'; buys += 1
+            elif state[i] == 'bid' and p <= lv:
+                state[i] = 'hold'; buys += 1
+            elif state[i] == 'hold' and p >= tg:
+                state[i] = 'bid'; sells += 1
+    return buys, sells
+
+def test_backtest():
+    print("--- Starting Backtest Test ---")
+    rng = np.random.default_rng(7)
+    prices = np.round(1450 + np.cumsum(rng.normal(0, 2, 5000)))
+    levels, targets = grid_arrays(CONFIG)
+
+    result = run_backtest(CONFIG, prices, fee_rate=0.0)
+    assert (result.buys, result.sells) == reference(prices, levels, targets)
+    # Each round trip earns exactly profit_interval * amount without fees
+    assert abs(result.realized_pnl - result.sells * 5.0 * 2.0) < 1e-6
+    assert result.final_inventory == (result.buys - result.sells) * 2.0
+    assert result.inventory.max() == result.max_inventory
+    assert np.all(np.diff(result.fills['t']) >= 0)
+
+    # Fees reduce PnL; capital is never more than the whole ladder
+    with_fees = run_backtest(CONFIG, prices)
+    assert with_fees.realized_pnl < result.realized_pnl and with_fees.fees > 0
+    assert with_fees.max_capital <= levels.sum() * 2.0
+
+    # Candles: a down bar then an up bar
+    path = candles_to_path(np.array([10., 8.]), np.array([11., 12.]), np.array([7., 6.]), np.array([8., 11.]))
+    assert path.tolist() == [10., 11., 7., 8., 8., 6., 12., 11.]
+
+    # A year of minute candles in a few seconds
+    n = 525_600
+    close = 1450 + np.cumsum(rng.normal(0, 0.5, n))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.5, n))
+    path = candles_to_path(open_, np.maximum(open_, close) + spread, np.minimum(open_, close) - spread, close)
+    t0 = time.perf_counter()
+    year = simulate_grid(path, levels, targets, 2.0)
+    elapsed = time.perf_counter() - t0
+    print(f"1y of 1m candles ({len(path):,} ticks, {len(levels)} levels): {elapsed:.2f}s, {year.sells} round trips")
+    assert elapsed < 10
+
+    print("--- Backtest Test Passed ---")
+
+if __name__ == "__main__":
+    test_backtest()
@@ -0,0 +1,57 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.database import temp_database, execute_write
+from models.contract import Contract
+from models.contract_book import ContractBook
+
+async def test_contract_book():
+    print("--- Starting ContractBook Test ---")
+    async with temp_database():
+        book = ContractBook()
+        await book.load()
+        base_count = len(book)
+
+        # 1. Add -> visible in memory and in DB
+        c = await book.add(Contract(
+            coin_ticker="KRW-USDT",
+            buy_price=1400.0,
+            buy_amount=10.0,
+            target_price=1410.0,
+            status="ACTIVE",
+            order_uuid="book-buy-uuid",
+            buy_order_uuid="book-buy-uuid"
+        ))
+        assert len(book) == base_count + 1
+        assert await book.exists_buy_uuid("book-buy-uuid")
+
+        # 2. Order UUID swap is reflected in the index and the DB
+        await book.set_order_uuid(c, "book-sell-uuid")
+        assert book.get_by_order_uuid("book-sell-uuid") is c
+        assert book.get_by_order_uuid("book-buy-uuid") is None
+        assert (await Contract.get_by_uuid("book-sell-uuid")).id == c.id
+
+        report = await book.verify()
+        assert c.id not in report['missing_in_cache'] + report['missing_in_db']
+        assert c.id not in report['mismatched']
+
+        # 3. A change made behind the book's back is reported by the consistency check
+        await execute_write("UPDATE contracts SET target_price = ? WHERE id = ?", (9999.0, c.id))
+        report = await book.verify()
+        assert report['mismatched'].get(c.id) == ['target_price']
+
+        # 4. Close removes it from memory, but the buy UUID stays known (idempotency)
+        await book.close(c, 1410.0, 100.0, 0.007)
+        assert book.get(c.id) is None
+        assert await book.exists_buy_uuid("book-buy-uuid")
+        assert all(x.id != c.id for x in await Contract.get_active_contracts())
+
+        print("--- ContractBook Test Passed ---")
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(test_contract_book())
@@ -5,65 +5,113 @@ import sys
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from database.database import init_db
+import database.database as db
+from database.database import temp_database, execute_write, execute_read, init_db, close_db
 from models.contract import Contract
 from models.trade import Trade
 
 async def test_db_operations():
     print("--- Starting DB Test ---")
     
-    # 1. Init DB
-    await init_db()
+    # 1. Init DB (a temp file, never the live trading.db)
+    async with temp_database():
+        # 2. Create Contract
+        print("Creating contract...")
+        c = Contract(
+            coin_ticker="KRW-USDT",
+            buy_price=1400.0,
+            buy_amount=10.0,
+            target_price=1410.0,
+            status="ACTIVE",
+            order_uuid="uuid-1234",
+            buy_order_uuid="buy-uuid-1234"
+        )
+        created_c = await Contract.create(c)
+        print(f"Contract created: ID={created_c.id}")
     
-    # 2. Create Contract
-    print("Creating contract...")
-    c = Contract(
-        coin_ticker="KRW-USDT",
-        buy_price=1400.0,
-        buy_amount=10.0,
-        target_price=1410.0,
-        status="ACTIVE",
-        order_uuid="uuid-1234"
-    )
-    created_c = await Contract.create(c)
-    print(f"Contract created: ID={created_c.id}")
+        # 3. Get Active Contracts
+        active_contracts = await Contract.get_active_contracts()
+        print(f"Active contracts count: {len(active_contracts)}")
+        assert len(active_contracts) > 0
+        assert active_contracts[-1].order_uuid == "uuid-1234"
     
-    # 3. Get Active Contracts
-    active_contracts = await Contract.get_active_contracts()
-    print(f"Active contracts count: {len(active_contracts)}")
-    assert len(active_contracts) > 0
-    assert active_contracts[-1].order_uuid == "uuid-1234"
+        # 4. Create Trade (Buy)
+        print("Creating trade...")
+        t = Trade(
+            contract_id=created_c.id,
+            type="BUY",
+            price=1400.0,
+            amount=10.0,
+            fee=0.05,
+            profit=0.0
+        )
+        created_t = await Trade.create(t)
+        print(f"Trade created: ID={created_t.id}")
     
-    # 4. Create Trade (Buy)
-    print("Creating trade...")
-    t = Trade(
-        contract_id=created_c.id,
-        type="BUY",
-        price=1400.0,
-        amount=10.0,
-        fee=0.05,
-        profit=0.0
-    )
-    created_t = await Trade.create(t)
-    print(f"Trade created: ID={created_t.id}")
+        # 5. Close Contract
+        print("Closing contract...")
+        await Contract.close_contract(created_c.id, sell_price=1410.0, profit=100.0, profit_rate=0.7)
     
-    # 5. Close Contract
-    print("Closing contract...")
-    await Contract.close_contract(created_c.id, sell_price=1410.0, profit=100.0, profit_rate=0.7)
+        # 6. Verify Close
+        print("Verifying close...")
+        active_now = await Contract.get_active_contracts()
+        # Should not be in active list assuming we filtered by ACTIVE
+        # (Actually my get_active_contracts logic selects * from contracts where status='ACTIVE')
+        # So it should disappear from that list
+        is_still_active = any(c.id == created_c.id for c in active_now)
+        print(f"Is contract still active? {is_still_active}")
+        assert not is_still_active
     
-    # 6. Verify Close
-    print("Verifying close...")
-    active_now = await Contract.get_active_contracts()
-    # Should not be in active list assuming we filtered by ACTIVE
-    # (Actually my get_active_contracts logic selects * from contracts where status='ACTIVE')
-    # So it should disappear from that list
-    is_still_active = any(c.id == created_c.id for c in active_now)
-    print(f"Is contract still active? {is_still_active}")
-    assert not is_still_active
-    
-    print("--- DB Test Passed ---")
+        print("--- DB Test Passed ---")
+
+async def test_batched_writes():
+    print("--- Starting Batched Write Test ---")
+    async with temp_database():
+        # Burst of concurrent writes is grouped into shared transactions
+        ids = await asyncio.gather(*(
+            execute_write("INSERT INTO config (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                          (f"bench_key_{i}", str(i)))
+            for i in range(50)
+        ))
+        assert len(ids) == 50
+        row = await execute_read("SELECT value FROM config WHERE key = ?", ("bench_key_49",))
+        assert row['value'] == "49"
+
+        # One failing statement must not take its batch neighbours down with it
+        results = await asyncio.gather(
+            execute_write("INSERT INTO config (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value", ("batch_ok_1", "a")),
+            execute_write("INSERT INTO no_such_table (x) VALUES (?)", (1,)),
+            execute_write("INSERT INTO config (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value", ("batch_ok_2", "b")),
+            return_exceptions=True
+        )
+        assert not isinstance(results[0], Exception)
+        assert isinstance(results[1], Exception)
+        assert not isinstance(results[2], Exception)
+        assert (await execute_read("SELECT value FROM config WHERE key = ?", ("batch_ok_2",)))['value'] == "b"
+
+        await execute_write("DELETE FROM config WHERE key LIKE 'bench_key_%' OR key LIKE 'batch_ok_%'")
+        print("--- Batched Write Test Passed ---")
+
+async def test_pool_switch():
+    print("--- Starting Pool Switch Test ---")
+    async with temp_database() as path:
+        await execute_write("INSERT INTO config (key, value) VALUES (?, ?)", ("switch_key", "old"))
+        old = db._pool
+        # Swapping DB_FILE directly (no close_db) must not leak the old pool
+        db.DB_FILE = os.path.join(os.path.dirname(path), "other.db")
+        await init_db()
+        await execute_write("INSERT INTO config (key, value) VALUES (?, ?)", ("switch_key", "new"))
+        assert db._pool is not old
+        await close_db()
+        assert old._writer_conn is None and not old._reader_conns and old._writer_executor._shutdown
+        assert (await execute_read("SELECT value FROM config WHERE key = ?", ("switch_key",)))['value'] == "new"
+        db.DB_FILE = path
+        assert (await execute_read("SELECT value FROM config WHERE key = ?", ("switch_key",)))['value'] == "old"
+    print("--- Pool Switch Test Passed ---")
 
 if __name__ == "__main__":
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     asyncio.run(test_db_operations())
+    asyncio.run(test_batched_writes())
+    asyncio.run(test_pool_switch())
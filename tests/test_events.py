@@ -0,0 +1,32 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.events import EventQueue, PriceTick, OrderEvent, TimerEvent, RECONCILE_FILLS
+
+async def test_event_queue():
+    print("--- Starting Event Queue Test ---")
+    queue = EventQueue()
+
+    # A burst of ticks collapses into one event carrying the latest price
+    for price in (1400.0, 1410.0, 1420.0):
+        queue.put(PriceTick("KRW-USDT", price))
+    queue.put(OrderEvent({'uuid': 'o1', 'state': 'done'}))
+    queue.put(PriceTick("KRW-USDT", 1430.0))
+    queue.put(TimerEvent(RECONCILE_FILLS))
+    assert queue.qsize() == 3
+
+    first = await queue.get()
+    assert isinstance(first, PriceTick) and first.price == 1430.0
+    assert isinstance(await queue.get(), OrderEvent)
+    assert isinstance(await queue.get(), TimerEvent)
+
+    # Once consumed, the next tick is queued again
+    queue.put(PriceTick("KRW-USDT", 1440.0))
+    assert (await queue.get()).price == 1440.0
+
+    print("--- Event Queue Test Passed ---")
+
+if __name__ == "__main__":
+    asyncio.run(test_event_queue())
@@ -0,0 +1,49 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.grid_index import GridOccupancy, EMPTY, OPEN_ORDER, PENDING_BUY, ACTIVE_CONTRACT
+from modules.grid_ladder import GridLadder
+
+def test_grid_occupancy():
+    print("--- Starting Grid Occupancy Test ---")
+
+    # min=1400, max=1500, int=20 -> 1400, 1420, 1440, 1460, 1480, 1500
+    grid = GridOccupancy(GridLadder("KRW-USDT", 1400.0, 1500.0, 20.0))
+    assert grid.level_count == 6
+    assert grid.level_of(1440.0) == 2
+    assert grid.level_of("1440.0") == 2
+    assert grid.level_of(1445.0) is None   # off-grid
+    assert grid.level_of(1520.0) is None   # out of range
+    assert grid.highest_level_at_or_below(1450.0) == 2
+    assert grid.highest_level_at_or_below(1399.0) == -1
+
+    # Sources map to states, highest priority wins
+    grid.add_pending("buy-1", 1400.0)
+    grid.add_contract(7, 1420.0)
+    grid.sync_open_orders([
+        {'side': 'bid', 'uuid': 'buy-1', 'price': '1400.0'},
+        {'side': 'bid', 'uuid': 'ex-1', 'price': '1440.0'},
+        {'side': 'ask', 'uuid': 'sell-1', 'price': '1460.0'},
+    ])
+    assert grid.state(0) == PENDING_BUY
+    assert grid.state(1) == ACTIVE_CONTRACT
+    assert grid.state(2) == OPEN_ORDER
+    assert grid.state(3) == EMPTY   # sell orders do not occupy buy levels
+    assert list(grid.free_levels_at_or_below(1450.0)) == []
+    assert list(grid.free_levels_at_or_below(1500.0)) == [3, 4, 5]
+
+    # Updates only touch their own level
+    grid.remove_contract(7)
+    grid.sync_open_orders([{'side': 'bid', 'uuid': 'buy-1', 'price': '1400.0'}])
+    assert grid.state(1) == EMPTY
+    assert grid.state(2) == EMPTY
+    assert grid.take_freed() == {1, 2} and grid.take_freed() == set()
+    grid.remove_pending("buy-1")
+    assert grid.state(0) == OPEN_ORDER
+    assert grid.summary() == {'EMPTY': 5, 'OPEN': 1, 'PENDING': 0, 'CONTRACT': 0}
+
+    print("--- Grid Occupancy Test Passed ---")
+
+if __name__ == "__main__":
+    test_grid_occupancy()
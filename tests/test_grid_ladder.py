@@ -0,0 +1,46 @@
+import os
+import sys
+from decimal import Decimal
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.grid_ladder import GridLadder, get_price_unit, snap_price, sell_target_price
+
+def test_price_units():
+    print("--- Starting Price Unit Test ---")
+    assert get_price_unit("KRW-BTC", 95_000_000) == Decimal("1000")
+    assert get_price_unit("KRW-USDT", 1450) == Decimal("1")
+    assert get_price_unit("KRW-XRP", 850) == Decimal("0.1")
+    assert snap_price("KRW-USDT", 1450.7) == Decimal("1450")
+    # Rounding up across a band boundary re-snaps to the coarser unit
+    assert sell_target_price("KRW-XRP", 999.9, 0.15) == 1001.0
+    assert sell_target_price("KRW-USDT", 1400.0, 3.0) == 1403.0
+    print("--- Price Unit Test Passed ---")
+
+def test_grid_ladder():
+    print("--- Starting Grid Ladder Test ---")
+
+    # A float walk drifts: 0.1 added 30 times != 3.0. The ladder stays exact.
+    ladder = GridLadder("KRW-XRP", 850.0, 853.0, 0.1)
+    assert ladder.level_count == 31
+    assert ladder.price_of(30) == 853.0
+    assert ladder.level_of(852.9) == 29
+
+    ladder = GridLadder("KRW-USDT", 1400.0, 1500.0, 20.0)
+    assert ladder.prices == [1400.0, 1420.0, 1440.0, 1460.0, 1480.0, 1500.0]
+    assert list(ladder.levels_below(1450.0)) == [0, 1, 2]
+    assert list(ladder.levels_below(1440.0, inclusive=False)) == [0, 1]
+    assert list(ladder.levels_above(1440.0)) == [3, 4, 5]
+    assert list(ladder.levels_between(1480.0, 1421.0)) == [2, 3, 4]
+    assert ladder.total_cost(5) == Decimal("43500")
+    assert ladder.total_cost(5, ladder.levels_below(1450.0)) == Decimal("21300")
+
+    # Levels in a coarse band are snapped down and merged
+    ladder = GridLadder("KRW-BTC", 90_000_000, 90_010_000, 300)
+    assert all(p % 1000 == 0 for p in ladder.prices)
+    assert len(set(ladder.prices)) == ladder.level_count
+
+    print("--- Grid Ladder Test Passed ---")
+
+if __name__ == "__main__":
+    test_price_units()
+    test_grid_ladder()
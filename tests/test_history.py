@@ -0,0 +1,104 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.history import HistoryCache, FixtureSource, UpbitHistorySource, CANDLES, TRADES, _empty
+
+class FakeCandleClient:
+    """Serves a full day of 1m candles newest-first, 200 per page, like /v1/candles/minutes/1."""
+
+    def __init__(self, day: date):
+        start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc) - timedelta(minutes=30)
+        # One extra half hour on each side of the day to check filtering
+        self.candles = [start + timedelta(minutes=i) for i in range(1440 + 60)]
+        self.calls = 0
+
+    async def get_minute_candles(self, market, to=None, count=200, unit=1, priority=None):
+        self.calls += 1
+        end = datetime.strptime(to, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+        older = [t for t in self.candles if t < end][-count:]
+        return [{'candle_date_time_utc': t.strftime('%Y-%m-%dT%H:%M:%S'), 'opening_price': 1.0,
+                 'high_price': 2.0, 'low_price': 0.5, 'trade_price': float(t.minute),
+                 'candle_acc_trade_volume': 3.0} for t in reversed(older)]
+
+async def run_history_test():
+    print("--- Starting History Cache Test ---")
+    root = tempfile.mkdtemp()
+    try:
+        yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+        first = yesterday - timedelta(days=2)
+
+        # 1. Fixture source: three days downloaded once, then served from disk
+        source = FixtureSource()
+        cache = HistoryCache(source, root)
+        fetched = await cache.ensure('KRW-USDT', CANDLES, first, yesterday)
+        assert len(fetched) == 3 and source.calls == 3
+        assert await cache.ensure('KRW-USDT', CANDLES, first, yesterday) == []
+        assert source.calls == 3, "Cached days must not be fetched again"
+        print("Days cached once and reused.")
+
+        # 2. Resume: a missing day is the only one fetched
+        shutil.rmtree(cache.day_dir('KRW-USDT', CANDLES, first))
+        assert await cache.ensure('KRW-USDT', CANDLES, first, yesterday) == [first]
+        assert source.calls == 4
+
+        # 3. Single day is a zero-copy memmap; ranges concatenate in time order
+        day = await cache.load('KRW-USDT', CANDLES, yesterday, yesterday)
+        assert isinstance(day['close'], np.memmap) and len(day['close']) == 1440
+        assert day['ts'].dtype == np.int64
+        span = await cache.load('KRW-USDT', CANDLES, first, yesterday)
+        assert len(span['ts']) == 3 * 1440 and np.all(np.diff(span['ts']) > 0)
+        prices = await cache.prices('KRW-USDT', first, yesterday)
+        assert len(prices) == 4 * 3 * 1440
+
+        trades = await cache.load('KRW-USDT', TRADES, yesterday, yesterday)
+        assert trades['side'].dtype == np.int8 and len(trades['price']) == source.trades_per_day
+
+        try:
+            await cache.ensure('KRW-USDT', CANDLES, yesterday, yesterday + timedelta(days=1))
+            assert False, "Today must not be cached"
+        except ValueError:
+            pass
+        print("Memmap loads and range checks OK.")
+
+        # 4. Upbit source pages backwards and keeps exactly one UTC day
+        client = FakeCandleClient(yesterday)
+        columns = await UpbitHistorySource(client).fetch_day('KRW-USDT', CANDLES, yesterday)
+        day_ts = int(datetime(yesterday.year, yesterday.month, yesterday.day, tzinfo=timezone.utc).timestamp())
+        assert len(columns['ts']) == 1440
+        assert columns['ts'][0] == day_ts and columns['ts'][-1] == day_ts + 86400 - 60
+        assert np.all(np.diff(columns['ts']) == 60)
+        assert client.calls == 8, client.calls  # ceil(1440 / 200), the last page reaches the day start
+        print(f"Candle paging OK ({client.calls} pages).")
+
+        # 5. An empty day is not cached as complete, so it is fetched again next run
+        class EmptySource(FixtureSource):
+            async def fetch_day(self, market, kind, day):
+                self.calls += 1
+                return _empty(kind)
+
+        empty = EmptySource()
+        cache = HistoryCache(empty, root)
+        assert await cache.ensure('KRW-BTC', CANDLES, yesterday, yesterday) == []
+        assert not cache.has('KRW-BTC', CANDLES, yesterday)
+        assert len((await cache.load('KRW-BTC', CANDLES, yesterday, yesterday))['ts']) == 0
+        assert empty.calls == 2, "An empty day must be fetched again"
+        cache.source = FixtureSource()
+        assert await cache.ensure('KRW-BTC', CANDLES, yesterday, yesterday) == [yesterday]
+        print("Empty days are retried.")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print("--- History Cache Test Passed ---")
+
+def test_history():
+    asyncio.run(run_history_test())
+
+if __name__ == "__main__":
+    test_history()
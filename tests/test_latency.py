@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import uuid as uuid_lib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.latency import Histogram, LatencyRecorder, recorder
+from modules.simulator import SimExchange, SimHandler
+from modules.slash_commands import create_latency_embed
+from modules.trading_manager import TradingManager
+from modules.upbit_client import OrderRejected
+from database.database import temp_database
+
+CONFIG = {'coin_ticker': 'KRW-USDT', 'min_price': 1400.0, 'max_price': 1500.0,
+          'grid_interval': 5.0, 'amount_per_grid': 1.0, 'profit_interval': 5.0}
+
+def run_histogram_test():
+    print("Testing histogram accuracy...")
+    rng = random.Random(7)
+    values = sorted(int(rng.lognormvariate(8, 1.5)) for _ in range(20_000))  # µs, ~3 ms median
+    hist = Histogram()
+    for v in values:
+        hist.record(v)
+    assert hist.count == len(values) and hist.min == values[0] and hist.max == values[-1]
+    for p in (50, 90, 99, 99.9):
+        exact = values[int(len(values) * p / 100 + 0.5) - 1]
+        assert abs(hist.percentile(p) - exact) <= exact * 0.04 + 1, (p, hist.percentile(p), exact)
+    assert len(hist.counts) < 1000  # Bounded by value range, not sample count
+
+    # Small values are exact
+    small = Histogram()
+    for v in (3, 3, 5, 60):
+        small.record(v)
+    assert small.percentile(50) == 3 and small.percentile(100) == 60
+
+    merged = Histogram()
+    merged.merge(small)
+    merged.merge(hist)
+    assert merged.count == hist.count + 4 and merged.min == 3 and merged.max == hist.max
+
+async def run_fill_path_test():
+    print("Testing fill path spans...")
+    async with temp_database():
+        recorder.reset()
+
+        exchange = SimExchange(balances={'KRW': 1_000_000.0, 'USDT': 10.0})
+        exchange.set_price('KRW-USDT', 1450.0)
+        manager = TradingManager(SimHandler(exchange))
+        manager.config = dict(CONFIG)
+        manager._build_grid()
+
+        await manager.process_buy_fill(f"latency-buy-{uuid_lib.uuid4()}", 1440.0, 1.0)
+        contract = manager.contract_book.active()[0]
+        await manager.process_sell_fill(contract, contract.target_price, contract.buy_amount)
+
+        stats = recorder.snapshot()['stats']
+        for name in ('buy_fill.contract_persisted', 'buy_fill.sell_sent', 'buy_fill.sell_acked',
+                     'sell_fill.contract_closed', 'sell_fill.reentry_placed',
+                     'api.sell_limit_order', 'api.buy_limit_order'):
+            assert stats[name]['count'] == 1, name
+        # Stages are cumulative from detection
+        assert stats['buy_fill.contract_persisted']['max_ms'] <= stats['buy_fill.sell_acked']['max_ms']
+        assert stats['api.sell_limit_order']['errors'] == 0
+
+        # A failed call is counted as an error
+        broke = SimExchange(balances={'KRW': 0.0})  # The buy is rejected
+        broke.set_price('KRW-USDT', 1450.0)
+        assert isinstance(await SimHandler(broke).buy_limit_order('KRW-USDT', 1440.0, 1.0), OrderRejected)
+        assert recorder.snapshot()['stats']['api.buy_limit_order']['errors'] == 1
+
+        # Call timer records and re-raises
+        local = LatencyRecorder()
+        try:
+            with local.call('api.test'):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+        assert local.errors['api.test'] == 1 and local.histograms['api.test'].count == 1
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = await recorder.dump_to_file(os.path.join(tmp, "latency.json"))  # Written off the loop
+            with open(path) as f:
+                assert 'buy_fill.sell_acked' in json.load(f)['stats']
+
+        # The fill-path field only shows fill stages; DB and loop timings get their own field
+        fields = {field.name: field.value for field in create_latency_embed().fields}
+        fill_field = next(v for k, v in fields.items() if '체결' in k)
+        assert 'buy_fill.sell_acked' in fill_field and 'db.write' not in fill_field
+        assert any('db.write' in v for k, v in fields.items() if 'DB' in k)
+
+async def run_latency_test():
+    print("--- Starting Latency Test ---")
+    run_histogram_test()
+    await run_fill_path_test()
+    print("--- Latency Test Passed ---")
+
+def test_latency():
+    asyncio.run(run_latency_test())
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run_latency_test())
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import sys
+import uuid as uuid_lib
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.level_locks import LevelLocks, InFlight
+from modules.simulator import SimExchange, SimHandler
+from modules.trading_manager import TradingManager
+from database.database import temp_database
+
+CONFIG = {'coin_ticker': 'KRW-USDT', 'min_price': 1400.0, 'max_price': 1500.0,
+          'grid_interval': 5.0, 'amount_per_grid': 1.0, 'profit_interval': 5.0}
+LATENCY = 0.05  # Simulated exchange round trip
+
+def make_manager(handler) -> TradingManager:
+    manager = TradingManager(handler)
+    manager.config = dict(CONFIG)
+    manager._build_grid()
+    return manager
+
+async def run_lock_test():
+    print("Testing LevelLocks...")
+    locks = LevelLocks()
+    order = []
+
+    async def work(key, tag):
+        async with locks.hold(key):
+            order.append(f"{tag}+")
+            await asyncio.sleep(0.01)
+            order.append(f"{tag}-")
+
+    await asyncio.gather(work(1, 'a'), work(1, 'b'), work(2, 'c'))
+    # Same level: a and b never overlap; level 2 ran alongside
+    assert order.index('a-') < order.index('b+')
+    assert order.index('c+') < order.index('a-')
+    assert len(locks) == 0, "Released locks are dropped"
+
+    inflight = InFlight()
+    with inflight:
+        assert not await inflight.settled(0.01)
+    assert await inflight.settled(0.01)
+
+async def run_parallel_fills_test():
+    print("Testing fills on different levels run in parallel...")
+    exchange = SimExchange(balances={'KRW': 1e9, 'USDT': 100.0}, latency=LATENCY)
+    exchange.set_price('KRW-USDT', 1500.0)
+    manager = make_manager(SimHandler(exchange))
+
+    levels = [1400.0 + 5 * i for i in range(8)]
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.gather(*(manager.process_buy_fill(f"par-{uuid_lib.uuid4()}", p, 1.0) for p in levels))
+    elapsed = loop.time() - started
+    print(f"8 buy fills in {elapsed * 1000:.0f} ms (one sell placement = {LATENCY * 1000:.0f} ms)")
+    assert elapsed < LATENCY * 8 / 2, "Fills were serialized"
+    assert len(manager.contract_book) == 8 and exchange.stats['orders'] == 8
+
+    # Same level: the duplicate waits for the first and is skipped
+    uuid = f"dup-{uuid_lib.uuid4()}"
+    await asyncio.gather(manager.process_buy_fill(uuid, 1450.0, 1.0), manager.process_buy_fill(uuid, 1450.0, 1.0))
+    assert len(manager.contract_book) == 9 and exchange.stats['orders'] == 9
+
+async def run_no_duplicates_test():
+    print("Testing scans racing fills never double-place a level...")
+    exchange = SimExchange(balances={'KRW': 1e9, 'USDT': 100.0}, latency=0.002)
+    exchange.set_price('KRW-USDT', 1450.0)
+    manager = make_manager(SimHandler(exchange))
+
+    # Some levels hold contracts whose sells fill while scans run
+    for price in (1420.0, 1430.0, 1440.0):
+        await manager.process_buy_fill(f"nd-{uuid_lib.uuid4()}", price, 1.0)
+    contracts = manager.contract_book.active()
+
+    await asyncio.gather(
+        manager._fill_empty_grids(),
+        manager._fill_empty_grids(),
+        *(manager.process_sell_fill(c, c.target_price, c.buy_amount) for c in contracts),
+        manager._refill_incremental(1450.0),
+    )
+    bids = Counter(o['price'] for o in exchange.orders.values() if o['side'] == 'bid')
+    assert bids and max(bids.values()) == 1, bids
+    assert len(bids) == len(manager.pending_buy_orders)
+    assert all(manager.grid.state(manager.grid.level_of(p)) for p in bids)
+
+class RacingHandler(SimHandler):
+    """The sell fills and its myOrder event is handled before the placing call returns."""
+    def __init__(self, exchange, manager_ref):
+        super().__init__(exchange)
+        self.manager_ref = manager_ref
+        self.early = []
+
+    async def sell_limit_order(self, ticker, price, amount, identifier=None):
+        uuid = f"sell-{uuid_lib.uuid4()}"
+        event = {'type': 'myOrder', 'state': 'done', 'uuid': uuid, 'ask_bid': 'ASK', 'code': ticker,
+                 'price': price, 'executed_volume': amount}
+        self.early.append(asyncio.create_task(self.manager_ref[0].handle_order_event(event)))
+        await asyncio.sleep(0.02)
+        return uuid
+
+async def run_early_fill_test():
+    print("Testing a stream fill that beats its placement response...")
+    exchange = SimExchange()
+    exchange.set_price('KRW-USDT', 1450.0)
+    ref = []
+    handler = RacingHandler(exchange, ref)
+    manager = make_manager(handler)
+    ref.append(manager)
+
+    await manager.process_buy_fill(f"early-{uuid_lib.uuid4()}", 1440.0, 1.0)
+    await asyncio.gather(*handler.early)
+    assert len(manager.contract_book) == 0, "Sell fill was dropped"
+    assert len(manager.pending_buy_orders) == 1  # Re-entry buy
+
+async def run_level_locks_test():
+    print("--- Starting Level Locks Test ---")
+    async with temp_database():
+        await run_lock_test()
+        await run_parallel_fills_test()
+        await run_no_duplicates_test()
+        await run_early_fill_test()
+        print("--- Level Locks Test Passed ---")
+
+def test_level_locks():
+    asyncio.run(run_level_locks_test())
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run_level_locks_test())
@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.utils import setup_logger, stop_logging, ThrottleFilter, THROTTLED
+
+class SlowHandler(logging.Handler):
+    """Stands in for a slow disk."""
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+        self.messages = []
+
+    def emit(self, record):
+        time.sleep(0.001)
+        self.threads.add(threading.get_ident())
+        self.messages.append(self.format(record))
+
+def run_async_logging_test(tmp: str):
+    print("Testing queue logging...")
+    path = os.path.join(tmp, "system.log")
+    logger = setup_logger("TestAsyncLog", path, async_mode=True)
+    slow = SlowHandler()
+    # Swap the disk handler for the slow one behind the same queue listener
+    from modules.utils import _listeners
+    _listeners[-1].handlers = _listeners[-1].handlers + (slow,)
+
+    t0 = time.perf_counter()
+    for i in range(200):
+        logger.info("fill %s @ %s", i, 1450.0)
+    enqueue_s = time.perf_counter() - t0
+    # 200 x 1 ms of handler time happens off the caller's thread
+    assert enqueue_s < 0.1, enqueue_s
+    stop_logging()
+    assert threading.get_ident() not in slow.threads
+    assert len(slow.messages) == 200 and slow.messages[-1] == "fill 199 @ 1450.0"
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 200 and lines[0].endswith("fill 0 @ 1450.0")
+
+def run_json_test(tmp: str):
+    print("Testing JSON lines...")
+    path = os.path.join(tmp, "json.log")
+    logger = setup_logger("TestJsonLog", path, async_mode=True, json_format=True)
+    logger.info("Order placed at %s", 1445.0)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.error("Failed", exc_info=True)
+    stop_logging()
+    with open(path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f]
+    assert entries[0]['msg'] == "Order placed at 1445.0" and entries[0]['level'] == 'INFO'
+    assert 'ValueError: boom' in entries[1]['exc']
+
+def run_throttle_test():
+    print("Testing throttle...")
+    throttle = ThrottleFilter(window=0.05, burst=3)
+    logger = logging.getLogger("TestThrottle")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addFilter(throttle)
+    sink = SlowHandler()
+    logger.addHandler(sink)
+
+    def scan():
+        for level in range(10):
+            logger.info("Found Empty Grid at %s", level, extra=THROTTLED)
+        logger.info("not throttled")
+        logger.warning("Order rejected (always logged)", extra=THROTTLED)
+
+    scan()
+    assert sink.messages[:3] == ["Found Empty Grid at 0", "Found Empty Grid at 1", "Found Empty Grid at 2"]
+    assert sink.messages[3:] == ["not throttled", "Order rejected (always logged)"]
+    time.sleep(0.06)
+    scan()
+    assert sink.messages[5] == "Found Empty Grid at 0 [+7 similar suppressed]"
+
+def test_logging():
+    print("--- Starting Logging Test ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        run_async_logging_test(tmp)
+        run_json_test(tmp)
+    run_throttle_test()
+    print("--- Logging Test Passed ---")
+
+if __name__ == "__main__":
+    test_logging()
@@ -0,0 +1,66 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.loop_monitor import LoopLagMonitor, LoopProfiler
+
+async def blocking_step():
+    """Stands in for a sync file write / literal_eval on the loop."""
+    for _ in range(3):
+        time.sleep(0.05)
+        await asyncio.sleep(0.01)
+
+async def run_loop_monitor_test():
+    print("--- Starting Loop Monitor Test ---")
+
+    # Lag sampler sees the stall
+    monitor = LoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.03)
+    time.sleep(0.1)
+    await asyncio.sleep(0.03)
+    monitor.stop()
+    assert monitor.max >= 0.05, monitor.max
+    print(f"Max lag seen: {monitor.max * 1000:.0f} ms")
+
+    # Profiler attributes the stall to the coroutine that blocked
+    profiler = LoopProfiler()
+    original = asyncio.Handle._run
+    task = asyncio.create_task(blocking_step())
+    with tempfile.TemporaryDirectory() as tmp:
+        path, report = await profiler.profile_to_file(0.3, os.path.join(tmp, "profile.json"))
+        with open(path) as f:
+            assert json.load(f)['slowest_callbacks'] == report['slowest_callbacks']
+    await task
+    assert asyncio.Handle._run is original, "Handle._run must be restored"
+    assert not profiler.running
+
+    slowest = report['slowest_callbacks'][0]
+    assert slowest['name'] == 'task:blocking_step' and slowest['max_ms'] >= 45, slowest
+    assert any('blocking_step' in f['name'] for f in report['hot_functions'])
+    assert report['busy_pct'] > 20
+    print(f"Slowest callback: {slowest['name']} ({slowest['max_ms']:.0f} ms), busy {report['busy_pct']}%")
+
+    # One profile at a time
+    first = asyncio.create_task(profiler.profile(0.1))
+    await asyncio.sleep(0)
+    try:
+        await profiler.profile(0.1)
+        assert False, "Second concurrent profile must be refused"
+    except RuntimeError:
+        pass
+    await first
+
+    print("--- Loop Monitor Test Passed ---")
+
+def test_loop_monitor():
+    asyncio.run(run_loop_monitor_test())
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run_loop_monitor_test())
@@ -0,0 +1,51 @@
+import asyncio
+import json
+import os
+import sys
+
+import websockets
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.market_data import MarketDataHub
+
+async def test_market_data_hub():
+    print("--- Starting Market Data Hub Test ---")
+    requests = []
+
+    async def server(ws):
+        request = json.loads(await ws.recv())
+        requests.append(request)
+        codes = [c for part in request if part.get('type') == 'ticker' for c in part['codes']]
+        for i, code in enumerate(codes * 3):
+            await ws.send(json.dumps({'type': 'ticker', 'code': code, 'trade_price': 100.0 + i}))
+        await ws.wait_closed()
+
+    async with websockets.serve(server, "127.0.0.1", 0) as srv:
+        port = srv.sockets[0].getsockname()[1]
+        hub = MarketDataHub(f"ws://127.0.0.1:{port}")
+
+        # Two subscribers share one socket; each only sees its own codes
+        usdt = hub.subscribe(['KRW-USDT'])
+        both = hub.subscribe(['KRW-USDT', 'KRW-XRP'], maxsize=2)
+        first = await asyncio.wait_for(usdt.get(), 2)
+        assert first['code'] == 'KRW-USDT'
+        await asyncio.sleep(0.2)
+        # The code set changed, so the socket re-subscribed with the union
+        assert requests[-1][1]['codes'] == ['KRW-USDT', 'KRW-XRP']
+
+        # Per-code price table + bounded fan-out (slow consumer drops the oldest)
+        assert hub.live_price('KRW-XRP', max_age=5) is not None
+        assert both.queue.qsize() == 2 and both.dropped > 0
+
+        # Last subscriber leaving stops the socket; a closed subscription returns None
+        hub.unsubscribe(usdt)
+        hub.unsubscribe(both)
+        while await usdt.get() is not None:
+            pass
+        await asyncio.sleep(0.05)
+        assert not hub.connected and hub.stats()['subscribers'] == 0
+
+    print("--- Market Data Hub Test Passed ---")
+
+if __name__ == "__main__":
+    asyncio.run(test_market_data_hub())
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import sys
+import uuid as uuid_lib
+
+import aiohttp
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.latency import recorder
+from modules.metrics import MetricsServer, collect, CONTENT_TYPE
+from modules.loop_monitor import LOOP_LAG_INTERVAL
+from modules.simulator import SimExchange, SimHandler
+from modules.trading_manager import TradingManager
+from modules.upbit_client import OrderRejected
+from database.database import temp_database
+
+CONFIG = {'coin_ticker': 'KRW-USDT', 'min_price': 1400.0, 'max_price': 1500.0,
+          'grid_interval': 5.0, 'amount_per_grid': 1.0, 'profit_interval': 5.0}
+
+def parse(text: str) -> dict:
+    """'name{labels} value' lines -> {'name{labels}': float}"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            key, value = line.rsplit(' ', 1)
+            samples[key] = float(value)
+    return samples
+
+async def run_metrics_test():
+    print("--- Starting Metrics Test ---")
+    async with temp_database():
+        recorder.reset()
+
+        exchange = SimExchange(balances={'KRW': 1_000_000.0, 'USDT': 10.0})
+        exchange.set_price('KRW-USDT', 1450.0)
+        manager = TradingManager(SimHandler(exchange))
+        manager.config = dict(CONFIG)
+        manager._build_grid()
+
+        await manager.process_buy_fill(f"metrics-buy-{uuid_lib.uuid4()}", 1440.0, 1.0)
+        broke = SimHandler(SimExchange(balances={'KRW': 0.0}))
+        assert isinstance(await broke.buy_limit_order('KRW-USDT', 1440.0, 1.0), OrderRejected)
+
+        samples = parse(collect(manager))
+        assert samples['upbit_grid_orders_placed_total{side="sell"}'] == 1
+        assert samples['upbit_grid_orders_placed_total{side="buy"}'] == 0
+        assert samples['upbit_grid_orders_failed_total{side="buy"}'] == 1
+        assert samples['upbit_grid_fills_total{side="buy"}'] == 1
+        assert samples['upbit_grid_active_contracts{ticker="KRW-USDT"}'] == 1
+        assert samples['upbit_grid_pending_buys{ticker="KRW-USDT"}'] == 0
+        assert samples['upbit_grid_api_call_seconds_count{call="sell_limit_order"}'] == 1
+        assert samples['upbit_grid_ratelimit_requests_total{group="order"}'] == 1
+        assert samples['upbit_grid_db_query_seconds_count{op="write"}'] >= 1
+        assert 'upbit_grid_fill_stage_seconds{stage="buy_fill.sell_acked",quantile="0.99"}' in samples
+
+        # Over HTTP, with the loop-lag sampler running
+        server = MetricsServer(manager, port=0)
+        server.lag.interval = 0.01
+        await server.start()
+        try:
+            await asyncio.sleep(0.05)
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{server.port}/metrics") as resp:
+                    assert resp.status == 200
+                    assert resp.headers['Content-Type'] == CONTENT_TYPE
+                    samples = parse(await resp.text())
+            assert samples['upbit_grid_event_loop_lag_samples_seconds_count'] >= 1
+            assert 'upbit_grid_event_loop_lag_seconds' in samples
+        finally:
+            await server.stop()
+            server.lag.stop()  # Shared sampler; main.py owns it in production
+            server.lag.interval = LOOP_LAG_INTERVAL
+
+        print("--- Metrics Test Passed ---")
+
+def test_metrics():
+    asyncio.run(run_metrics_test())
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run_metrics_test())
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import sys
+import uuid as uuid_lib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.notifier import Outbox, compose, BUY_FILL, SELL_FILL, INFO
+from modules.simulator import SimExchange, SimHandler
+from modules.trading_manager import TradingManager
+from database.database import temp_database, execute_write, NOTIFY_OUTBOX_MAX
+
+CONFIG = {'coin_ticker': 'KRW-USDT', 'min_price': 1400.0, 'max_price': 1500.0,
+          'grid_interval': 5.0, 'amount_per_grid': 1.0, 'profit_interval': 5.0}
+DISCORD_DELAY = 0.2  # A slow / rate-limited Discord
+
+class FakeDiscord:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.messages = []
+
+    async def send(self, message: str):
+        await asyncio.sleep(DISCORD_DELAY)
+        if self.fail:
+            raise RuntimeError("Target channel not found for notification.")
+        self.messages.append(message)
+
+async def run_compose_test():
+    print("Testing coalescing...")
+    rows = [{'id': i, 'kind': BUY_FILL, 'ticker': 'KRW-USDT', 'price': 1450.0 + 5 * (i % 5), 'volume': 1.0,
+             'profit': None, 'message': f"buy {i}"} for i in range(12)]
+    rows.insert(3, {'id': 100, 'kind': INFO, 'ticker': None, 'price': None, 'volume': None, 'profit': None,
+                    'message': "heal"})
+    rows.append({'id': 101, 'kind': SELL_FILL, 'ticker': 'KRW-USDT', 'price': 1475.0, 'volume': 1.0,
+                 'profit': 25.0, 'message': "sell 101"})
+    out = compose(rows)
+    assert [ids for _, ids in out] == [list(range(12)), [100], [101]]
+    assert "12건" in out[0][0] and "1,450 ~ 1,470" in out[0][0] and "12" in out[0][0]
+    assert out[1][0] == "heal" and out[2][0] == "sell 101"  # Singles go out unchanged
+
+async def run_fills_dont_wait_test():
+    print("Testing fills never wait on Discord...")
+    await execute_write("DELETE FROM notifications")
+    exchange = SimExchange(balances={'KRW': 1e9, 'USDT': 100.0})
+    exchange.set_price('KRW-USDT', 1500.0)
+    manager = TradingManager(SimHandler(exchange))
+    manager.config = dict(CONFIG)
+    manager._build_grid()
+    manager.outbox = Outbox(window=0.05)
+    discord = FakeDiscord()
+    manager.set_notification_callback(discord.send)
+    manager.outbox.start()
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.gather(*(manager.process_buy_fill(f"nt-{uuid_lib.uuid4()}", 1400.0 + 5 * i, 1.0)
+                           for i in range(12)))
+    elapsed = loop.time() - started
+    print(f"12 fills in {elapsed * 1000:.0f} ms (one Discord send = {DISCORD_DELAY * 1000:.0f} ms)")
+    assert elapsed < DISCORD_DELAY, "Fills waited on Discord"
+    assert not discord.messages
+
+    for _ in range(50):
+        if discord.messages:
+            break
+        await asyncio.sleep(0.05)
+    await manager.outbox.stop()
+    assert len(discord.messages) == 1, discord.messages
+    assert "12건" in discord.messages[0] and "1,400 ~ 1,455" in discord.messages[0]
+    assert await manager.outbox.pending() == 0
+
+async def run_persistence_test():
+    print("Testing unsent notifications survive a restart...")
+    await execute_write("DELETE FROM notifications")
+    down = Outbox(window=0.01)
+    down.set_sender(FakeDiscord(fail=True).send)
+    down.start()
+    await down.post(INFO, "🚑 healed")
+    await asyncio.sleep(DISCORD_DELAY + 0.05)
+    await down.stop()
+    assert down.stats['failed'] >= 1 and await down.pending() == 1
+
+    # "Restart": a fresh outbox sends what the previous run left behind
+    discord = FakeDiscord()
+    restarted = Outbox(window=0.01)
+    restarted.set_sender(discord.send)
+    restarted.start()
+    await asyncio.sleep(DISCORD_DELAY + 0.1)
+    await restarted.stop()
+    assert discord.messages == ["🚑 healed"] and await restarted.pending() == 0
+
+async def run_bound_test():
+    print("Testing the outbox is bounded...")
+    await execute_write("DELETE FROM notifications")
+    box = Outbox()
+    await asyncio.gather(*(box.post(INFO, f"m{i}") for i in range(NOTIFY_OUTBOX_MAX + 50)))
+    assert await box.pending() == NOTIFY_OUTBOX_MAX
+
+async def run_stale_test():
+    print("Testing stale notifications are sent as one digest, not dropped...")
+    await execute_write("DELETE FROM notifications")
+    for i, price in enumerate((1440.0, 1450.0, 1445.0)):
+        await execute_write("INSERT INTO notifications (kind, ticker, price, volume, message, created_at) "
+                            "VALUES (?, ?, ?, ?, ?, datetime('now', '-2 days'))",
+                            (BUY_FILL, 'KRW-USDT', price, 1.0, f"old fill {i}"))
+    await execute_write("INSERT INTO notifications (kind, message, created_at) VALUES (?, ?, datetime('now', '-2 days'))",
+                        (INFO, "old heal"))
+    box = Outbox(window=0.01)
+    await box.post(INFO, "fresh")
+    discord = FakeDiscord()
+    box.set_sender(discord.send)
+    box.start()
+    await asyncio.sleep(2 * DISCORD_DELAY + 0.1)
+    await box.stop()
+    assert len(discord.messages) == 2 and "fresh" in discord.messages, discord.messages
+    [summary] = [m for m in discord.messages if m != "fresh"]
+    assert "4건" in summary and "매수 체결 3건: KRW-USDT 1,440 ~ 1,450" in summary and "기타 알림 1건" in summary
+    assert await box.pending() == 0
+
+async def run_notifier_test():
+    print("--- Starting Notifier Test ---")
+    async with temp_database():
+        await run_compose_test()
+        await run_fills_dont_wait_test()
+        await run_persistence_test()
+        await run_bound_test()
+        await run_stale_test()
+        print("--- Notifier Test Passed ---")
+
+def test_notifier():
+    asyncio.run(run_notifier_test())
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run_notifier_test())
@@ -0,0 +1,226 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.order_journal import OrderJournal, INTENT, ACKED, FILLED, FAILED
+from modules.upbit_client import UpbitAPIError, OrderRejected
+from modules.simulator import SimExchange, SimHandler
+from modules.trading_manager import TradingManager
+from modules.grid_index import PENDING_BUY
+from database.database import temp_database, execute_read, set_config
+
+TICKER = 'KRW-ETC'
+CONFIG = {'coin_ticker': TICKER, 'min_price': 1400.0, 'max_price': 1500.0,
+          'grid_interval': 5.0, 'amount_per_grid': 1.0, 'profit_interval': 5.0}
+
+class CountingHandler(SimHandler):
+    """Counts the exchange crawls the old recovery needed."""
+    def __init__(self, exchange):
+        super().__init__(exchange)
+        self.crawls = 0
+
+    async def get_open_orders(self, ticker):
+        self.crawls += 1
+        return await super().get_open_orders(ticker)
+
+    async def get_completed_orders(self, ticker, limit=5):
+        self.crawls += 1
+        return await super().get_completed_orders(ticker, limit)
+
+async def make_manager(exchange) -> TradingManager:
+    manager = TradingManager(CountingHandler(exchange), TICKER)
+    manager.config = dict(CONFIG)
+    manager._build_grid()
+    await set_config(manager.config_key, str(CONFIG))
+    return manager
+
+async def journal_rows() -> dict:
+    rows = await execute_read("SELECT * FROM order_intents WHERE coin_ticker = ? ORDER BY id", (TICKER,), fetch_all=True)
+    return {row['identifier']: row for row in rows}
+
+async def run_lifecycle_test(exchange):
+    print("Testing intent -> ack -> fill...")
+    manager = await make_manager(exchange)
+    async with manager._level_locks.hold(manager._level_key(1440.0)):
+        buy_uuid = await manager._place_buy(TICKER, 1440.0, 1.0)
+    [row] = (await journal_rows()).values()
+    assert row['side'] == 'bid' and row['state'] == ACKED and row['uuid'] == buy_uuid
+    assert exchange.orders[buy_uuid]['identifier'] == row['identifier']
+
+    await manager.process_buy_fill(buy_uuid, 1440.0, 1.0)
+    rows = list((await journal_rows()).values())
+    assert rows[0]['state'] == FILLED
+    assert rows[1]['side'] == 'ask' and rows[1]['state'] == ACKED and rows[1]['ref'] == buy_uuid
+    contract = manager.contract_book.active()[0]
+    assert contract.order_uuid == rows[1]['uuid']
+
+    await manager.process_sell_fill(contract, contract.target_price, 1.0)
+    rows = list((await journal_rows()).values())
+    assert rows[1]['state'] == FILLED and rows[2]['side'] == 'bid' and rows[2]['state'] == ACKED  # Re-entry
+
+async def run_crash_recovery_test(exchange):
+    print("Testing crash recovery from the journal...")
+    journal = OrderJournal()
+    # Re-entry buy from the lifecycle test is still resting: a normal ACKED row
+    # a. Buy sent, crash before the ack was written
+    lost_buy = await journal.intent(TICKER, 'bid', 1430.0, 1.0)
+    lost_buy_uuid = (await exchange.place_limit_order(TICKER, 'bid', 1430.0, 1.0, lost_buy))['uuid']
+    # b. Intent written, crash before the request left
+    never_sent = await journal.intent(TICKER, 'bid', 1425.0, 1.0)
+    # c. Buy acked, then it filled while the bot was down
+    filled_buy = await journal.intent(TICKER, 'bid', 1460.0, 1.0)
+    filled_uuid = (await exchange.place_limit_order(TICKER, 'bid', 1460.0, 1.0, filled_buy))['uuid']
+    await journal.acked(filled_buy, filled_uuid)
+    # e. Acked order the exchange has never heard of (e.g. a simulator uuid)
+    ghost = await journal.intent(TICKER, 'bid', 1435.0, 1.0)
+    await journal.acked(ghost, "ghost-uuid")
+    # d. Buy filled and contract written, crash while its sell was in flight
+    manager = await make_manager(exchange)
+    exchange.set_price(TICKER, 1442.0)  # Fills c only (bid 1460); the 1440 re-entry keeps resting
+    original_sell = manager.handler.sell_limit_order
+
+    async def crash_after_send(ticker, price, amount, identifier=None):
+        await original_sell(ticker, price, amount, identifier)
+        raise asyncio.CancelledError  # Process died before the response was handled
+    manager.handler.sell_limit_order = crash_after_send
+    try:
+        await manager.process_buy_fill("crashed-buy", 1445.0, 1.0)
+    except asyncio.CancelledError:
+        pass
+    asks_before = sum(o['side'] == 'ask' for o in exchange.orders.values())
+
+    # Restart
+    restarted = TradingManager(CountingHandler(exchange), TICKER)
+    await restarted.recover_state()
+    assert restarted.handler.crawls == 0, "Recovery crawled the exchange"
+
+    rows = await journal_rows()
+    assert rows[lost_buy]['state'] == ACKED and rows[lost_buy]['uuid'] == lost_buy_uuid
+    assert lost_buy_uuid in restarted.pending_buy_orders
+    assert 1440.0 in restarted.pending_buy_orders.values()  # The re-entry buy
+    assert rows[never_sent]['state'] == FAILED
+    assert rows[ghost]['state'] == FAILED, "Unknown uuid stays in the journal forever"
+    assert rows[filled_buy]['state'] == FILLED
+    by_buy = {c.buy_order_uuid: c for c in restarted.contract_book.active()}
+    assert filled_uuid in by_buy, "Offline fill was not replayed"
+    crashed = by_buy["crashed-buy"]
+    crashed_intent = next(r for r in rows.values() if r['ref'] == "crashed-buy")
+    assert crashed.order_uuid == crashed_intent['uuid'] != "crashed-buy"
+    # Only the replayed fill's sell was added: the crashed sell was adopted, not re-sent
+    assert sum(o['side'] == 'ask' for o in exchange.orders.values()) == asks_before + 1
+    assert not [r for r in rows.values() if r['state'] == INTENT]
+
+class NoAnswerHandler(CountingHandler):
+    """Order calls time out: `lands` decides whether the request reached the exchange first."""
+    def __init__(self, exchange, lands: bool):
+        super().__init__(exchange)
+        self.lands = lands
+
+    async def _place(self, ticker, side, price, amount, priority, identifier):
+        if self.lands:
+            await super()._place(ticker, side, price, amount, priority, identifier)
+        return None  # Timeout / connection reset: no uuid, no status
+
+async def run_no_answer_test(exchange):
+    print("Testing placements that got no answer stay INTENT until looked up...")
+    manager = await make_manager(exchange)
+    manager.handler = NoAnswerHandler(exchange, lands=True)
+    landed = await journal_buy(manager, 1410.0)
+    manager.handler.lands = False
+    lost = await journal_buy(manager, 1405.0)
+    rows = await journal_rows()
+    assert rows[landed]['state'] == INTENT and rows[lost]['state'] == INTENT, "Unanswered orders were closed out"
+    # Their levels stay taken: a refill must not put a second order next to one that may be resting
+    orders = exchange.stats['orders']
+    async with manager._level_locks.hold(manager._level_key(1410.0)):
+        assert await manager._place_order_atomic(TICKER, 1410.0, 1.0) is None
+    assert exchange.stats['orders'] == orders
+    assert manager.grid.state(manager.grid.level_of(1405.0)) == PENDING_BUY
+
+    # Rejected by the exchange (4xx): nothing is resting, so it is closed out right away
+    async def rejected(ticker, price, amount, identifier=None):
+        return OrderRejected(UpbitAPIError(400, 'insufficient_funds_bid', "no KRW"))
+    manager.handler.buy_limit_order = rejected
+    refused = await journal_buy(manager, 1400.0)
+    assert (await journal_rows())[refused]['state'] == FAILED and refused not in manager.unacked_buys
+
+    # Ambiguous sell: the contract keeps its placeholder, which is not mistaken for a filled sell
+    manager.handler = NoAnswerHandler(exchange, lands=True)
+    await manager.process_buy_fill("no-answer-buy", 1415.0, 1.0)
+    contract = next(c for c in manager.contract_book.active() if c.buy_order_uuid == "no-answer-buy")
+    assert contract.order_uuid == "no-answer-buy" and "no-answer-buy" not in manager.watch_uuids()
+
+    await manager.resolve_unacked()
+    rows = await journal_rows()
+    assert rows[landed]['state'] == ACKED and rows[landed]['uuid'] in manager.pending_buy_orders
+    assert rows[lost]['state'] == FAILED and manager.grid.is_free(manager.grid.level_of(1405.0))
+    assert manager.grid.state(manager.grid.level_of(1410.0)) == PENDING_BUY  # Now by its uuid
+    sell = next(r for r in rows.values() if r['ref'] == "no-answer-buy")
+    assert sell['state'] == ACKED and contract.order_uuid == sell['uuid'] != "no-answer-buy"
+    assert not manager.unacked_buys and not manager.unacked_sells
+
+async def journal_buy(manager, price: float) -> str:
+    """Place one journaled buy, return its identifier."""
+    before = set(await journal_rows())
+    async with manager._level_locks.hold(manager._level_key(price)):
+        await manager._place_buy(TICKER, price, 1.0)
+    [identifier] = set(await journal_rows()) - before
+    return identifier
+
+class ChunkFailHandler(CountingHandler):
+    """Bulk status lookup whose second chunk fails, like one 100-uuid request erroring out."""
+    async def get_orders_by_uuids(self, uuids, ticker=None, strict=False):
+        first = uuids[:len(uuids) // 2]
+        result = await super().get_orders_by_uuids(first, ticker)
+        if len(first) < len(uuids) and strict:
+            raise UpbitAPIError(500, 'server_error', "chunk failed")
+        return result
+
+async def run_partial_lookup_test(exchange):
+    print("Testing a failed status chunk does not close out live orders...")
+    resting = [r for r in (await journal_rows()).values() if r['side'] == 'bid' and r['state'] == ACKED]
+    assert len(resting) >= 2
+    restarted = TradingManager(ChunkFailHandler(exchange), TICKER)
+    await restarted.recover_state()
+    rows = await journal_rows()
+    assert all(rows[r['identifier']]['state'] == ACKED for r in resting), "Live orders closed out on a failed lookup"
+
+    restarted = TradingManager(CountingHandler(exchange), TICKER)
+    await restarted.recover_state()
+    assert {r['uuid'] for r in resting} <= set(restarted.pending_buy_orders)
+
+    # Replay failed outright: a still-unanswered buy keeps its level until the reconcile looks it up
+    unsent = await OrderJournal().intent(TICKER, 'bid', 1420.0, 1.0)
+    down = ChunkFailHandler(exchange)
+
+    async def lookup_down(identifiers, ticker=None):
+        raise UpbitAPIError(503, 'http_error', "Service Unavailable")
+    down.get_orders_by_identifiers = lookup_down
+    restarted = TradingManager(down, TICKER)
+    await restarted.recover_state()
+    assert restarted.unacked_buys == {unsent: 1420.0}
+    assert restarted.grid.state(restarted.grid.level_of(1420.0)) == PENDING_BUY
+    restarted.handler = CountingHandler(exchange)
+    await restarted.resolve_unacked()
+    assert (await journal_rows())[unsent]['state'] == FAILED
+    assert restarted.grid.is_free(restarted.grid.level_of(1420.0))
+
+async def run_order_journal_test():
+    print("--- Starting Order Journal Test ---")
+    async with temp_database():
+        exchange = SimExchange(balances={'KRW': 1e9, 'ETC': 100.0})
+        exchange.set_price(TICKER, 1500.0)
+        await run_lifecycle_test(exchange)
+        await run_crash_recovery_test(exchange)
+        await run_no_answer_test(exchange)
+        await run_partial_lookup_test(exchange)
+        print("--- Order Journal Test Passed ---")
+
+def test_order_journal():
+    asyncio.run(run_order_journal_test())
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run_order_journal_test())
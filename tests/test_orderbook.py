@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.orderbook import OrderBook
+
+def test_orderbook():
+    print("--- Starting Orderbook Test ---")
+    book = OrderBook("KRW-USDT")
+    assert book.best_bid() is None and not book.is_fresh()
+
+    book.apply({'type': 'orderbook', 'code': 'KRW-USDT', 'timestamp': 1, 'orderbook_units': [
+        {'ask_price': 1451.0, 'bid_price': 1450.0, 'ask_size': 100.0, 'bid_size': 50.0},
+        {'ask_price': 1452.0, 'bid_price': 1449.0, 'ask_size': 200.0, 'bid_size': 70.0},
+        {'ask_price': 1453.0, 'bid_price': 1448.0, 'ask_size': 300.0, 'bid_size': 90.0},
+    ]})
+    assert book.is_fresh()
+    assert (book.best_bid(), book.best_ask(), book.spread(), book.mid()) == (1450.0, 1451.0, 1.0, 1450.5)
+
+    # Depth queries
+    assert book.bid_depth(1449.0) == 120.0     # 1450 + 1449
+    assert book.bid_depth(1449.5) == 50.0
+    assert book.bid_depth(1400.0) == 210.0
+    assert book.ask_depth(1452.0) == 300.0
+    assert book.ask_depth(1450.0) == 0.0
+
+    # Spread crossing
+    assert book.crosses('bid', 1451.0) and not book.crosses('bid', 1450.0)
+    assert book.crosses('ask', 1450.0) and not book.crosses('ask', 1451.0)
+
+    # Snapshots replace the book in place
+    book.apply({'orderbook_units': [{'ask_price': 1460.0, 'bid_price': 1459.0, 'ask_size': 1.0, 'bid_size': 2.0}]})
+    assert book.snapshot() == {'code': 'KRW-USDT', 'bids': [(1459.0, 2.0)], 'asks': [(1460.0, 1.0)], 'spread': 1.0}
+
+    print("--- Orderbook Test Passed ---")
+
+if __name__ == "__main__":
+    test_orderbook()
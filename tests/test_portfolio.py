@@ -0,0 +1,85 @@
+import asyncio
+import sys
+import os
+from decimal import Decimal
+from unittest.mock import MagicMock, AsyncMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.portfolio import Portfolio
+from database.database import temp_database
+
+PRICES = {'KRW-USDT': 1450.0, 'KRW-XRP': 855.0, 'KRW-DOGE': 200.0}
+KRW_TOTAL = 200_000.0
+
+class MockHandler:
+    def __init__(self):
+        self.current_price = None
+        self.prices = dict(PRICES)
+        self.private_ws_connected = True
+        self.live_price = MagicMock(side_effect=lambda ticker=None: self.prices.get(ticker))
+        self.get_current_price = AsyncMock(side_effect=lambda ticker: self.prices[ticker])
+        self.buy_limit_order = AsyncMock(side_effect=lambda ticker, price, amount, identifier=None: f"{ticker}-{price}")
+        self.sell_limit_order = AsyncMock(return_value="sell-uuid")
+        self.get_open_orders = AsyncMock(return_value=[])
+        self.get_completed_orders = AsyncMock(return_value=[])
+        self.get_orders_by_uuids = AsyncMock(return_value={})
+        self.get_balance = AsyncMock(return_value=Decimal(str(KRW_TOTAL)))
+        self.get_total_balance = AsyncMock(return_value=Decimal(str(KRW_TOTAL)))
+        self.connect_websocket = AsyncMock(return_value=None)
+        self.connect_private_websocket = AsyncMock(return_value=None)
+        self.stop_websocket = MagicMock()
+        self.connect_orderbook = AsyncMock(return_value=None)
+        self.orderbook = MagicMock(return_value=None)
+        self.stop_private_websocket = MagicMock()
+
+async def test_portfolio():
+    print("--- Starting Portfolio Test ---")
+    async with temp_database():
+        handler = MockHandler()
+        portfolio = Portfolio(handler)
+        await portfolio.add_grid({'coin_ticker': 'KRW-USDT', 'min_price': 1400.0, 'max_price': 1500.0,
+                                  'grid_interval': 20.0, 'amount_per_grid': 5.0, 'profit_interval': 5.0})
+        await portfolio.add_grid({'coin_ticker': 'KRW-XRP', 'min_price': 850.0, 'max_price': 860.0,
+                                  'grid_interval': 1.0, 'amount_per_grid': 10.0, 'profit_interval': 1.0})
+        usdt, xrp = portfolio.get('KRW-USDT'), portfolio.get('KRW-XRP')
+        assert portfolio.is_running and len(portfolio.running_grids()) == 2
+        assert set(usdt.pending_buy_orders.values()) == {1400.0, 1420.0, 1440.0}
+        assert len(xrp.pending_buy_orders) == 6   # 850 .. 855
+
+        # Both grids share one subscription per socket
+        codes = handler.connect_private_websocket.call_args.args[0]
+        assert codes == ['KRW-USDT', 'KRW-XRP']
+
+        # One batched REST pass covers every grid
+        await asyncio.sleep(0.1)  # Let the startup reconcile finish
+        handler.get_orders_by_uuids.reset_mock()
+        handler.get_completed_orders.reset_mock()
+        handler.get_open_orders.reset_mock()
+        await portfolio.reconcile()
+        assert handler.get_orders_by_uuids.call_count == 1
+        assert len(handler.get_orders_by_uuids.call_args.args[0]) == 9
+        assert handler.get_completed_orders.call_count == 1 and handler.get_open_orders.call_count == 1
+
+        # Fills are routed to the grid of their market
+        await portfolio._on_order({'type': 'myOrder', 'code': 'KRW-XRP', 'uuid': 'KRW-XRP-853.0', 'ask_bid': 'BID',
+                                   'state': 'done', 'price': 853.0, 'volume': 10.0, 'executed_volume': 10.0})
+        await xrp.events.get()  # Routed into the XRP grid's queue, not USDT's
+        assert usdt.events.qsize() == 0
+
+        # A new grid only gets what the running grids do not claim (their ladders, minus contract levels)
+        reserved = 5.0 * sum(range(1400, 1501, 20)) + 10.0 * sum(range(850, 861))
+        check = await portfolio.validate_balance('KRW-DOGE', 10, 50.0, 100.0, 190.0, 10.0)  # Needs 72,500
+        assert not check['valid'] and float(check['balance']) == KRW_TOTAL - reserved, check
+        assert (await portfolio.validate_balance('KRW-DOGE', 10, 40.0, 100.0, 190.0, 10.0))['valid']  # Needs 58,000
+
+        assert await portfolio.remove_grid('KRW-USDT')
+        assert [g.ticker for g in portfolio.running_grids()] == ['KRW-XRP']
+        await portfolio.stop_all()
+        assert not portfolio.is_running
+
+        print("--- Portfolio Test Passed ---")
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(test_portfolio())
@@ -0,0 +1,50 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.rate_limiter import (RequestScheduler, parse_remaining_req, group_for,
+                                  PRIORITY_CRITICAL, PRIORITY_BACKGROUND)
+
+async def test_rate_limiter():
+    print("--- Starting Rate Limiter Test ---")
+
+    assert parse_remaining_req("group=default; min=1800; sec=29") == {'group': 'default', 'min': 1800, 'sec': 29}
+    assert parse_remaining_req(None) is None
+    assert group_for('POST', '/v1/orders') == 'order'
+    assert group_for('GET', '/v1/orders/uuids') == 'default'
+
+    scheduler = RequestScheduler({'order': 20})
+
+    # 1. Burst drains the bucket, then calls are paced at the group rate
+    t0 = time.monotonic()
+    await asyncio.gather(*(scheduler.acquire('order') for _ in range(30)))
+    elapsed = time.monotonic() - t0
+    assert elapsed >= 0.4, elapsed   # 20 immediately, 10 more at 20/s
+    stats = scheduler.stats()['order']
+    assert stats['requests'] == 30 and stats['waited'] == 10 and stats['queue_depth'] == 0
+
+    # 2. Queued critical calls overtake queued background calls
+    order = []
+    async def call(tag, priority):
+        await scheduler.acquire('order', priority)
+        order.append(tag)
+    tasks = [asyncio.create_task(call(f"bg{i}", PRIORITY_BACKGROUND)) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(call("sell", PRIORITY_CRITICAL)))
+    await asyncio.gather(*tasks)
+    assert order[0] == "sell", order
+
+    # 3. Server says 0 left in this second -> next call waits
+    scheduler.observe("group=order; min=100; sec=0")
+    t0 = time.monotonic()
+    await scheduler.acquire('order')
+    assert time.monotonic() - t0 >= 0.03
+
+    print("--- Rate Limiter Test Passed ---")
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(test_rate_limiter())
@@ -0,0 +1,180 @@
+import asyncio
+import os
+import sys
+
+import websockets
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.simulator import SimExchange, SimHandler, SimServer, random_walk
+from modules.trading_manager import TradingManager
+from modules.rate_limiter import RequestScheduler
+from modules.upbit_client import UpbitAPIError
+from modules import upbit_handler
+from modules.upbit_handler import UpbitHandler
+from database.database import temp_database
+
+CONFIG = {'coin_ticker': 'KRW-USDT', 'min_price': 1400.0, 'max_price': 1500.0,
+          'grid_interval': 5.0, 'amount_per_grid': 1.0, 'profit_interval': 5.0}
+
+async def run_matching_test():
+    print("Testing matching and balances...")
+    exchange = SimExchange(balances={'KRW': 10_000.0}, fee_rate=0.001)
+    exchange.set_price('KRW-USDT', 1450.0)
+    events = []
+    exchange.add_listener(lambda m: events.append(m) if m['type'] == 'myOrder' else None)
+
+    bid = await exchange.place_limit_order('KRW-USDT', 'bid', 1440.0, 2.0)
+    assert bid['state'] == 'wait' and exchange.locked['KRW'] > 2880
+    assert exchange.set_price('KRW-USDT', 1445.0) == 0
+    assert exchange.set_price('KRW-USDT', 1440.0) == 1
+    done = await exchange.get_order(bid['uuid'])
+    assert done['state'] == 'done' and done['remaining_volume'] == '0'
+    assert exchange.balances['USDT'] == 2.0
+    assert abs(exchange.balances['KRW'] - (10_000 - 2880 * 1.001)) < 1e-9
+    assert [e['state'] for e in events] == ['wait', 'done'] and events[-1]['ask_bid'] == 'BID'
+
+    ask = await exchange.place_limit_order('KRW-USDT', 'ask', 1460.0, 2.0)
+    try:
+        await exchange.place_limit_order('KRW-USDT', 'ask', 1470.0, 1.0)
+        assert False, "Coins are locked by the first ask"
+    except UpbitAPIError as e:
+        assert e.name == 'insufficient_funds_ask'
+    cancelled = await exchange.cancel_order(ask['uuid'])
+    assert cancelled['state'] == 'cancel' and exchange.locked['USDT'] == 0
+    assert exchange.set_price('KRW-USDT', 1500.0) == 0  # Cancelled order no longer rests
+
+    # Marketable limit fills on placement
+    ask = await exchange.place_limit_order('KRW-USDT', 'ask', 1490.0, 2.0)
+    assert (await exchange.get_order(ask['uuid']))['state'] == 'done'
+    closed = await exchange.get_closed_orders('KRW-USDT', limit=10)
+    assert [o['uuid'] for o in closed[:2]] == [ask['uuid'], cancelled['uuid']]
+
+    # Rate limits: the exchange answers 429, the handler's scheduler backs off and retries
+    # (the client scheduler is deliberately looser than the exchange)
+    limited = SimExchange(rate_limits={'order': 5, 'default': 5})
+    limited.set_price('KRW-USDT', 1450.0)
+    handler = SimHandler(limited, scheduler=RequestScheduler({'order': 50}))
+    uuids = await asyncio.gather(*(handler.buy_limit_order('KRW-USDT', 1400.0 + i, 1.0) for i in range(8)))
+    assert all(uuids) and len(limited.orders) == 8
+    assert limited.stats['throttled'] > 0
+    assert handler.rate_limit_stats()['order']['throttled'] == limited.stats['throttled']
+    print(f"Rate-limited placement OK (exchange throttled {limited.stats['throttled']} calls).")
+
+async def run_load_test():
+    print("Testing TradingManager against the simulator...")
+    async with temp_database():
+        exchange = SimExchange(latency=0.0005)
+        exchange.set_price('KRW-USDT', 1450.0)
+        handler = SimHandler(exchange)
+        manager = TradingManager(handler)
+        await manager.start_trading(dict(CONFIG))
+        await asyncio.sleep(0.05)
+        assert handler.private_ws_connected
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await exchange.run_path('KRW-USDT', random_walk(1450.0, 2000, 2.0, seed=7, bounds=(1400, 1500)),
+                                interval=0.001)
+        await asyncio.sleep(0.3)
+        elapsed = loop.time() - started
+        fills = exchange.stats['fills']
+        print(f"{fills} fills in {elapsed:.1f}s ({fills / elapsed * 60:,.0f} fills/min), "
+              f"{exchange.stats['orders']} orders, {len(exchange.orders)} open")
+        assert fills / elapsed * 60 > 1000
+        assert exchange.stats['rejected'] == 0
+
+        # Every coin held is behind exactly one contract's resting sell
+        sells = {u: o for u, o in exchange.orders.items() if o['side'] == 'ask'}
+        contracts = [c for c in manager.contract_book.active() if c.order_uuid in sells]
+        assert len(contracts) == len(sells)
+        assert abs(sum(c.buy_amount for c in contracts) - exchange.balances.get('USDT', 0.0)) < 1e-9
+        # Every resting buy is tracked as pending
+        bids = [u for u, o in exchange.orders.items() if o['side'] == 'bid']
+        assert set(bids) == set(manager.pending_buy_orders)
+
+        await manager.stop_trading()
+        await handler.close()
+
+async def run_server_test():
+    print("Testing the stand-in WebSocket server with the real UpbitHandler...")
+    exchange = SimExchange()
+    exchange.set_price('KRW-USDT', 1450.0)
+    async with SimServer(exchange) as server:
+        handler = UpbitHandler("access", "secret", ws_url=server.url, ws_private_url=server.private_url)
+        prices, fills = [], []
+
+        async def on_price(price, code):
+            prices.append((code, price))
+
+        async def on_order(event):
+            fills.append(event)
+
+        tasks = [asyncio.create_task(handler.connect_websocket('KRW-USDT', callback=on_price)),
+                 asyncio.create_task(handler.connect_orderbook(['KRW-USDT'])),
+                 asyncio.create_task(handler.connect_private_websocket(['KRW-USDT'], on_order=on_order))]
+        for _ in range(50):
+            if handler.market.connected and handler.private_ws_connected:
+                break
+            await asyncio.sleep(0.02)
+
+        order = await exchange.place_limit_order('KRW-USDT', 'bid', 1440.0, 1.0)
+        exchange.set_price('KRW-XRP', 855.0)   # Not subscribed
+        exchange.set_price('KRW-USDT', 1440.0)
+        await asyncio.sleep(0.1)
+
+        assert prices == [('KRW-USDT', 1440.0)]
+        assert handler.live_price('KRW-USDT') == 1440.0
+        assert handler.orderbook('KRW-USDT').best_bid() == 1439.0
+        assert [(e['uuid'], e['state']) for e in fills] == [(order['uuid'], 'wait'), (order['uuid'], 'done')]
+        assert handler.assets['USDT']['balance'] == 1
+
+        handler.stop_websocket()
+        handler.stop_private_websocket()
+        handler.market.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await handler.client.close()
+
+async def run_private_reconnect_test():
+    print("Testing the private stream backs off when the server keeps closing cleanly...")
+    connects = []
+
+    async def closing_server(ws):
+        connects.append(asyncio.get_running_loop().time())
+        await ws.recv()  # Subscription request
+        await ws.close()  # Clean close (1000), no error
+
+    retry_min, stable_after = upbit_handler.PRIVATE_RETRY_MIN, upbit_handler.PRIVATE_STABLE_AFTER
+    upbit_handler.PRIVATE_RETRY_MIN, upbit_handler.PRIVATE_STABLE_AFTER = 0.05, 10.0
+    try:
+        async with websockets.serve(closing_server, "127.0.0.1", 0) as srv:
+            port = srv.sockets[0].getsockname()[1]
+            handler = UpbitHandler("access", "secret", ws_private_url=f"ws://127.0.0.1:{port}")
+            task = asyncio.create_task(handler.connect_private_websocket(['KRW-USDT']))
+            await asyncio.sleep(0.5)
+            handler.stop_private_websocket()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await handler.client.close()
+    finally:
+        upbit_handler.PRIVATE_RETRY_MIN, upbit_handler.PRIVATE_STABLE_AFTER = retry_min, stable_after
+
+    # 0.05 + 0.1 + 0.2 s of backoff fit in the window: a tight reconnect loop would make hundreds
+    assert 2 <= len(connects) <= 5, f"{len(connects)} connects in 0.5s"
+    gaps = [b - a for a, b in zip(connects, connects[1:])]
+    assert all(later > earlier for earlier, later in zip(gaps, gaps[1:])), "Backoff reset after a short session"
+
+async def run_simulator_test():
+    print("--- Starting Simulator Test ---")
+    await run_matching_test()
+    await run_load_test()
+    await run_server_test()
+    await run_private_reconnect_test()
+    print("--- Simulator Test Passed ---")
+
+def test_simulator():
+    asyncio.run(run_simulator_test())
+
+if __name__ == "__main__":
+    test_simulator()
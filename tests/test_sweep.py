@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.backtest import run_backtest
+from modules.sweep import sweep, param_grid
+
+def test_sweep():
+    print("--- Starting Sweep Test ---")
+    rng = np.random.default_rng(3)
+    prices = np.round(1450 + np.cumsum(rng.normal(0, 1.5, 200_000)))
+
+    configs = param_grid('KRW-USDT', [1380.0, 1400.0, 1420.0], [1480.0, 1500.0, 1520.0],
+                         [2.0, 5.0, 10.0, 20.0], [1.0, 2.0], [1.0, 3.0, 5.0])
+    assert len(configs) == 3 * 3 * 4 * 2 * 3
+
+    t0 = time.perf_counter()
+    results = sweep(prices, configs, workers=2)
+    print(f"{len(configs)} combinations in {time.perf_counter() - t0:.2f}s")
+    assert len(results) == len(configs)
+    assert all(a['score'] >= b['score'] for a, b in zip(results, results[1:]))
+
+    # The cached per-level scoring agrees with the full backtest
+    for best in results[:3]:
+        config = {k: best[k] for k in configs[0]}
+        full = run_backtest(config, prices)
+        assert full.sells == best['sells']
+        assert abs(full.realized_pnl - best['realized_pnl']) < 1e-6
+        assert abs(full.max_capital - best['max_capital']) < 1e-6
+
+    print("--- Sweep Test Passed ---")
+
+if __name__ == "__main__":
+    test_sweep()
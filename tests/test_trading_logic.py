@@ -6,7 +6,8 @@ from unittest.mock import MagicMock, AsyncMock
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from modules.trading_manager import TradingManager
 from models.contract import Contract
-from database.database import init_db
+from modules.orderbook import OrderBook
+from database.database import temp_database
 
 # Mock UpbitHandler
 class MockHandler:
@@ -15,6 +16,18 @@ class MockHandler:
         self.buy_limit_order = AsyncMock(return_value="new-buy-uuid")
         self.sell_limit_order = AsyncMock(return_value="new-sell-uuid")
         self.get_current_price = AsyncMock(return_value=1450.0)
+        self.live_price = MagicMock(side_effect=lambda *args: self.current_price)
+        self.get_open_orders = AsyncMock(return_value=[])
+        self.get_completed_orders = AsyncMock(return_value=[])
+        self.get_order_status = AsyncMock(return_value=None)
+        self.get_orders_by_uuids = AsyncMock(return_value={})
+        self.private_ws_connected = False
+        self.connect_private_websocket = AsyncMock(return_value=None)
+        self.stop_private_websocket = MagicMock()
+        self.connect_websocket = AsyncMock(return_value=None)
+        self.stop_websocket = MagicMock()
+        self.connect_orderbook = AsyncMock(return_value=None)
+        self.orderbook = MagicMock(return_value=None)
 
 async def test_trading_flow():
     print("--- Starting Trading Logic Test ---")
@@ -24,106 +37,198 @@ async def test_trading_flow():
     # We are using the real 'trading.db' in the project root based on imports.
     # To avoid messing up real DB, we should maybe back it up or use a test flag.
     # For this task, I'll assume we can use the main DB as it's dev env.
-    await init_db()
-    
-    handler = MockHandler()
-    manager = TradingManager(handler)
-    
-    # 2. Config
-    config = {
-        'coin_ticker': 'KRW-USDT',
-        'min_price': 1400.0,
-        'max_price': 1500.0,
-        'grid_count': 5,
-        'grid_interval': 20.0,
-        'amount_per_grid': 5.0,
-        'profit_interval': 5.0
-    }
-    
-    # 3. Start Trading
-    print("Testing start_trading...")
-    res = await manager.start_trading(config)
-    print(res)
-    
-    # Verify initial orders placed
-    # min=1400, max=1500, int=20 -> 1400, 1420, 1440, 1460, 1480, 1500
-    # current=1450
-    # Buys should be: 1400, 1420, 1440 (contracts below current)
-    # verify handler.buy_limit_order called
-    print(f"Initial Buy Calls: {handler.buy_limit_order.call_count}")
-    # We expect 3 calls (1400, 1420, 1440)
-    assert handler.buy_limit_order.call_count >= 1
-    
-    # 4. Simulate Buy Fill
-    print("Testing process_buy_fill...")
-    buy_uuid = "mock-buy-uuid-1"
-    # Call process_buy_fill manually (simulating callback)
-    # Manager doesn't have the contract yet because start_trading just placed orders
-    # but didn't create contracts (as per my code logic).
-    # Logic: Contract created ONLY when buy fills.
-    
-    await manager.process_buy_fill(buy_uuid, price=1400.0, volume=10.0)
-    
-    # Verify:
-    # 1. Contract created in DB?
-    # 2. Sell order placed?
-    
-    # Check DB
-    active = await Contract.get_active_contracts()
-    my_contract = next((c for c in active if c.buy_price == 1400.0), None)
-    
-    assert my_contract is not None
-    print(f"Contract Created: ID={my_contract.id}, Status={my_contract.status}")
-    
-    # Check Sell Order
-    handler.sell_limit_order.assert_called()
-    print("Sell order placement verified.")
-    
-    # 5. Simulate Sell Fill
-    print("Testing process_sell_fill...")
-    # The contract created above should now have 'new-sell-uuid' (from MockHandler default)
-    # Check if DB update happened? 
-    # MockHandler returns "new-sell-uuid" for sell_limit_order.
-    
-    # Reload contract to see if UUID updated
-    updated_contract = await Contract.get_by_uuid("new-sell-uuid")
-    # Actually get_by_uuid checks 'order_uuid' column.
-    
-    # Wait a bit for async DB update if needed? No, await process_buy_fill awaits DB commit.
-    
-    if updated_contract:
-        print(f"Verified Contract UUID updated to: {updated_contract.order_uuid}")
-    else:
-        print("Error: Contract UUID not updated to Sell UUID.")
-        # Debug: check what it is
-        c_chk = (await Contract.get_active_contracts())[-1]
-        print(f"Current UUID in DB: {c_chk.order_uuid}")
+    async with temp_database():
+        handler = MockHandler()
+        manager = TradingManager(handler)
+    
+        # 2. Config
+        config = {
+            'coin_ticker': 'KRW-USDT',
+            'min_price': 1400.0,
+            'max_price': 1500.0,
+            'grid_count': 5,
+            'grid_interval': 20.0,
+            'amount_per_grid': 5.0,
+            'profit_interval': 5.0
+        }
+    
+        # 3. Start Trading
+        print("Testing start_trading...")
+        res = await manager.start_trading(config)
+        print(res)
+    
+        # Verify initial orders placed
+        # min=1400, max=1500, int=20 -> 1400, 1420, 1440, 1460, 1480, 1500
+        # current=1450
+        # Buys should be: 1400, 1420, 1440 (contracts below current)
+        # verify handler.buy_limit_order called
+        print(f"Initial Buy Calls: {handler.buy_limit_order.call_count}")
+        # We expect 3 calls (1400, 1420, 1440)
+        assert handler.buy_limit_order.call_count >= 1
+    
+        # 4. Simulate Buy Fill
+        print("Testing process_buy_fill...")
+        buy_uuid = "mock-buy-uuid-1"
+        # Call process_buy_fill manually (simulating callback)
+        # Manager doesn't have the contract yet because start_trading just placed orders
+        # but didn't create contracts (as per my code logic).
+        # Logic: Contract created ONLY when buy fills.
+    
+        await manager.process_buy_fill(buy_uuid, price=1400.0, volume=10.0)
+    
+        # Verify:
+        # 1. Contract created in DB?
+        # 2. Sell order placed?
+    
+        # Check DB
+        active = await Contract.get_active_contracts()
+        my_contract = next((c for c in active if c.buy_price == 1400.0), None)
+    
+        assert my_contract is not None
+        print(f"Contract Created: ID={my_contract.id}, Status={my_contract.status}")
+    
+        # Check Sell Order
+        handler.sell_limit_order.assert_called()
+        print("Sell order placement verified.")
+    
+        # 5. Simulate Sell Fill
+        print("Testing process_sell_fill...")
+        # The contract created above should now have 'new-sell-uuid' (from MockHandler default)
+        # Check if DB update happened? 
+        # MockHandler returns "new-sell-uuid" for sell_limit_order.
+    
+        # Reload contract to see if UUID updated
+        updated_contract = await Contract.get_by_uuid("new-sell-uuid")
+        # Actually get_by_uuid checks 'order_uuid' column.
+    
+        # Wait a bit for async DB update if needed? No, await process_buy_fill awaits DB commit.
+    
+        if updated_contract:
+            print(f"Verified Contract UUID updated to: {updated_contract.order_uuid}")
+        else:
+            print("Error: Contract UUID not updated to Sell UUID.")
+            # Debug: check what it is
+            c_chk = (await Contract.get_active_contracts())[-1]
+            print(f"Current UUID in DB: {c_chk.order_uuid}")
         
     
-    # Now process sell fill
-    # Pass 'updated_contract' which is the active one with sell uuid
-    # Logic: process_sell_fill(contract, price, volume)
-    
-    sell_price = 1400.0 + 5.0 # target
-    await manager.process_sell_fill(updated_contract, price=sell_price, volume=10.0)
-    
-    # Verify:
-    # 1. Contract Closed?
-    closed_contract = await Contract.get_by_uuid("new-sell-uuid")
-    # get_by_uuid might return even if closed if we don't filter in method?
-    # Contract.get_by_uuid selects * ... yes.
-    assert closed_contract.status == "CLOSED"
-    print("Contract Closed verified.")
-    
-    # 2. Re-entry Buy Placed?
-    # handler.buy_limit_order was called initially 3 times.
-    # Now it should be called 1 more time for re-entry.
-    print(f"Total Buy Calls: {handler.buy_limit_order.call_count}")
-    assert handler.buy_limit_order.call_count >= 1 # We can't strictly count if we didn't reset mock, but fine.
-    
-    print("--- Trading Logic Test Passed ---")
+        # Now process sell fill
+        # Pass 'updated_contract' which is the active one with sell uuid
+        # Logic: process_sell_fill(contract, price, volume)
+    
+        sell_price = 1400.0 + 5.0 # target
+        await manager.process_sell_fill(updated_contract, price=sell_price, volume=10.0)
+    
+        # Verify:
+        # 1. Contract Closed?
+        closed_contract = await Contract.get_by_uuid("new-sell-uuid")
+        # get_by_uuid might return even if closed if we don't filter in method?
+        # Contract.get_by_uuid selects * ... yes.
+        assert closed_contract.status == "CLOSED"
+        print("Contract Closed verified.")
+    
+        # 2. Re-entry Buy Placed?
+        # handler.buy_limit_order was called initially 3 times.
+        # Now it should be called 1 more time for re-entry.
+        print(f"Total Buy Calls: {handler.buy_limit_order.call_count}")
+        assert handler.buy_limit_order.call_count >= 1 # We can't strictly count if we didn't reset mock, but fine.
+    
+        print("--- Trading Logic Test Passed ---")
+        await manager.stop_trading()
+
+async def test_order_stream_events():
+    print("--- Starting Order Stream Test ---")
+    async with temp_database():
+        handler = MockHandler()
+        manager = TradingManager(handler)
+        manager.config = {
+            'coin_ticker': 'KRW-USDT',
+            'min_price': 1400.0,
+            'max_price': 1500.0,
+            'grid_interval': 20.0,
+            'amount_per_grid': 5.0,
+            'profit_interval': 5.0
+        }
+        await manager.contract_book.load()
+        manager._build_grid()
+        manager._track_pending("stream-buy-uuid", 1420.0)
+        handler.sell_limit_order = AsyncMock(return_value="stream-sell-uuid")
+
+        # Non-final states are ignored
+        await manager.handle_order_event({'type': 'myOrder', 'uuid': 'stream-buy-uuid', 'ask_bid': 'BID', 'state': 'trade',
+                                      'price': 1420.0, 'volume': 5.0, 'executed_volume': 2.0})
+        assert "stream-buy-uuid" in manager.pending_buy_orders
+
+        # Buy 'done' -> contract + sell order, straight from the stream
+        await manager.handle_order_event({'type': 'myOrder', 'uuid': 'stream-buy-uuid', 'ask_bid': 'BID', 'state': 'done',
+                                      'price': 1420.0, 'volume': 5.0, 'executed_volume': 5.0})
+        assert "stream-buy-uuid" not in manager.pending_buy_orders
+        contract = manager.contract_book.get_by_order_uuid("stream-sell-uuid")
+        assert contract is not None and contract.target_price == 1425.0
+
+        # Sell 'done' closes it; a duplicate (e.g. from REST reconciliation) is ignored
+        sell_event = {'type': 'myOrder', 'uuid': 'stream-sell-uuid', 'ask_bid': 'ASK', 'state': 'done',
+                      'price': 1425.0, 'volume': 5.0, 'executed_volume': 5.0}
+        await manager.handle_order_event(sell_event)
+        assert manager.contract_book.get(contract.id) is None
+        buy_calls = handler.buy_limit_order.call_count
+        await manager.process_sell_fill(contract, 1425.0, 5.0)
+        assert handler.buy_limit_order.call_count == buy_calls
+
+        print("--- Order Stream Test Passed ---")
+
+async def test_incremental_refill():
+    print("--- Starting Incremental Refill Test ---")
+    async with temp_database():
+        handler = MockHandler()
+        manager = TradingManager(handler)
+        manager.config = {
+            'coin_ticker': 'KRW-USDT',
+            'min_price': 1400.0,
+            'max_price': 1500.0,
+            'grid_interval': 20.0,
+            'amount_per_grid': 5.0,
+            'profit_interval': 5.0
+        }
+        await manager.contract_book.load()
+        manager._build_grid()
+        for i, price in enumerate((1400.0, 1420.0, 1440.0)):
+            manager._track_pending(f"uuid-{i}", price)
+        manager._last_refill_price = 1450.0
+
+        # Moves inside the same band or downwards touch nothing
+        await manager._refill_incremental(1455.0)
+        await manager._refill_incremental(1445.0)
+        assert handler.buy_limit_order.call_count == 0
+        assert handler.get_open_orders.call_count == 0
+
+        # Crossing up through 1460 and 1480 refills exactly those levels
+        handler.buy_limit_order = AsyncMock(side_effect=["uuid-3", "uuid-4"])
+        await manager._refill_incremental(1485.0)
+        assert sorted(c.args[1] for c in handler.buy_limit_order.call_args_list) == [1460.0, 1480.0]
+        assert handler.get_open_orders.call_count == 0, "Refill placements must not crawl open orders"
+
+        # Local orderbook: a level at/above the best ask would cross the spread and is skipped
+        book = OrderBook('KRW-USDT')
+        book.apply({'orderbook_units': [{'ask_price': 1495.0, 'bid_price': 1490.0, 'ask_size': 10.0, 'bid_size': 10.0}]})
+        handler.orderbook = MagicMock(return_value=book)
+        handler.buy_limit_order = AsyncMock(return_value="uuid-6")
+        await manager._refill_incremental(1505.0)
+        assert [c.args[1] for c in handler.buy_limit_order.call_args_list] == []
+        assert manager.grid.is_free(manager.grid.level_of(1500.0))
+        handler.orderbook = MagicMock(return_value=None)
+
+        # A cancelled/filled buy frees its level; only that level is retried
+        manager._untrack_pending("uuid-1")
+        handler.buy_limit_order = AsyncMock(return_value="uuid-5")
+        await manager._refill_incremental(1485.0)
+        assert [c.args[1] for c in handler.buy_limit_order.call_args_list] == [1420.0]
+
+        print("--- Incremental Refill Test Passed ---")
 
 if __name__ == "__main__":
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     asyncio.run(test_trading_flow())
+    asyncio.run(test_order_stream_events())
+    asyncio.run(test_incremental_refill())
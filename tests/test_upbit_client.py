@@ -0,0 +1,63 @@
+import asyncio
+import os
+import sys
+
+from aiohttp import web
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.upbit_client import UpbitRestClient, UpbitAPIError, MAX_THROTTLE_RETRIES
+from modules.rate_limiter import RequestScheduler
+
+async def test_upbit_client():
+    print("--- Starting Upbit REST Client Test ---")
+    hits = {'throttled': 0}
+
+    async def ticker(request):
+        return web.json_response([{'market': 'KRW-USDT', 'trade_price': 1450.0}])
+
+    async def gateway(request):
+        return web.Response(status=502, text="<html><body>502 Bad Gateway</body></html>", content_type='text/html')
+
+    async def throttled(request):
+        hits['throttled'] += 1
+        return web.Response(status=429, text="Too Many Requests")
+
+    async def empty(request):
+        return web.Response(status=503)
+
+    app = web.Application()
+    app.router.add_get('/v1/ticker', ticker)
+    app.router.add_get('/v1/candles/minutes/1', gateway)
+    app.router.add_get('/v1/trades/ticks', throttled)
+    app.router.add_get('/v1/accounts', empty)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    client = UpbitRestClient("access", "secret", base_url=f"http://127.0.0.1:{port}",
+                             scheduler=RequestScheduler({'default': 1000}))
+    try:
+        assert (await client.get_ticker(['KRW-USDT']))[0]['trade_price'] == 1450.0
+
+        # Non-JSON error bodies surface as UpbitAPIError with the text, not a decode error
+        for call, status, needle in ((client.get_minute_candles('KRW-USDT'), 502, "502 Bad Gateway"),
+                                     (client.get_trades('KRW-USDT'), 429, "Too Many Requests"),
+                                     (client.get_accounts(), 503, "Service Unavailable")):
+            try:
+                await call
+                raise AssertionError(f"{status} did not raise")
+            except UpbitAPIError as e:
+                assert e.status == status and needle in e.message, e
+        assert hits['throttled'] == MAX_THROTTLE_RETRIES + 1  # 429s were still retried first
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+    print("--- Upbit REST Client Test Passed ---")
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(test_upbit_client())